@@ -0,0 +1,139 @@
+# NCGMP09v1.1_BenchmarkIdRegistry.py
+#   Compares memory use and time of three ways of finding duplicate _IDs
+#   and unmatched ExtendedAttributes OwnerIDs:
+#     pairs     the original validator: a list of [_ID, table] pairs, sorted
+#               and scanned pairwise, plus a stringified copy of all _IDs
+#     dict      _ID -> table, becoming {table: count} once repeated
+#     registry  NCGMP09v11_IdRegistry, as now used by the validator
+#   Each is run in a separate process, on the same synthetic _IDs (unicode,
+#   as returned by arcpy), and its increase in peak memory is reported.
+#
+#   Usage:
+#     NCGMP09v1.1_BenchmarkIdRegistry.py <nIDs> [duplicateRate=0.001] [tables=12]
+
+import sys, os, time, json, subprocess
+import NCGMP09v11_Profiler as Profiler
+from NCGMP09v11_IdRegistry import IdRegistry
+
+versionString = 'NCGMP09v1.1_BenchmarkIdRegistry.py, version of 17 October 2026'
+
+approaches = ('pairs','dict','registry')
+
+def addMsgAndPrint(msg):
+    print msg
+
+def syntheticIds(nIds,duplicateRate,nTables):
+    # (_ID, table) pairs. Every 1/duplicateRate-th _ID repeats the one before
+    tables = ['Table'+str(i) for i in range(nTables)]
+    every = 0
+    if duplicateRate > 0:
+        every = int(1/duplicateRate)
+    for i in xrange(nIds):
+        n = i
+        if every and i % every == every-1:
+            n = i-1
+        yield u'%s_%d' % (tables[n % nTables],n), tables[i % nTables]
+
+def ownerIds(nIds):
+    # OwnerIDs to look up; every tenth does not exist
+    return [u'Table0_%d' % (i*37 % nIds) if i % 10 else u'Missing%d' % i for i in range(1000)]
+
+def runPairs(ids,owners):
+    all_IDs = []
+    for anID, table in ids:
+        all_IDs.append([anID,table])
+    all_IDs.sort()
+    duplicates = 0
+    for n in range(1,len(all_IDs)):
+        if all_IDs[n-1][0] == all_IDs[n][0]:
+            duplicates = duplicates+1
+    all_IDs0 = []
+    for anID in all_IDs:
+        all_IDs0.append(str(anID[0]))
+    all_IDs0 = set(all_IDs0)
+    unmatched = len([anID for anID in owners if not anID in all_IDs0])
+    return duplicates, unmatched
+
+def runDict(ids,owners):
+    idTables = {}
+    for anID, table in ids:
+        tbls = idTables.get(anID)
+        if tbls == None:
+            idTables[anID] = table
+            continue
+        if not isinstance(tbls,dict):
+            tbls = idTables[anID] = {tbls:1}
+        tbls[table] = tbls.get(table,0) + 1
+    duplicates = 0
+    for tbls in idTables.itervalues():
+        if isinstance(tbls,dict):
+            duplicates = duplicates + sum(tbls.values()) - 1
+    strIDs = set([str(anID) for anID in idTables])
+    unmatched = len([anID for anID in owners if not anID in strIDs])
+    return duplicates, unmatched
+
+def runRegistry(ids,owners):
+    registry = IdRegistry()
+    for anID, table in ids:
+        registry.add(anID,table)
+    duplicates = 0
+    for anID in registry.duplicates():
+        duplicates = duplicates + sum([n for table, n in registry.tableCounts(anID)]) - 1
+    unmatched = len([anID for anID in owners if not anID in registry])
+    return duplicates, unmatched
+
+def child(approach,nIds,duplicateRate,nTables):
+    # runs one approach; prints JSON result
+    owners = ownerIds(nIds)
+    baseMemory = Profiler.peakMemory()
+    startTime = time.time()
+    run = {'pairs':runPairs,'dict':runDict,'registry':runRegistry}[approach]
+    duplicates, unmatched = run(syntheticIds(nIds,duplicateRate,nTables),owners)
+    seconds = time.time()-startTime
+    memory = None
+    if baseMemory <> None:
+        memory = Profiler.peakMemory()-baseMemory
+    print json.dumps({'approach':approach,'seconds':round(seconds,3),'memory':memory,
+                      'duplicates':duplicates,'unmatched':unmatched})
+
+def pythonExecutable():
+    # when run as a script tool, sys.executable is ArcMap or ArcCatalog
+    pythonExe = os.path.join(sys.exec_prefix,'python.exe')
+    if os.path.exists(pythonExe):
+        return pythonExe
+    return sys.executable
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'child':
+        child(sys.argv[2],int(sys.argv[3]),float(sys.argv[4]),int(sys.argv[5]))
+        sys.exit(0)
+    if len(sys.argv) < 2:
+        addMsgAndPrint('Usage: NCGMP09v1.1_BenchmarkIdRegistry.py <nIDs> [duplicateRate=0.001] [tables=12]')
+        sys.exit(1)
+    nIds = int(sys.argv[1])
+    options = {}
+    for arg in sys.argv[2:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    duplicateRate = float(options.get('duplicaterate',0.001))
+    nTables = int(options.get('tables',12))
+    addMsgAndPrint('  '+versionString)
+    addMsgAndPrint('  '+str(nIds)+' _IDs in '+str(nTables)+' tables, duplicate rate '+str(duplicateRate))
+    addMsgAndPrint('  '+'approach'.ljust(10)+'sec'.rjust(9)+'peak MB'.rjust(10)+'duplicates'.rjust(12)+'unmatched'.rjust(11))
+    results = []
+    for approach in approaches:
+        output = subprocess.Popen([pythonExecutable(),os.path.abspath(__file__),'child',approach,
+                                   str(nIds),str(duplicateRate),str(nTables)],
+                                  stdout=subprocess.PIPE).communicate()[0]
+        result = json.loads(output.strip().split('\n')[-1])
+        results.append(result)
+        if result['memory'] <> None:
+            memory = '%.1f' % (result['memory']/1048576.0)
+        else:
+            memory = '--'
+        addMsgAndPrint('  '+approach.ljust(10)+('%.2f' % result['seconds']).rjust(9)+memory.rjust(10)+
+                       str(result['duplicates']).rjust(12)+str(result['unmatched']).rjust(11))
+    if len(set([(r['duplicates'],r['unmatched']) for r in results])) > 1:
+        addMsgAndPrint('  Approaches disagree!')
+        sys.exit(1)
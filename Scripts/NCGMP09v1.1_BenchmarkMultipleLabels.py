@@ -0,0 +1,169 @@
+# NCGMP09v1.1_BenchmarkMultipleLabels.py
+#   Times two ways for NCGMP09v1.1_MakePolys to flag polygons whose labels
+#   conflict and write the multiple-label error outputs, on a synthetic
+#   map in SQLite (arcpy is not needed; SQL statements stand in for the
+#   geoprocessing tools and cursors):
+#     lists  as MakePolys did: labels, sorted by polygon, are walked to
+#            make a list of bad polygons; polygons and labels are copied
+#            (Copy_management to xxxpolys, Identity_analysis to xxxlabels),
+#            a MultipleLabels field is added to each copy and set in a pass
+#            over every row that tests its ObjectID against the list, and
+#            flagged rows are selected into the error tables
+#     sets   as MakePolys does now: NCGMP09v11_LabelIndex.labelConflicts
+#            gives a set of bad polygons and a dictionary of their labels,
+#            and the flagged rows are selected straight into the error
+#            tables, one statement each
+#   The map is a grid of square polygons, each with a label inside that
+#   carries its attributes; conflictRate of them have a second label with
+#   another MapUnit. Both ways start from the same polygon -> labels
+#   mapping, found with NCGMP09v11_LabelIndex (timed separately), and must
+#   give the same error rows.
+#
+#   Usage:
+#     NCGMP09v1.1_BenchmarkMultipleLabels.py [name=value ...]
+#   Options:
+#     polygons=100000       number of polygons
+#     conflictRate=0.01     fraction of polygons with conflicting labels
+#     seed=1                random seed
+#     database=<file>       SQLite file to build. Default is a temporary file
+#   Exits with status 1 if the two ways give different error rows.
+
+import sys, os, os.path, random, tempfile, time
+import NCGMP09v11_SyntheticDatabase as SyntheticDatabase
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_LabelIndex as LabelIndex
+
+versionString = 'NCGMP09v1.1_BenchmarkMultipleLabels.py, version of 17 October 2026'
+
+polygonClass = 'MapUnitPolys'
+labelClass = 'xxxtlabels'
+labelFields = ['MapUnit','IdentityConfidence','DataSourceID',polygonClass+'_ID']
+approaches = ('lists','sets')
+
+def addMsgAndPrint(msg):
+    print msg
+
+def buildMap(path,nPolys,conflictRate,rng):
+    # polygons and labels in SQLite file path; returns the number of labels
+    layout = SyntheticDatabase.MapLayout(nPolys,1,rng,0.0)
+    defs = [[name,'String','NullsOK',50] for name in labelFields]
+    writer = SyntheticDatabase.SqliteWriter(path)
+    writer.createTable(polygonClass,defs,'Polygon')
+    writer.createTable(labelClass,defs,'Point')
+    polygons = []
+    labels = []
+    for i in xrange(nPolys):
+        parts = layout.polygon(i)
+        values = ('U'+str(i % 20),'certain','DAS1','MUP'+str(i+1))
+        polygons.append((parts,)+values)
+        p = Geometry.interiorPoint(Geometry.orientPolygon(parts[0]))
+        labels.append((p,)+values)
+        if rng.random() < conflictRate:
+            labels.append(((p[0]+1.0,p[1]+1.0),'U'+str((i+1) % 20))+values[1:])
+    writer.insertRows(polygonClass,labelFields,polygons,'Polygon')
+    writer.insertRows(labelClass,labelFields,labels,'Point')
+    writer.close()
+    return len(labels)
+
+def locate(connection):
+    # [polygonLabels, labelValues], as MakePolys makes them
+    polygons = [[oid,Geometry.decodeShape(blob)[1]] for oid, blob in
+                connection.execute('SELECT OBJECTID, Shape FROM '+polygonClass)]
+    labelPoints = []
+    labelValues = {}
+    for row in connection.execute('SELECT OBJECTID, Shape, '+', '.join(labelFields)+' FROM '+labelClass):
+        labelPoints.append([row[0],Geometry.decodeShape(row[1])[1][0]])
+        labelValues[row[0]] = [str(v) for v in row[2:]]
+    polygonLabels, unplaced = LabelIndex.assignLabels(polygons,labelPoints)
+    return [polygonLabels,labelValues]
+
+def runLists(connection,polygonLabels,labelValues):
+    # sorted walk over (polygon, label), as over xxxlabels
+    pairs = sorted([(poly,label) for poly, labels in polygonLabels.iteritems() for label in labels])
+    badPolyList = []
+    lastPoly = -2
+    lastValues = None
+    for poly, label in pairs:
+        if poly == lastPoly:
+            if labelValues[label] <> lastValues:
+                badPolyList.append(poly)
+        else:
+            lastPoly = poly
+            lastValues = labelValues[label]
+    badPolyList = list(set(badPolyList))
+    # copies with MultipleLabels, flagged row by row as by an UpdateCursor
+    connection.execute('CREATE TABLE xxxpolys AS SELECT * FROM '+polygonClass)
+    connection.execute('ALTER TABLE xxxpolys ADD COLUMN MultipleLabels TEXT(5)')
+    for rowid, oid in connection.execute('SELECT rowid, OBJECTID FROM xxxpolys').fetchall():
+        if oid in badPolyList:
+            connection.execute("UPDATE xxxpolys SET MultipleLabels = 'YES' WHERE rowid = ?",(rowid,))
+    connection.execute('CREATE TEMP TABLE labelPolys (label INTEGER PRIMARY KEY, poly INTEGER)')
+    connection.executemany('INSERT INTO labelPolys VALUES (?,?)',[(label,poly) for poly, label in pairs])
+    connection.execute('CREATE TABLE xxxlabels AS SELECT l.*, p.poly AS FID_'+polygonClass+' FROM '+labelClass+
+                       ' l LEFT JOIN labelPolys p ON l.OBJECTID = p.label')
+    connection.execute('ALTER TABLE xxxlabels ADD COLUMN MultipleLabels TEXT(5)')
+    for rowid, poly in connection.execute('SELECT rowid, FID_'+polygonClass+' FROM xxxlabels').fetchall():
+        if poly in badPolyList:
+            connection.execute("UPDATE xxxlabels SET MultipleLabels = 'YES' WHERE rowid = ?",(rowid,))
+    connection.execute("CREATE TABLE badPolys_lists AS SELECT * FROM xxxpolys WHERE MultipleLabels = 'YES'")
+    connection.execute("CREATE TABLE badLabels_lists AS SELECT * FROM xxxlabels WHERE MultipleLabels = 'YES'")
+    connection.execute('DROP TABLE xxxpolys')
+    connection.execute('DROP TABLE xxxlabels')
+    connection.commit()
+
+def runSets(connection,polygonLabels,labelValues):
+    badPolys, badLabels = LabelIndex.labelConflicts(polygonLabels,labelValues)
+    connection.execute('CREATE TEMP TABLE flaggedPolys (oid INTEGER PRIMARY KEY)')
+    connection.executemany('INSERT INTO flaggedPolys VALUES (?)',[(oid,) for oid in badPolys])
+    connection.execute("CREATE TABLE badPolys_sets AS SELECT *, 'YES' AS MultipleLabels FROM "+polygonClass+
+                       ' WHERE OBJECTID IN (SELECT oid FROM flaggedPolys)')
+    connection.execute('CREATE TEMP TABLE flaggedLabels (oid INTEGER PRIMARY KEY, poly INTEGER)')
+    connection.executemany('INSERT INTO flaggedLabels VALUES (?,?)',badLabels.iteritems())
+    connection.execute('CREATE TABLE badLabels_sets AS SELECT l.*, f.poly AS FID_'+polygonClass+
+                       ", 'YES' AS MultipleLabels FROM "+labelClass+' l JOIN flaggedLabels f ON l.OBJECTID = f.oid')
+    connection.commit()
+
+def errorRows(connection,approach):
+    # ObjectIDs in the error tables of approach
+    return [sorted([row[0] for row in connection.execute('SELECT OBJECTID FROM '+table+'_'+approach)])
+            for table in ('badPolys','badLabels')]
+
+if __name__ == '__main__':
+    import sqlite3
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    nPolys = int(options.get('polygons',100000))
+    conflictRate = float(options.get('conflictrate',0.01))
+    seed = int(options.get('seed',1))
+    database = options.get('database')
+    temporary = database == None
+    if temporary:
+        handle, database = tempfile.mkstemp(suffix='.sqlite')
+        os.close(handle)
+    addMsgAndPrint('  '+versionString)
+    try:
+        startTime = time.time()
+        nLabels = buildMap(database,nPolys,conflictRate,random.Random(seed))
+        addMsgAndPrint('  '+str(nPolys)+' polygons, '+str(nLabels)+' labels, built in %.1f seconds' % (time.time()-startTime))
+        connection = sqlite3.connect(database)
+        startTime = time.time()
+        polygonLabels, labelValues = locate(connection)
+        addMsgAndPrint('  labels located in %.2f seconds' % (time.time()-startTime))
+        results = {}
+        for approach in approaches:
+            startTime = time.time()
+            {'lists':runLists,'sets':runSets}[approach](connection,polygonLabels,labelValues)
+            seconds = time.time()-startTime
+            results[approach] = errorRows(connection,approach)
+            addMsgAndPrint('  '+approach.ljust(6)+('%.2f' % seconds).rjust(9)+' seconds, '+
+                           str(len(results[approach][0]))+' bad polygons, '+str(len(results[approach][1]))+' labels')
+        connection.close()
+    finally:
+        if temporary and os.path.exists(database):
+            os.remove(database)
+    if results['lists'] <> results['sets']:
+        addMsgAndPrint('  Approaches disagree!')
+        sys.exit(1)
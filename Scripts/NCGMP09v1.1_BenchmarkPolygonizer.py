@@ -0,0 +1,230 @@
+# NCGMP09v1.1_BenchmarkPolygonizer.py
+#   Times NCGMP09v11_Polygonizer on synthetic line networks of several
+#   sizes and checks that it finds the faces they are known to have.
+#
+#   Networks, with about the requested number of vertices:
+#     grid      n wavy lines each way, crossing between vertices and
+#               running half a cell past the outermost lines (dangles):
+#               (n-1)**2 faces, no holes
+#     contacts  ContactsAndFaults of NCGMP09v11_SyntheticDatabase, grid
+#               lines cut into contacts that meet at vertices: one face per
+#               polygon of its MapUnitPolys
+#     islands   a grid of straight lines, some of them repeated in part,
+#               with a square island in every third cell, a smaller island
+#               in every other island, an island joined to its cell by a
+#               line in every third cell and a dangle in every third
+#               cell: one face per cell and per island, each island a hole
+#   For each, the number of faces and holes must be as expected and the
+#   faces must cover the area inside the network's outer boundary. For
+#   networks of up to 100000 vertices the lines are also shuffled and some
+#   reversed, and the faces must come out the same. With tiles, each network
+#   is also polygonized in that many tiles (NCGMP09v11_TiledPolygonizer),
+#   which must give the same faces and outer boundaries.
+#
+#   Usage:
+#     NCGMP09v1.1_BenchmarkPolygonizer.py [name=value ...]
+#   Options:
+#     sizes=10000,100000,1000000   numbers of vertices
+#     networks=grid,contacts,islands
+#     seed=1                       random seed
+#     tiles=0                      also polygonize in this many tiles
+#     processes=<n>                worker processes for tiles. Default is
+#                                  one per processor
+#     output=<file>                also write results as JSON
+#   Exits with status 1 if any network does not give the expected faces.
+
+import sys, math, random, json, time
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_Polygonizer as Polygonizer
+import NCGMP09v11_TiledPolygonizer as TiledPolygonizer
+import NCGMP09v11_SyntheticDatabase as SyntheticDatabase
+
+versionString = 'NCGMP09v1.1_BenchmarkPolygonizer.py, version of 17 October 2026'
+
+cellSize = 100.0
+verticesPerCell = 8   # along each side of a cell, for grid and islands
+shuffleLimit = 100000 # largest network also run with its lines shuffled
+
+def addMsgAndPrint(msg):
+    print msg
+
+#------------ networks -------------
+# each returns [lines, expected faces, expected holes]; lines is a list of
+#   [OBJECTID, [path, ...]]
+
+def gridNetwork(nVertices,rng):
+    # waves of amplitude 0.1 cell and wavelength 1 cell: a vertical and a
+    #   horizontal line cross once
+    n = max(2,int(math.sqrt(nVertices/(2.0*verticesPerCell))))
+    amplitude = 0.1*cellSize
+    step = cellSize/verticesPerCell
+    lines = []
+    for i in range(n):
+        for vertical in (True,False):
+            phase = rng.uniform(0,2*math.pi)
+            path = []
+            for k in range(n*verticesPerCell+1):
+                along = -cellSize/2+k*step
+                across = i*cellSize+amplitude*math.sin(2*math.pi*along/cellSize+phase)
+                if vertical:
+                    path.append((across,along))
+                else:
+                    path.append((along,across))
+            lines.append([len(lines)+1,[path]])
+    return [lines,(n-1)**2,0]
+
+def contactsNetwork(nVertices,rng):
+    nPolys = max(4,int(nVertices/2.5))
+    layout = SyntheticDatabase.MapLayout(nPolys,nPolys,rng,0.0)
+    lines = [[i+1,layout.lines[i]] for i in range(len(layout.lines))]
+    return [lines,nPolys,0]
+
+def _square(x,y,half):
+    return [(x-half,y-half),(x-half,y+half),(x+half,y+half),(x+half,y-half),(x-half,y-half)]
+
+def islandsNetwork(nVertices,rng):
+    n = max(3,int(math.sqrt(nVertices/(2.0*verticesPerCell))))
+    step = cellSize/verticesPerCell
+    lines = []
+    def add(path):
+        lines.append([len(lines)+1,[path]])
+    for i in range(n+1):
+        path = [(i*cellSize,k*step) for k in range(n*verticesPerCell+1)]
+        add(path)
+        add([(y,x) for x, y in path])
+        if i % 5 == 0:
+            # a copy of the middle of the line
+            add(path[len(path)/4:3*len(path)/4])
+    faces = n*n
+    holes = 0
+    for r in range(n):
+        for c in range(n):
+            x = (c+0.5)*cellSize
+            y = (r+0.5)*cellSize
+            kind = (r+c) % 3
+            if kind == 0:
+                add(_square(x,y,0.25*cellSize))
+                faces, holes = faces+1, holes+1
+                if (r/3+c) % 2 == 0:
+                    add(_square(x,y,0.1*cellSize)[::-1])
+                    faces, holes = faces+1, holes+1
+            elif kind == 1:
+                add([(c*cellSize,y),(x,y+0.1*cellSize)])
+            else:
+                add(_square(x,y,0.25*cellSize))
+                add([(x,y+0.25*cellSize),(x,(r+1)*cellSize)])
+                faces, holes = faces+1, holes+1
+    return [lines,faces,holes]
+
+networkMakers = {'grid':gridNetwork,'contacts':contactsNetwork,'islands':islandsNetwork}
+
+#------------ checks -------------
+
+def polygonize(lines,tiles=0,processes=None):
+    if tiles:
+        polygonizer = TiledPolygonizer.TiledPolygonizer(None,tiles,processes)
+    else:
+        polygonizer = Polygonizer.Polygonizer()
+    for oid, paths in lines:
+        polygonizer.addPaths(oid,paths)
+    polygonizer.run()
+    return polygonizer
+
+def shuffled(lines,rng):
+    lines = [[oid,[path[::-1] if rng.random() < 0.5 else path for path in paths]] for oid, paths in lines]
+    rng.shuffle(lines)
+    return lines
+
+def runBenchmark(network,nVertices,seed,tiles=0,processes=None):
+    rng = random.Random(seed)
+    startTime = time.time()
+    lines, nFaces, nHoles = networkMakers[network](nVertices,rng)
+    makeSeconds = time.time()-startTime
+    startTime = time.time()
+    polygonizer = polygonize(lines)
+    seconds = time.time()-startTime
+    faces = polygonizer.faces
+    result = {'network':network,'size':nVertices,'makeSeconds':round(makeSeconds,3),
+              'seconds':round(seconds,3),'counts':polygonizer.counts,
+              'phases':dict([[k,round(v,3)] for k, v in polygonizer.seconds.iteritems()]),
+              'expectedFaces':nFaces,'expectedHoles':nHoles,'problems':[]}
+    problems = result['problems']
+    if len(faces) <> nFaces:
+        problems.append('faces: expected '+str(nFaces)+', found '+str(len(faces)))
+    if polygonizer.counts['holes'] <> nHoles:
+        problems.append('holes: expected '+str(nHoles)+', found '+str(polygonizer.counts['holes']))
+    faceArea = sum([face.area for face in faces])
+    outerArea = -sum([Geometry.signedArea(ring) for ring in polygonizer.outerRings])
+    if abs(faceArea-outerArea) > 1e-9*max(outerArea,1.0):
+        problems.append('faces cover %.3f, network encloses %.3f' % (faceArea,outerArea))
+    if nVertices <= shuffleLimit:
+        again = polygonize(shuffled(lines,rng)).faces
+        if [face.rings for face in again] <> [face.rings for face in faces]:
+            problems.append('faces differ when lines are shuffled')
+    if tiles:
+        startTime = time.time()
+        tiled = polygonize(lines,tiles,processes)
+        result['tiledSeconds'] = round(time.time()-startTime,3)
+        result['tiledCounts'] = tiled.counts
+        result['tiledPhases'] = dict([[k,round(v,3)] for k, v in tiled.seconds.iteritems()])
+        if [[face.rings,face.area] for face in tiled.faces] <> [[face.rings,face.area] for face in faces] or \
+           tiled.outerRings <> polygonizer.outerRings:
+            problems.append('faces differ when polygonized in '+str(tiled.counts['tiles'])+' tiles')
+    return result
+
+def summary(results):
+    lines = ['  '+'network'.ljust(10)+'vertices'.rjust(10)+'faces'.rjust(9)+'noding'.rjust(9)+
+             'edges'.rjust(9)+'faces'.rjust(9)+'total'.rjust(9)+'tiled'.rjust(9)+'  check']
+    for result in results:
+        aline = '  '+result['network'].ljust(10)+str(result['counts']['vertices']).rjust(10)+ \
+                str(result['counts']['faces']).rjust(9)
+        for phase in ('noding','edges','faces'):
+            aline = aline+('%.2f' % result['phases'][phase]).rjust(9)
+        aline = aline+('%.2f' % result['seconds']).rjust(9)
+        if 'tiledSeconds' in result:
+            aline = aline+('%.2f' % result['tiledSeconds']).rjust(9)
+        else:
+            aline = aline+'--'.rjust(9)
+        if result['problems']:
+            aline = aline+'  MISMATCH'
+        else:
+            aline = aline+'  ok'
+        lines.append(aline)
+        for problem in result['problems']:
+            lines.append('      '+problem)
+    return lines
+
+if __name__ == '__main__':
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    sizes = [int(x) for x in options.get('sizes','10000,100000,1000000').split(',')]
+    networks = [x.strip() for x in options.get('networks','grid,contacts,islands').split(',')]
+    for network in networks:
+        if not network in networkMakers:
+            addMsgAndPrint('  Unknown network '+network+'; choose from '+', '.join(sorted(networkMakers.keys())))
+            sys.exit(1)
+    seed = int(options.get('seed',1))
+    tiles = int(options.get('tiles',0))
+    processes = None
+    if 'processes' in options:
+        processes = int(options['processes'])
+    addMsgAndPrint('  '+versionString)
+    results = []
+    for size in sizes:
+        for network in networks:
+            addMsgAndPrint('  '+network+', '+str(size)+' vertices')
+            results.append(runBenchmark(network,size,seed,tiles,processes))
+    for aline in summary(results):
+        addMsgAndPrint(aline)
+    if 'output' in options:
+        outf = open(options['output'],'w')
+        try:
+            json.dump({'version':versionString,'date':time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'seed':seed,'tiles':tiles,'results':results},outf,indent=2,sort_keys=True)
+        finally:
+            outf.close()
+    if [result for result in results if result['problems']]:
+        sys.exit(1)
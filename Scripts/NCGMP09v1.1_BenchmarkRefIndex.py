@@ -0,0 +1,317 @@
+# NCGMP09v1.1_BenchmarkRefIndex.py
+#   Checks that NCGMP09v11_RefIndex gives the CONTENT ERRORS lines of the
+#   list-based code it replaced in NCGMP09v1.1_ValidateDatabase, and times
+#   the two, on randomized synthetic tables held in memory:
+#     lists  as ValidateDatabase did: _IDs, MapUnit, Glossary and
+#            DataSources references are appended to lists while each table
+#            is inventoried, then sorted and scanned, with 'x in aList'
+#            membership tests
+#     index  as ValidateDatabase does now: NCGMP09v11_TableScanner.scanTable
+#            fills a ReferenceIndex, and the RefIndex functions give the lines
+#   Tables have duplicate, null and empty _IDs, MapUnits, Glossary terms
+#   (some too long to print whole) and DataSources_IDs, missing and unused
+#   Glossary terms, DataSources and MapUnits, in the usual tables of a
+#   database. Each round uses a new seed; the lines of each section must
+#   be the same, in any order, with the same repeats. Links of
+#   ExtendedAttributes, now checked by NCGMP09v11_AttributeGraph, are not
+#   compared.
+#
+#   The list-based code loaded the MapUnits of DescriptionOfMapUnits into
+#   the list that inventorying had already filled, so it listed each
+#   unreferenced DMU unit twice. That repeat is not reproduced here: as in
+#   ValidateDatabase since the SQL back end, the units are loaded once.
+#
+#   Usage:
+#     NCGMP09v1.1_BenchmarkRefIndex.py [name=value ...]
+#   Options:
+#     rows=2000       rows in each table
+#     rounds=20       number of randomized databases
+#     seed=1          random seed of the first round
+#   Exits with status 1 if the two ways give different lines.
+
+import sys, random, time
+import NCGMP09v11_RefIndex as RefIndex
+import NCGMP09v11_TableScanner as TableScanner
+from NCGMP09v11_TableScanner import Field, MemoryReader, gFieldDefList
+
+versionString = 'NCGMP09v1.1_BenchmarkRefIndex.py, version of 17 October 2026'
+
+# tables in the order they are inventoried, and their String fields
+tableFields = [
+    ['DataSources',['DataSources_ID','Source','Notes']],
+    ['Glossary',['Term','Definition','DefinitionSourceID','Glossary_ID']],
+    ['DescriptionOfMapUnits',['MapUnit','Name','GeneralLithology','DescriptionSourceID','DescriptionOfMapUnits_ID']],
+    ['StandardLithology',['MapUnit','Lithology','ProportionTerm','DataSourceID','StandardLithology_ID']],
+    ['ContactsAndFaults',['Type','ExistenceConfidence','IdentityConfidence','LocationSourceID','DataSourceID','ContactsAndFaults_ID']],
+    ['MapUnitPolys',['MapUnit','IdentityConfidence','DataSourceID','MapUnitPolys_ID']],
+    ['OrientationPoints',['Type','IdentityConfidence','OrientationSourceID','LocationSourceID','OrientationPoints_ID']],
+    ['CMUMapUnitPolys',['MapUnit','CMUMapUnitPolys_ID']],
+    ['CSAMapUnitPolys',['MapUnit','IdentityConfidence','DataSourceID','CSAMapUnitPolys_ID']],
+    ['CSBMapUnitPolys',['MapUnit','Type','CSBMapUnitPolys_ID']]]
+
+sectionNames = ('duplicateIDs','missingSourceIDs','unusedDataSources','missingDmuMapUnits',
+                'missingStandardLithMapUnits','equivalenceErrors','unreferencedStandardLithMapUnits',
+                'unreferencedDmuMapUnits','missingGlossaryTerms','unusedGlossaryTerms')
+approaches = ('lists','index')
+
+def addMsgAndPrint(msg):
+    print msg
+
+class _Values:
+    # random values of one database, from vocabularies of about nRows/10
+    def __init__(self,nRows,rng):
+        self.rng = rng
+        self.n = max(2,nRows/10)
+        self.longTerms = ['long term '+str(i)+' '+'x'*(30+i) for i in range(8)]
+    def _pick(self,prefix,nullRate=0.02,shift=0):
+        # shift > 0 for the tables that list values, so that some listed
+        #   values are not cited, and some cited values are not listed
+        r = self.rng.random()
+        if r < nullRate:
+            return None
+        if r < 2*nullRate:
+            return ''
+        return prefix+str(self.rng.randrange(self.n)+shift*self.n/10)
+    def mapUnit(self,shift=0):
+        return self._pick('U',0.02,shift)
+    def term(self,shift=0):
+        if self.rng.random() < 0.01:
+            return self.rng.choice(self.longTerms)
+        return self._pick('term',0.02,shift)
+    def source(self,shift=0):
+        return self._pick('DAS',0.02,shift)
+    def text(self):
+        return self._pick('text ',0.1)
+    def id(self,table,i):
+        r = self.rng.random()
+        if r < 0.002:
+            return None
+        if r < 0.01:
+            # the _ID of another row, maybe of another table
+            return self.rng.choice(tableFields)[0]+str(self.rng.randrange(i+1))
+        return table+str(i)
+
+def syntheticTables(nRows,rng):
+    # MemoryReader of randomized tables
+    values = _Values(nRows,rng)
+    tables = {}
+    for table, names in tableFields:
+        rows = []
+        for i in xrange(nRows):
+            row = []
+            for name in names:
+                if name == 'DataSources_ID':
+                    row.append(values.source(1))
+                elif name == table+'_ID':
+                    row.append(values.id(table,i))
+                elif name == 'Term':
+                    row.append(values.term(1))
+                elif name == 'MapUnit' and table == 'DescriptionOfMapUnits':
+                    row.append(values.mapUnit(1))
+                elif name == 'MapUnit' and table == 'StandardLithology':
+                    row.append(values.mapUnit(2))
+                elif name == 'MapUnit':
+                    row.append(values.mapUnit())
+                elif name in gFieldDefList:
+                    row.append(values.term())
+                elif name.find('Source') >= 0:
+                    row.append(values.source())
+                else:
+                    row.append(values.text())
+            rows.append(tuple(row))
+        tables[table] = [[Field(name,'String') for name in names],rows]
+    return MemoryReader(tables)
+
+def loadTableValues(reader,table,field,valueList):
+    for (value,) in reader.rows(table,[field]):
+        if value <> None:
+            valueList.append(value)
+
+def runLists(reader):
+    # the list-based inventoryValues and checkContent of ValidateDatabase
+    all_IDs = []
+    allMapUnitRefs = []
+    allGlossaryRefs = []
+    allDataSourcesRefs = []
+    gmapMapUnits = []
+    cmuMapUnits = []
+    csMapUnits = []
+    dmuMapUnits = []
+    for table, names in tableFields:
+        idField = table+'_ID'
+        glossFields = [name for name in names if name in gFieldDefList]
+        sourceFields = [name for name in names if name.find('Source') >= 0 and name.find('_ID') < 0 and table <> 'DataSources']
+        for row in reader.rows(table,names):
+            values = dict(zip(names,row))
+            if idField in names:
+                all_IDs.append([values[idField],table])
+            if table <> 'Glossary':
+                for field in glossFields:
+                    if values[field] <> '' and values[field] <> None:
+                        allGlossaryRefs.append([str(values[field]),field,table])
+            if 'MapUnit' in names:
+                mu = str(values['MapUnit'])
+                if mu <> '':
+                    if table <> 'DescriptionOfMapUnits' and table <> 'StandardLithology':
+                        allMapUnitRefs.append([mu,table])
+                    if table == 'MapUnitPolys':
+                        gmapMapUnits.append(mu)
+                    if table[0:2] == 'CS' and table[3:] == 'MapUnitPolys':
+                        csMapUnits.append(mu)
+                    if table == 'CMUMapUnitPolys' or table == 'CMUMapUnitPoints':
+                        cmuMapUnits.append(mu)
+            for field in sourceFields:
+                allDataSourcesRefs.append([values[field],field,table])
+    sections = dict([[name,[]] for name in sectionNames])
+    # uniqueness of _ID values
+    all_IDs.sort()
+    for n in range(1,len(all_IDs)):
+        if all_IDs[n-1][0] == all_IDs[n][0]:
+            if not all_IDs[n][0] is None and not all_IDs[n-1][1] is None and not all_IDs[n][1] is None:
+                sections['duplicateIDs'].append('    '+all_IDs[n][0]+', tables '+all_IDs[n-1][1]+' '+all_IDs[n][1])
+            else:
+                sections['duplicateIDs'].append('    BOGUS! got a NoneType ID or table')
+    # DataSources
+    dataSourcesIDs = []
+    loadTableValues(reader,'DataSources','DataSources_ID',dataSourcesIDs)
+    allDataSourcesRefs.sort()
+    lastID = ''
+    for anID in allDataSourcesRefs:
+        if anID[0] <> None and anID[0] <> lastID:
+            lastID = anID[0]
+            if anID[0] not in dataSourcesIDs:
+                sections['missingSourceIDs'].append('    '+anID[0]+', cited in field '+anID[1]+' table '+anID[2])
+    allSourceRefIDs = []
+    for ref in allDataSourcesRefs:
+        allSourceRefIDs.append(ref[0])
+    for anID in dataSourcesIDs:
+        if anID <> None and not anID in allSourceRefIDs:
+            sections['unusedDataSources'].append('    '+anID)
+    # MapUnits
+    standardLithMapUnits = []
+    loadTableValues(reader,'DescriptionOfMapUnits','MapUnit',dmuMapUnits)
+    loadTableValues(reader,'StandardLithology','MapUnit',standardLithMapUnits)
+    allMapUnitRefs.sort()
+    lastMU = ''
+    allMapUnitRefs2 = []
+    for mu in allMapUnitRefs:
+        if mu[0] <> lastMU:
+            lastMU = mu[0]
+            allMapUnitRefs2.append(lastMU)
+            if mu[0] not in dmuMapUnits:
+                sections['missingDmuMapUnits'].append('    '+str(mu[0])+', cited in '+str(mu[1]))
+            if mu[0] not in standardLithMapUnits:
+                sections['missingStandardLithMapUnits'].append('    '+str(mu[0])+', cited in '+str(mu[1]))
+    cmuMapUnits2 = list(set(cmuMapUnits))
+    csMapUnits2 = list(set(csMapUnits))
+    allMapUnits = []
+    muSets = [gmapMapUnits,dmuMapUnits,cmuMapUnits2,csMapUnits2]
+    for muSet in muSets:
+        for mu in muSet:
+            if not mu in allMapUnits:
+                allMapUnits.append(mu)
+    allMapUnits.sort()
+    sections['equivalenceErrors'].append('    Unit       Map  DMU  CMU  XS')
+    for mu in allMapUnits:
+        line = '    '+mu.ljust(10)
+        for muSet in muSets:
+            if mu in muSet:
+                line = line+'  X  '
+            else:
+                line = line+' --- '
+        sections['equivalenceErrors'].append(line)
+    lastMu = ''
+    standardLithMapUnits.sort()
+    for mu in standardLithMapUnits:
+        if mu <> lastMu and not mu in allMapUnitRefs2:
+            lastMu = mu
+            sections['unreferencedStandardLithMapUnits'].append('    '+mu)
+    for mu in dmuMapUnits:
+        if mu not in allMapUnitRefs2 and mu <> '':
+            sections['unreferencedDmuMapUnits'].append('    '+mu)
+    # Glossary
+    glossaryTerms = []
+    loadTableValues(reader,'Glossary','Term',glossaryTerms)
+    allGlossaryRefs.sort()
+    lastTerm = ''
+    for term in allGlossaryRefs:
+        if str(term[0]) <> 'None' and term[0] <> lastTerm:
+            lastTerm = term[0]
+            if term[0] not in glossaryTerms:
+                if len(term[0]) < 40:
+                    thisTerm = term[0]
+                else:
+                    thisTerm = term[0][0:37]+'...'
+                sections['missingGlossaryTerms'].append('    '+thisTerm+', cited in field '+term[1]+', table '+term[2])
+    glossaryRefs = []
+    for ref in allGlossaryRefs:
+        glossaryRefs.append(str(ref[0]))
+    for term in glossaryTerms:
+        if term not in glossaryRefs:
+            sections['unusedGlossaryTerms'].append('    '+term)
+    return sections
+
+def runIndex(reader):
+    # TableScanner and RefIndex, as in NCGMP09v11_Validator.checkContent
+    refIndex = RefIndex.ReferenceIndex()
+    for table, names in tableFields:
+        TableScanner.scanTable(reader,table,refIndex,None,checks=('ids','glossary','mapUnits','dataSources'))
+    sections = {}
+    sections['duplicateIDs'] = RefIndex.duplicateIdLines(refIndex)
+    dataSourcesIDs = []
+    loadTableValues(reader,'DataSources','DataSources_ID',dataSourcesIDs)
+    sections['missingSourceIDs'] = RefIndex.missingDataSourcesLines(refIndex,dataSourcesIDs)
+    sections['unusedDataSources'] = RefIndex.unusedDataSourcesLines(refIndex,dataSourcesIDs)
+    dmuMapUnits = []
+    standardLithMapUnits = []
+    loadTableValues(reader,'DescriptionOfMapUnits','MapUnit',dmuMapUnits)
+    loadTableValues(reader,'StandardLithology','MapUnit',standardLithMapUnits)
+    allDmuMapUnits = RefIndex.allDmuMapUnits(refIndex,dmuMapUnits)
+    sections['missingDmuMapUnits'] = RefIndex.missingMapUnitLines(refIndex,allDmuMapUnits)
+    sections['missingStandardLithMapUnits'] = RefIndex.missingMapUnitLines(refIndex,standardLithMapUnits)
+    sections['equivalenceErrors'] = RefIndex.equivalenceLines(refIndex,allDmuMapUnits)
+    sections['unreferencedStandardLithMapUnits'] = RefIndex.unreferencedStandardLithLines(refIndex,standardLithMapUnits)
+    sections['unreferencedDmuMapUnits'] = RefIndex.unreferencedDmuLines(refIndex,allDmuMapUnits)
+    glossaryTerms = []
+    loadTableValues(reader,'Glossary','Term',glossaryTerms)
+    sections['missingGlossaryTerms'] = RefIndex.missingGlossaryLines(refIndex,glossaryTerms)
+    sections['unusedGlossaryTerms'] = RefIndex.unusedGlossaryLines(refIndex,glossaryTerms)
+    return sections
+
+def differences(lists,index):
+    # names of the sections whose lines differ
+    return [name for name in sectionNames if sorted(lists[name]) <> sorted(index[name])]
+
+if __name__ == '__main__':
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    nRows = int(options.get('rows',2000))
+    nRounds = int(options.get('rounds',20))
+    seed = int(options.get('seed',1))
+    addMsgAndPrint('  '+versionString)
+    addMsgAndPrint('  '+str(nRounds)+' rounds of '+str(len(tableFields))+' tables of '+str(nRows)+' rows')
+    seconds = dict([[approach,0.0] for approach in approaches])
+    nLines = dict([[name,0] for name in sectionNames])
+    failed = False
+    for n in range(nRounds):
+        reader = syntheticTables(nRows,random.Random(seed+n))
+        results = {}
+        for approach in approaches:
+            startTime = time.time()
+            results[approach] = {'lists':runLists,'index':runIndex}[approach](reader)
+            seconds[approach] = seconds[approach]+time.time()-startTime
+        for name in sectionNames:
+            nLines[name] = nLines[name]+len(results['index'][name])
+        for name in differences(results['lists'],results['index']):
+            addMsgAndPrint('  seed '+str(seed+n)+': '+name+' differs')
+            failed = True
+    for name in sectionNames:
+        addMsgAndPrint('  '+name.ljust(34)+str(nLines[name]).rjust(8)+' lines')
+    for approach in approaches:
+        addMsgAndPrint('  '+approach.ljust(6)+('%.2f' % seconds[approach]).rjust(9)+' seconds')
+    if failed:
+        addMsgAndPrint('  Approaches disagree!')
+        sys.exit(1)
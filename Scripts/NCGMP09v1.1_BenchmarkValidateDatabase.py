@@ -0,0 +1,222 @@
+# NCGMP09v1.1_BenchmarkValidateDatabase.py
+#   Times NCGMP09v1.1_ValidateDatabase against synthetic databases of
+#   several sizes and checks that it finds the errors that were injected.
+#
+#   For each size, builds a database with NCGMP09v11_SyntheticDatabase,
+#   runs the validator on it (in a separate process, with profile=true and
+#   cache=false), and reads back the profile (wall time, rows, rows/sec and
+#   peak memory of each phase) and the conformance report. For each injected
+#   error category the count found in the report must equal the count
+#   injected, every other content error section must be empty, and the
+#   schema errors must be those expected. Results are printed and written
+#   to <workDirectory>/benchmark.json
+#
+#   Usage:
+#     NCGMP09v1.1_BenchmarkValidateDatabase.py <workDirectory> [name=value ...]
+#   Options:
+#     sizes=10000,100000,1000000   numbers of features
+#     errorRate=0.001              fraction of rows given each kind of error
+#     format=gdb                   gdb, sqlite or gpkg. Defaults to gdb if
+#                                  arcpy can be imported, else to sqlite
+#     seed=1                       random seed
+#     processes=1                  passed on to the validator
+#     keep=false                   keep the synthetic databases and reports
+#   The format chooses the validator path that is timed: gdb databases are
+#   read through arcpy (NCGMP09v11_TableScanner), sqlite and gpkg databases
+#   are checked with SQL (NCGMP09v11_SqlValidate). Timings of one path say
+#   little about the other.
+#   Exits with status 1 if any run does not find exactly the injected errors.
+
+import sys, os, os.path, re, json, subprocess, time
+import NCGMP09v11_SyntheticDatabase as SyntheticDatabase
+import NCGMP09v11_Validator as Validator
+
+versionString = 'NCGMP09v1.1_BenchmarkValidateDatabase.py, version of 17 October 2026'
+
+validatorScript = os.path.join(os.path.dirname(os.path.abspath(__file__)),'NCGMP09v1.1_ValidateDatabase_Arc10.1.py')
+
+# report sections that the validator always fills
+informationalSections = ('equivalenceErrors',)
+
+def addMsgAndPrint(msg):
+    print msg
+
+def defaultFormat():
+    # the validator's own path, gdb, where arcpy is available
+    try:
+        import arcpy
+        return 'gdb'
+    except ImportError:
+        return 'sqlite'
+
+def sectionHeaders():
+    # report section header -> section name, from the validator itself
+    headers = {}
+    for name, header, arguments in Validator.contentSectionDefinitions:
+        headers[header] = name
+    headers[Validator.badNullsHeader] = 'allBadNulls'
+    return headers
+
+_countPattern = re.compile(r'--(\d+) \w+(, |$)')
+
+def readReport(reportFile,headers):
+    # returns [schemaErrors, {section name: count}] of a conformance report.
+    #   count is the sum of the counts of the section's lines
+    lines = [aline.rstrip('\n') for aline in open(reportFile)]
+    schemaErrors = lines[lines.index('SCHEMA ERRORS')+2:lines.index('EXTENSIONS TO SCHEMA, may indicate errors')]
+    schemaErrors = [aline.strip() for aline in schemaErrors if aline.strip() not in ('','None')]
+    content = lines[lines.index('CONTENT ERRORS')+2:lines.index('GEODATABASE DESCRIPTION')]
+    counts = {}
+    header = []
+    name = None
+    for aline in content+['']:
+        if aline.strip() == '':
+            header = []
+            name = None
+        elif aline[0:4] <> '    ':
+            header.append(aline)
+            name = headers.get('\n'.join(header))
+            if name <> None:
+                counts[name] = 0
+        elif name <> None:
+            m = _countPattern.search(aline)
+            if m:
+                counts[name] += int(m.group(1))
+            else:
+                counts[name] += 1
+    return [schemaErrors,counts]
+
+def compare(record,schemaErrors,counts):
+    # list of differences between what was injected and what was found
+    problems = []
+    for name in SyntheticDatabase.errorCategories:
+        found = counts.get(name,0)
+        if found <> record['injected'][name]:
+            problems.append(name+': injected '+str(record['injected'][name])+', found '+str(found))
+    for name, found in counts.iteritems():
+        if not name in record['injected'] and not name in informationalSections and found > 0:
+            problems.append(name+': found '+str(found)+', none expected')
+    for aline in schemaErrors:
+        if not aline in record['schemaErrors']:
+            problems.append('unexpected schema error: '+aline)
+    for aline in record['schemaErrors']:
+        if not aline in schemaErrors:
+            problems.append('missing schema error: '+aline)
+    return problems
+
+def pythonExecutable():
+    # when run as a script tool, sys.executable is ArcMap or ArcCatalog
+    pythonExe = os.path.join(sys.exec_prefix,'python.exe')
+    if os.path.exists(pythonExe):
+        return pythonExe
+    return sys.executable
+
+def removeDatabase(path):
+    if os.path.isdir(path):
+        import shutil
+        shutil.rmtree(path,True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def runBenchmark(workDirectory,size,errorRate,format,seed,processes,headers,keep=False):
+    database = os.path.join(workDirectory,'synthetic'+str(size)+'.'+format)
+    record = SyntheticDatabase.build(database,size,errorRate,seed)
+    reportFile = os.path.join(workDirectory,os.path.basename(database)+'-conformance.txt')
+    profileFile = os.path.splitext(reportFile)[0]+'-profile.json'
+    for f in (reportFile,profileFile):
+        if os.path.exists(f):
+            os.remove(f)
+    addMsgAndPrint('  Validating '+database)
+    startTime = time.time()
+    status = subprocess.call([pythonExecutable(),validatorScript,database,workDirectory,
+                              'profile=true','cache=false','processes='+str(processes)])
+    seconds = time.time()-startTime
+    result = {'size':size,'database':database,'buildSeconds':record['seconds'],
+              'validateSeconds':round(seconds,3),'rows':sum(record['rows'].values()),
+              'injected':record['injected']}
+    if status <> 0 or not os.path.exists(reportFile):
+        result['problems'] = ['validator failed, exit status '+str(status)]
+        return result
+    schemaErrors, counts = readReport(reportFile,headers)
+    result['found'] = dict([[name,counts.get(name,0)] for name in SyntheticDatabase.errorCategories])
+    result['problems'] = compare(record,schemaErrors,counts)
+    if os.path.exists(profileFile):
+        result['profile'] = json.load(open(profileFile))
+    if not keep:
+        for f in (database,SyntheticDatabase.injectedFileName(database),reportFile,profileFile):
+            removeDatabase(f)
+    return result
+
+def summary(results):
+    # lines of phase timings and checks, one row per database size
+    phases = []
+    for result in results:
+        for p in result.get('profile',{}).get('phases',[]):
+            if not p['phase'] in phases:
+                phases.append(p['phase'])
+    lines = ['  '+'features'.rjust(10)+'build'.rjust(9)+''.join([p[0:14].rjust(16) for p in phases])+
+             'total'.rjust(9)+'peak MB'.rjust(9)+'  errors']
+    for result in results:
+        profile = result.get('profile',{})
+        seconds = dict([[p['phase'],p['seconds']] for p in profile.get('phases',[])])
+        aline = '  '+str(result['size']).rjust(10)+('%.1f' % result['buildSeconds']).rjust(9)
+        for p in phases:
+            if p in seconds:
+                aline = aline+('%.2f' % seconds[p]).rjust(16)
+            else:
+                aline = aline+'--'.rjust(16)
+        aline = aline+('%.1f' % result['validateSeconds']).rjust(9)
+        if profile.get('peakMemory'):
+            aline = aline+('%.0f' % (profile['peakMemory']/1048576.0)).rjust(9)
+        else:
+            aline = aline+'--'.rjust(9)
+        if result['problems']:
+            aline = aline+'  MISMATCH'
+        else:
+            aline = aline+'  ok'
+        lines.append(aline)
+        for problem in result['problems']:
+            lines.append('      '+problem)
+    return lines
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        addMsgAndPrint('Usage: NCGMP09v1.1_BenchmarkValidateDatabase.py <workDirectory> [name=value ...]')
+        sys.exit(1)
+    workDirectory = os.path.abspath(sys.argv[1])
+    options = {}
+    for arg in sys.argv[2:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    sizes = [int(x) for x in options.get('sizes','10000,100000,1000000').split(',')]
+    errorRate = float(options.get('errorrate',0.001))
+    if 'format' in options:
+        format = options['format'].lstrip('.').lower()
+    else:
+        format = defaultFormat()
+    seed = int(options.get('seed',1))
+    processes = int(options.get('processes',1))
+    keep = options.get('keep','false').lower() in ('true','yes','1')
+    if not os.path.isdir(workDirectory):
+        os.makedirs(workDirectory)
+    addMsgAndPrint('  '+versionString)
+    if format == 'gdb':
+        addMsgAndPrint('  Timing the geodatabase (arcpy) path of the validator')
+    else:
+        addMsgAndPrint('  Timing the SQLite path of the validator, not the geodatabase (arcpy) path')
+    headers = sectionHeaders()
+    results = []
+    for size in sizes:
+        results.append(runBenchmark(workDirectory,size,errorRate,format,seed,processes,headers,keep))
+    for aline in summary(results):
+        addMsgAndPrint(aline)
+    outf = open(os.path.join(workDirectory,'benchmark.json'),'w')
+    try:
+        json.dump({'version':versionString,'date':time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'errorRate':errorRate,'format':format,'seed':seed,'processes':processes,
+                   'results':results},outf,indent=2,sort_keys=True)
+    finally:
+        outf.close()
+    if [r for r in results if r['problems']]:
+        sys.exit(1)
@@ -0,0 +1,79 @@
+# NCGMP09v1.1_CheckIdCollisions.py
+#   Lists _ID values that occur in more than one of a set of NCGMP09
+#   databases, as happens when quadrangles are merged into one
+#   compilation, with the database and table of each occurrence (see
+#   NCGMP09v11_IdCollisions).
+#
+#   Usage:
+#     NCGMP09v1.1_CheckIdCollisions.py <database or folder> [...] [name=value ...]
+#   A folder stands for all the databases in it and its subfolders.
+#   Databases are file or personal geodatabases (need arcpy) or SQLite
+#   (.sqlite) or GeoPackage (.gpkg) copies.
+#   Options:
+#     output=<file>        report file. Default is idCollisions.txt in the
+#                          directory of the first argument
+#     bloom=true           read the databases twice, the first time to fill
+#                          a Bloom filter, so that only _IDs that may
+#                          collide are written to temporary files
+#     bloomErrorRate=0.01  false-positive rate of the Bloom filters
+#     within=true          also list _IDs repeated within a single database
+#     partitionSize=500000 _IDs held in memory at once
+#     tempDirectory=<dir>  where to write temporary files
+
+import sys, os.path
+import NCGMP09v11_IdCollisions as IdCollisions
+import NCGMP09v11_BatchValidate as BatchValidate
+import NCGMP09v11_Validator as Validator
+
+versionString = 'NCGMP09v1.1_CheckIdCollisions.py, version of 17 October 2026'
+
+def addMsgAndPrint(msg):
+    print msg
+
+def isTrue(options,name):
+    return options.get(name,'false').lower() in ('true','yes','1')
+
+if __name__ == '__main__':
+    databases = []
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+        elif arg.strip() not in ('','#'):
+            path = os.path.abspath(arg)
+            extension = os.path.splitext(path)[1].lower()
+            if extension in Validator.geodatabaseExtensions+Validator.sqliteExtensions:
+                databases.append(path)
+            elif os.path.isdir(path):
+                databases = databases+BatchValidate.findDatabases(path,Validator.geodatabaseExtensions+Validator.sqliteExtensions)
+            else:
+                addMsgAndPrint('  Object '+arg+' is not a database or folder')
+                sys.exit(1)
+    if not databases:
+        addMsgAndPrint('Usage: NCGMP09v1.1_CheckIdCollisions.py <database or folder> [...] [name=value ...]')
+        sys.exit(1)
+    for database in databases:
+        if not os.path.exists(database):
+            addMsgAndPrint('  Object '+database+' does not exist')
+            sys.exit(1)
+    firstArgument = [arg for arg in sys.argv[1:] if arg.find('=') < 0][0]
+    outFile = options.get('output',os.path.join(os.path.dirname(os.path.abspath(firstArgument)),'idCollisions.txt'))
+    addMsgAndPrint('  '+versionString)
+    addMsgAndPrint('  checking '+str(len(databases))+' databases')
+    search = IdCollisions.CollisionSearch(databases,
+                                          bloom=isTrue(options,'bloom'),
+                                          withinDatabase=isTrue(options,'within'),
+                                          partitionSize=int(options.get('partitionsize',IdCollisions.partitionSize)),
+                                          bloomErrorRate=float(options.get('bloomerrorrate',IdCollisions.bloomErrorRate)),
+                                          tempDirectory=options.get('tempdirectory'),
+                                          progress=addMsgAndPrint)
+    outfl = open(outFile,'w')
+    try:
+        for aline in IdCollisions.reportLines(search):
+            outfl.write(aline.encode('utf-8')+'\n')
+    finally:
+        outfl.close()
+    addMsgAndPrint('  '+str(search.collisions)+' colliding _IDs, %.1f seconds' % search.seconds)
+    addMsgAndPrint('  report written to '+outFile)
+    addMsgAndPrint('  DONE')
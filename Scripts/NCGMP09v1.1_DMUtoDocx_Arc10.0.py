@@ -14,8 +14,9 @@ Arguments
 
 import sys, os.path, arcpy
 from docxModified import *
+import NCGMP09v11_HierarchyKey as HierarchyKey
 
-versionString = 'NCGMP09v1.1_DMUtoDocx_Arc10.0.py, version of 17 September 2012'
+versionString = 'NCGMP09v1.1_DMUtoDocx_Arc10.0.py, version of 17 October 2026'
 print versionString
 
 debug = False
@@ -50,6 +51,14 @@ def isNotBlank(thing):
     else:
         return False
     
+dmuFields = ('HierarchyKey','ParagraphStyle','MapUnit','Label','Name','Age','Description')
+
+class DmuRow:
+    # values of one row of DescriptionOfMapUnits, kept after the cursor moves on
+    def __init__(self,row):
+        for field in dmuFields:
+            setattr(self,field,row.getValue(field))
+
 def isKnownStyle(pStyle):
     if pStyle == 'DMUHeadnote' or pStyle.find('DMU-Heading') > -1 or pStyle.find('DMUUnit') > -1:
         return True
@@ -84,16 +93,23 @@ DMU has many rows
      Each paragraph is composed of one or more runs, each of which _may_ include
      markup tags
 
-We sort DMU on HierarchyKey and then step through the rows, constructing rowtext w/ markup
-  according to row.paragraphStyle.
+We order DMU by HierarchyKey, as a tree (NCGMP09v11_HierarchyKey: 1-10 follows 1-9,
+  although it sorts before it as text), and then step through the rows, constructing
+  rowtext w/ markup according to row.paragraphStyle.
 We then divide the newly-built rowtext into paragraphs.
 For each paragraph, we 
 
 """
 
 addMsgAndPrint('Getting DMU rows and creating output paragraphs')
-dmuRows = arcpy.SearchCursor('DescriptionOfMapUnits',"","","",'HierarchyKey')
-for row in dmuRows:
+dmuTree = HierarchyKey.HierarchyTree()
+for row in arcpy.SearchCursor('DescriptionOfMapUnits'):
+    dmuTree.add(row.HierarchyKey,DmuRow(row))
+for hKey in dmuTree.widthErrors():
+    addMsgAndPrint('  HierarchyKey '+hKey+' has a fragment of unusual width',1)
+for aline in dmuTree.treeErrors():
+    addMsgAndPrint('  HierarchyKey '+aline,1)
+for hKey, row in dmuTree.ordered():
     rowText = ''
     if isNotBlank(row.HierarchyKey) and isKnownStyle(row.ParagraphStyle):   
         addMsgAndPrint('  '+ str(row.HierarchyKey)+' '+str(row.ParagraphStyle))
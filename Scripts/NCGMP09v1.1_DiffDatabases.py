@@ -0,0 +1,81 @@
+# NCGMP09v1.1_DiffDatabases.py
+#   Reports what changed between two versions of an NCGMP09 database:
+#   tables and feature classes added, deleted or moved between feature
+#   datasets; fields added, deleted or changed; and rows added, deleted or
+#   modified, matched by _ID (see NCGMP09v11_DatabaseDiff).
+#
+#   Usage:
+#     NCGMP09v1.1_DiffDatabases.py <oldDatabase> <newDatabase> [outputWorkspace] [name=value ...]
+#   and writes <newDatabaseName>-diff.txt in outputWorkspace (by default,
+#   the directory of newDatabase). Databases are file or personal
+#   geodatabases (need arcpy) or SQLite (.sqlite) or GeoPackage (.gpkg)
+#   copies.
+#   Options:
+#     maxRows=20          rows listed for each kind of difference in a table
+#     runSize=100000      rows sorted in memory at once; more are sorted in
+#                         temporary files
+#     tempDirectory=<dir> where to write the temporary files
+
+import sys, os.path, time
+import NCGMP09v11_DatabaseDiff as DatabaseDiff
+
+versionString = 'NCGMP09v1.1_DiffDatabases.py, version of 17 October 2026'
+
+def addMsgAndPrint(msg):
+    print msg
+
+def validInput(database):
+    extension = os.path.splitext(database)[1].lower()
+    if not os.path.exists(database):
+        addMsgAndPrint('  Object '+database+' does not exist')
+        return False
+    if extension in DatabaseDiff.sqliteExtensions:
+        return True
+    if extension in ('.gdb','.mdb'):
+        try:
+            import arcpy
+            return True
+        except ImportError:
+            addMsgAndPrint('  Reading '+database+' needs arcpy')
+            return False
+    addMsgAndPrint('  Object '+database+' is not a geodatabase')
+    return False
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        addMsgAndPrint('Usage: NCGMP09v1.1_DiffDatabases.py <oldDatabase> <newDatabase> [outputWorkspace] [name=value ...]')
+        sys.exit(1)
+    oldDatabase = os.path.abspath(sys.argv[1])
+    newDatabase = os.path.abspath(sys.argv[2])
+    outputWorkspace = os.path.dirname(newDatabase)
+    options = {}
+    for arg in sys.argv[3:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+        elif arg.strip() not in ('','#'):
+            outputWorkspace = arg
+    maxRows = int(options.get('maxrows',20))
+    runSize = int(options.get('runsize',DatabaseDiff.runSize))
+    tempDirectory = options.get('tempdirectory')
+    if not (validInput(oldDatabase) and validInput(newDatabase)):
+        sys.exit(1)
+    outFile = os.path.join(outputWorkspace,os.path.basename(newDatabase)+'-diff.txt')
+    addMsgAndPrint('  '+versionString)
+    addMsgAndPrint('  comparing '+newDatabase)
+    addMsgAndPrint('    with '+oldDatabase)
+    startTime = time.time()
+    def progress(table):
+        addMsgAndPrint('    '+table)
+    datasetLines, tableDiffs = DatabaseDiff.diffDatabases(DatabaseDiff.openReader(oldDatabase),
+                                                          DatabaseDiff.openReader(newDatabase),
+                                                          maxRows,runSize,tempDirectory,progress)
+    outfl = open(outFile,'w')
+    try:
+        for aline in DatabaseDiff.reportLines(oldDatabase,newDatabase,datasetLines,tableDiffs):
+            outfl.write(aline.encode('utf-8')+'\n')
+    finally:
+        outfl.close()
+    addMsgAndPrint('  %.1f seconds' % (time.time()-startTime))
+    addMsgAndPrint('  differences written to '+outFile)
+    addMsgAndPrint('  DONE')
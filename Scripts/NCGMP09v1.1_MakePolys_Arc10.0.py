@@ -8,7 +8,7 @@
 #	USGS, Seattle
 #
 #  Usage:
-#  prompt> NCGMP09v1.1_MakePolys_Arc10.0.py <geodatabaseName> <saveMUPs> 
+#  prompt> NCGMP09v1.1_MakePolys_Arc10.0.py <geodatabaseName> <saveMUPs> <PolyLayer> <incremental> <tiles>
 #
 #	<geodatabaseName> can be either a personal geodatabase or a file 
 #	geodatabase, .mdb or .gdb. The filename extension must be included. 
@@ -23,6 +23,19 @@
 #       session. It is saved, deleted, and then re-added to the map layout to avoid
 #       locking problems when running MakePolys during an ArcMap session. 
 #
+#       <incremental> (optional, default is FALSE) is a flag (true or false) that
+#       causes MapUnitPolys to be rebuilt only where ContactsAndFaults have
+#       changed since the last incremental rebuild (see NCGMP09v11_PolyBuilder).
+#       Other polygons are not touched and keep their _IDs and attributes.
+#       The first incremental rebuild of a database rebuilds all polygons.
+#
+#       <tiles> (optional, default is 1) is the number of tiles a full rebuild
+#       cuts the map into, for statewide maps. If more than 1, MapUnitPolys are
+#       rebuilt by NCGMP09v11_PolyBuilder rather than FeatureToPolygon, and the
+#       tiles are polygonized in parallel, one worker process per processor
+#       (see NCGMP09v11_TiledPolygonizer). The polygons are the same as from
+#       one tile.
+#
 #	MapUnitPolys will be rebuilt from ContactsAndFaults (except for concealed
 #	lines), with polygon attributes obtained from existing polygons in
 #	MapUnitPolys and MapUnitPoints.
@@ -34,7 +47,7 @@
 #	     blankPolys
 #	     excessContacts
 #	This code also writes (overwrites) and deletes feature classes
-#	   xxPolys, templabels, and xxLabels
+#	   templabels
 #
 #       Assumes field IsConcealed in ContactsAndFaults has values of 'Y' and 'N'
 #
@@ -43,6 +56,10 @@
 
 
 import arcpy, sys, os.path
+import NCGMP09v11_PolyBuilder as PolyBuilder
+import NCGMP09v11_LabelIndex as LabelIndex
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_TableScanner as TableScanner
 
 debug = False
 
@@ -111,6 +128,28 @@ def findLyr(lname):
                 return [lyr, df, refLyr, insertPos]
 
 
+def oidQueries(fc,oids):
+    # where clauses selecting the rows of fc whose ObjectIDs are in oids,
+    #   TableScanner.oidBatch ObjectIDs to a clause, as a longer IN (...)
+    #   can be too long for a personal geodatabase
+    oidName = arcpy.AddFieldDelimiters(fc,arcpy.Describe(fc).OIDFieldName)
+    oids = sorted(oids)
+    if not oids:
+        return [oidName+' < 0']
+    return [oidName+' IN ('+','.join([str(oid) for oid in oids[i:i+TableScanner.oidBatch]])+')'
+            for i in range(0,len(oids),TableScanner.oidBatch)]
+
+def selectByOids(fc,outFc,oids):
+    # Select_analysis of the rows of fc whose ObjectIDs are in oids, one
+    #   batch at a time, appended through xxPolys
+    queries = oidQueries(fc,oids)
+    arcpy.Select_analysis(fc,outFc,queries[0])
+    for query in queries[1:]:
+        testAndDelete(xxPolys)
+        arcpy.Select_analysis(fc,xxPolys,query)
+        arcpy.Append_management(xxPolys,outFc,'NO_TEST')
+    testAndDelete(xxPolys)
+
 def main(dbfds):
     arcpy.env.workspace = dbfds
   #try:
@@ -243,84 +282,61 @@ def main(dbfds):
         except:
             addMsgAndPrint(" arcpy.Copy_management(mup,oldPolys) failed. Maybe you need to close ArcMap?")
             raise arcpy.ExecuteError
-    arcpy.Delete_management(mupPath)
-
-    # rebuild polys
-    addMsgAndPrint('  creating new MapUnitPolys from ContactsAndFaults w/o concealed lines')
-    arcpy.FeatureToPolygon_management('cafLayer',mup,'','ATTRIBUTES',tempLabels)
+    if incremental or tiles > 1:
+        # rebuild polys where contacts have changed, or in tiles
+        if incremental:
+            addMsgAndPrint('  updating '+mup+' from '+caf+' w/o concealed lines where they have changed')
+        else:
+            addMsgAndPrint('  rebuilding '+mup+' from '+caf+' w/o concealed lines in '+str(tiles)+' tiles')
+        builder = PolyBuilder.rebuild(dbfds,mup,caf,'MapUnitPoints',incremental=incremental,
+                                      progress=addMsgAndPrint,tiles=tiles)
+        for aline in builder.reportLines():
+            addMsgAndPrint(aline)
+    else:
+        arcpy.Delete_management(mupPath)
 
-    addMsgAndPrint('  intersecting (IDENTITY) points and polys...')
-    arcpy.Identity_analysis(tempLabels, mup, xxLabels)
+        # rebuild polys
+        addMsgAndPrint('  creating new MapUnitPolys from ContactsAndFaults w/o concealed lines')
+        arcpy.FeatureToPolygon_management('cafLayer',mup,'','ATTRIBUTES',tempLabels)
 
+    # find labels in each polygon (NCGMP09v11_LabelIndex) rather than
+    #   IDENTITYing points and polys and sorting the result
+    addMsgAndPrint('  locating label points in polygons...')
     FIDpolys = 'FID_'+mup
-    #FIDpoints = 'FID_'+tempLabels
-    FieldList = ''
-    SortFields = FIDpolys+' A'
-    excessPoints = []
-    badPolyList = []
-    ## this next section (~24 lines) might be replaced by select MUP <> MUP_1,
-    ##   asel IdCon <> IdCon_1, etc. and then listing the selected set
+    polygons = []
+    for oid, blob in arcpy.da.SearchCursor(mup,['OID@','SHAPE@WKB']):
+        polygons.append([oid,Geometry.decodeShape(blob)[1]])
+    labelFields = ['MapUnit','IdentityConfidence','DataSourceID',mup+'_ID']
+    labelValues = {}
+    labelPoints = []
+    for row in arcpy.da.SearchCursor(tempLabels,['OID@','SHAPE@XY']+labelFields):
+        labelPoints.append([row[0],row[1]])
+        labelValues[row[0]] = [str(v) for v in row[2:]]
+    polygonLabels, unplaced = LabelIndex.assignLabels(polygons,labelPoints)
+
     addMsgAndPrint('  finding mapunit polygons with conflicting label points')
-    rows = arcpy.SearchCursor(xxLabels,"","","",SortFields)
-    lastPoly = -2
-    lastMU = ''
-    lastIdCon = ''
-    lastDataSource = ''
-    lastMUPID = ''
-    row = rows.next()
-    while row:
-        if row.getValue(FIDpolys) == lastPoly:
-            if str(row.getValue('MapUnit')) <> lastMU or \
-               str(row.getValue('IdentityConfidence')) <> lastIdCon or \
-               str(row.getValue('DataSourceID')) <> lastDataSource or \
-               str(row.getValue(mup+'_ID')) <> lastMUPID:
-                   badPolyList.append(row.getValue(FIDpolys))
-        else:
-            lastPoly = row.getValue(FIDpolys)
-            lastMU = str(row.getValue('MapUnit'))
-            lastIdCon = str(row.getValue('IdentityConfidence'))
-            lastDataSource = str(row.getValue('DataSourceID'))
-            lastMUPID = str(row.getValue(mup+'_ID'))
-        row = rows.next()
-    badPolyList = list(set(badPolyList))
-    ### end section that could be replaced
-    addMsgAndPrint('  copying MapUnitPolys to '+xxPolys)
-    
-    #ET - as described above, we need full paths for copy_management to work
-    #I think - for some reason - this is because ArcMap is open
-    srcPath = os.path.join(arcpy.env.workspace, mup)
-    desPath = os.path.join(arcpy.env.workspace, xxPolys)
-    arcpy.Copy_management(srcPath, desPath)
-    
-    OidName = arcpy.Describe(xxPolys).OIDFieldName
-    addMsgAndPrint('  adding field MultipleLabels to '+badPolys)
-    arcpy.AddField_management(xxPolys,'MultipleLabels','TEXT',default,default,5)
-    addMsgAndPrint('  adding field MultipleLabels to '+badLabels)
-    arcpy.AddField_management(xxLabels,'MultipleLabels','TEXT',default,default,5)
-    addMsgAndPrint('  iterating through '+xxPolys)
-    rows = arcpy.UpdateCursor(xxPolys)
-    row = rows.next()
-    while row:
-        if row.getValue(OidName)in badPolyList:
-            row.setValue('MultipleLabels','YES')
-            rows.updateRow(row)
-        row = rows.next()
-    addMsgAndPrint('  iterating through '+xxLabels)
-    rows = arcpy.UpdateCursor(xxLabels)
-    row = rows.next()
-    while row:
-        if row.getValue(FIDpolys) in badPolyList:
-            row.setValue('MultipleLabels','YES')
-            rows.updateRow(row)
-        row = rows.next()
-
-    query = arcpy.AddFieldDelimiters(dbfds,'MultipleLabels') + " = 'YES'"
+    badPolySet, badLabelPolys = LabelIndex.labelConflicts(polygonLabels,labelValues)
+
+    # select flagged polys and labels straight into the error feature classes
     addMsgAndPrint('  selecting multi-label polys to '+badPolys)
     testAndDelete(badPolys)
-    arcpy.Select_analysis(xxPolys,badPolys,query)
+    selectByOids(mup,badPolys,badPolySet)
+    addMsgAndPrint('  adding field MultipleLabels to '+badPolys)
+    arcpy.AddField_management(badPolys,'MultipleLabels','TEXT',default,default,5)
+    arcpy.CalculateField_management(badPolys,'MultipleLabels',"'YES'",'PYTHON')
+    addMsgAndPrint('  adding fields MultipleLabels and '+FIDpolys+' to '+tempLabels)
+    arcpy.AddField_management(tempLabels,'MultipleLabels','TEXT',default,default,5)
+    arcpy.AddField_management(tempLabels,FIDpolys,'LONG')
+    if badLabelPolys:
+        for labelQuery in oidQueries(tempLabels,badLabelPolys):
+            cursor = arcpy.da.UpdateCursor(tempLabels,['OID@','MultipleLabels',FIDpolys],labelQuery)
+            for oid, multiple, fid in cursor:
+                cursor.updateRow([oid,'YES',badLabelPolys[oid]])
+            del cursor
     addMsgAndPrint('  selecting multiple labels to '+badLabels)
     testAndDelete(badLabels)
-    arcpy.Select_analysis(xxLabels,badLabels,query)
+    query = arcpy.AddFieldDelimiters(tempLabels,'MultipleLabels') + " = 'YES'"
+    arcpy.Select_analysis(tempLabels,badLabels,query)
     query = arcpy.AddFieldDelimiters(dbfds,'MapUnit') + " = ''"
     addMsgAndPrint('  selecting unlabeled polys to '+blankPolys)
     testAndDelete(blankPolys)
@@ -374,7 +390,6 @@ def main(dbfds):
 
     # cleanup
     addMsgAndPrint('  cleaning up')
-    del row, rows
     for fc in (xxPolys,xxLabels,tempLabels,cafLayer,mupLayer2):
         testAndDelete(fc)
         
@@ -400,16 +415,22 @@ def main(dbfds):
    
 
 ### START HERE ###
-addMsgAndPrint(versionString)
-if len(sys.argv) > 2 and sys.argv[2].upper() == 'FALSE':
-        saveMUP = False
-else:
-        saveMUP = True
-dbfds = sys.argv[1]
-addMsgAndPrint('  testing for schema lock...')
-if arcpy.TestSchemaLock(dbfds):
-        main(dbfds)
-else:
-        addMsgAndPrint('  '+sys.argv[1]+' is locked. Stop editing (ArcMap) or close ArcCatalog?')
-        sys.exit()
+# guarded, as tile worker processes import this script again on Windows
+if __name__ == '__main__':
+    addMsgAndPrint(versionString)
+    if len(sys.argv) > 2 and sys.argv[2].upper() == 'FALSE':
+            saveMUP = False
+    else:
+            saveMUP = True
+    incremental = len(sys.argv) > 4 and sys.argv[4].upper() == 'TRUE'
+    tiles = 1
+    if len(sys.argv) > 5 and sys.argv[5].strip() not in ('','#'):
+            tiles = int(sys.argv[5])
+    dbfds = sys.argv[1]
+    addMsgAndPrint('  testing for schema lock...')
+    if arcpy.TestSchemaLock(dbfds):
+            main(dbfds)
+    else:
+            addMsgAndPrint('  '+sys.argv[1]+' is locked. Stop editing (ArcMap) or close ArcCatalog?')
+            sys.exit()
 
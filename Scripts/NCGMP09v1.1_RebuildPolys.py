@@ -0,0 +1,80 @@
+# NCGMP09v1.1_RebuildPolys.py
+#   Rebuilds MapUnitPolys from the ContactsAndFaults that are not concealed,
+#   only where lines have changed since the last rebuild (see
+#   NCGMP09v11_PolyBuilder). Polygons away from the changes keep their
+#   ObjectIDs, _IDs and attributes; new polygons take theirs from the
+#   polygons they replace and from MapUnitPoints, as in
+#   NCGMP09v1.1_MakePolys. The first rebuild of a database is a full one.
+#
+#   Usage:
+#     NCGMP09v1.1_RebuildPolys.py <database> [name=value ...]
+#   <database> is a file or personal geodatabase, or a feature dataset in
+#   one (needs arcpy), or a SQLite (.sqlite) or GeoPackage (.gpkg) copy.
+#   Options:
+#     polygons=MapUnitPolys     feature class rebuilt
+#     lines=ContactsAndFaults   feature class of the lines that bound it
+#     points=MapUnitPoints      feature class of label points
+#     incremental=true          false to rebuild all polygons
+#     tolerance=<distance>      distance within which line ends and
+#                               crossings are merged. Default is a
+#                               billionth of the size of the map; an
+#                               incremental rebuild uses that of the last
+#                               full one
+#     tiles=1                   number of tiles a full rebuild polygonizes
+#                               the map in, for statewide maps (see
+#                               NCGMP09v11_TiledPolygonizer)
+#     processes=<n>             worker processes for tiles. Default is one
+#                               per processor
+#   Exits with status 1 if the database does not exist or the rebuild fails.
+
+import sys, os.path
+import NCGMP09v11_PolyBuilder as PolyBuilder
+import NCGMP09v11_Validator as Validator
+
+versionString = 'NCGMP09v1.1_RebuildPolys.py, version of 17 October 2026'
+
+def addMsgAndPrint(msg):
+    print msg
+
+if __name__ == '__main__':
+    args = []
+    options = {}
+    for arg in sys.argv[1:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+        elif arg.strip() not in ('','#'):
+            args.append(arg)
+    if len(args) <> 1:
+        addMsgAndPrint('Usage: NCGMP09v1.1_RebuildPolys.py <database> [name=value ...]')
+        sys.exit(1)
+    database = os.path.abspath(args[0])
+    geodatabase = os.path.dirname(database)
+    if not os.path.exists(database) and not (os.path.exists(geodatabase) and
+            os.path.splitext(geodatabase)[1].lower() in Validator.geodatabaseExtensions):
+        addMsgAndPrint('  Object '+args[0]+' does not exist')
+        sys.exit(1)
+    tolerance = None
+    if 'tolerance' in options:
+        tolerance = float(options['tolerance'])
+    processes = None
+    if 'processes' in options:
+        processes = int(options['processes'])
+    addMsgAndPrint('  '+versionString)
+    try:
+        builder = PolyBuilder.rebuild(database,
+                                      polygonClass=options.get('polygons','MapUnitPolys'),
+                                      lineClass=options.get('lines','ContactsAndFaults'),
+                                      pointClass=options.get('points','MapUnitPoints'),
+                                      incremental=options.get('incremental','true').lower() in ('true','yes','1'),
+                                      tolerance=tolerance,
+                                      progress=addMsgAndPrint,
+                                      tiles=int(options.get('tiles',1)),
+                                      processes=processes)
+    except Exception, msg:
+        addMsgAndPrint('  Rebuild failed: '+str(msg))
+        sys.exit(1)
+    for aline in builder.reportLines():
+        addMsgAndPrint(aline)
+    addMsgAndPrint('  state written to '+builder.stateFile)
+    addMsgAndPrint('  DONE')
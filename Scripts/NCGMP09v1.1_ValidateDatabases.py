@@ -0,0 +1,109 @@
+# NCGMP09v1.1_ValidateDatabases.py
+#   Validates every geodatabase under a folder, as
+#   NCGMP09v1.1_ValidateDatabase_Arc10.1 does for one, several at once
+#   (see NCGMP09v11_BatchValidate).
+#
+#   Usage:
+#     NCGMP09v1.1_ValidateDatabases.py <rootFolder> [outputWorkspace] [name=value ...]
+#   finds the file (.gdb) and personal (.mdb) geodatabases in rootFolder
+#   and its subfolders and writes <geodatabaseName>-conformance.txt for
+#   each, next to it or, if outputWorkspace is given, at the same relative
+#   path within outputWorkspace. Then writes a summary table, one row per
+#   database and one column per kind of error, to
+#   <rootFolderName>-conformance-summary.csv in outputWorkspace (by
+#   default, the parent of rootFolder).
+#   Options:
+#     processes=<n>     validate up to n databases at once. Default is the
+#                       number of processors
+#     timeBudget=<sec>  stop validating a database after this many seconds;
+#                       it is reported as timed out. Default is no limit
+#     sqlite=true       also validate SQLite (.sqlite) and GeoPackage (.gpkg)
+#                       copies
+#     cache=false       do not use the <geodatabaseName>-conformance.cache
+#                       of each database
+#     checks=<a,b,..>, geometry=false, failfast=true
+#                       as for NCGMP09v1.1_ValidateDatabase_Arc10.1
+#     summary=<file>    write the summary table to file
+#   Exits with status 1 if any database has errors, could not be
+#   validated, or ran out of time. Extensions to the schema and the listing
+#   of units present in map, DMU, CMU and cross sections are reported in
+#   the summary but are not errors.
+
+import sys, os.path, time
+import NCGMP09v11_BatchValidate as BatchValidate
+import NCGMP09v11_Validator as Validator
+
+versionString = 'NCGMP09v1.1_ValidateDatabases.py, version of 17 October 2026'
+
+def addMsgAndPrint(msg):
+    print msg
+
+def parseOptions(args):
+    # optional arguments have form name=value; returns dictionary of
+    #   options and outputWorkspace, if given
+    options = {}
+    outputWorkspace = None
+    for arg in args:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+        elif arg.strip() not in ('','#'):
+            outputWorkspace = arg
+    return options, outputWorkspace
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        addMsgAndPrint('Usage: NCGMP09v1.1_ValidateDatabases.py <rootFolder> [outputWorkspace] [name=value ...]')
+        sys.exit(1)
+    root = os.path.abspath(sys.argv[1])
+    options, outputWorkspace = parseOptions(sys.argv[2:])
+    if not os.path.isdir(root):
+        addMsgAndPrint('  Folder '+root+' does not exist')
+        sys.exit(1)
+    import multiprocessing
+    processes = int(options.get('processes',multiprocessing.cpu_count()))
+    timeBudget = options.get('timebudget')
+    if timeBudget <> None:
+        timeBudget = float(timeBudget)
+    useCache = options.get('cache','true').lower() not in ('false','no','0')
+    extensions = Validator.geodatabaseExtensions
+    if options.get('sqlite','false').lower() in ('true','yes','1'):
+        extensions = extensions+Validator.sqliteExtensions
+    validatorOptions = {}
+    for name in ('checks','geometry','failfast'):
+        if name in options:
+            validatorOptions[name] = options[name]
+    try:
+        # check the names of checks before starting any process
+        Validator.parseChecks(validatorOptions)
+    except ValueError, msg:
+        addMsgAndPrint('  '+str(msg))
+        sys.exit(1)
+    summaryDirectory = outputWorkspace
+    if summaryDirectory == None:
+        summaryDirectory = os.path.dirname(root)
+    summaryFile = options.get('summary',os.path.join(summaryDirectory,os.path.basename(root)+'-conformance-summary.csv'))
+
+    addMsgAndPrint('  '+versionString)
+    databases = BatchValidate.findDatabases(root,extensions)
+    addMsgAndPrint('  '+str(len(databases))+' databases in '+root)
+    if not databases:
+        sys.exit(0)
+    addMsgAndPrint('  validating with '+str(processes)+' processes')
+    jobs = [[database,BatchValidate.reportFileName(database,root,outputWorkspace)] for database in databases]
+    startTime = time.time()
+    results = {}
+    for result in BatchValidate.validateDatabases(jobs,validatorOptions,processes,timeBudget,useCache):
+        results[result.database] = result
+        if result.status == 'done':
+            addMsgAndPrint('    %-40s %8.1f sec  %6i errors' % (os.path.relpath(result.database,root),result.seconds,result.errors()))
+        else:
+            addMsgAndPrint('    %-40s %8.1f sec  %s: %s' % (os.path.relpath(result.database,root),result.seconds,
+                                                         result.status,result.message))
+    results = [results[database] for database in databases]
+    BatchValidate.writeSummary(summaryFile,results,root)
+    addMsgAndPrint('  %.1f seconds' % (time.time()-startTime))
+    addMsgAndPrint('  summary written to '+summaryFile)
+    addMsgAndPrint('  DONE')
+    if [result for result in results if result.status <> 'done' or result.errors() > 0]:
+        sys.exit(1)
@@ -0,0 +1,105 @@
+# NCGMP09v11_AttributeGraph.py
+#   Links of ExtendedAttributes, checked in one pass, for
+#   NCGMP09v1.1_ValidateDatabase.
+#
+#   Each row of ExtendedAttributes is an edge from the row that owns it
+#   (OwnerID) to, optionally, the row that holds its value (ValueLinkID),
+#   most often an event in GeologicEvents. The validator once loaded both
+#   columns into one list, looked each value up, and loaded ValueLinkID a
+#   second time to match GeologicEvents, without reporting the result.
+#   Here ExtendedAttributes is read once, as (OBJECTID, OwnerID,
+#   ValueLinkID) rows; each ID is looked up in a hashed container of all
+#   _IDs (an IdRegistry), and the GeologicEvents cited are counted in a
+#   dict. Reported, in ErrorAggregators keyed by validator report section:
+#     danglingOwnerIds      OwnerIDs that are not an _ID of any table
+#     danglingValueLinks    ValueLinkIDs that are not an _ID of any table
+#     isolatedAttributes    rows linked to nothing: neither OwnerID nor
+#                           ValueLinkID is an _ID
+#     unusedGeologicEvents  events that no ValueLinkID cites
+#   with the OBJECTIDs of example rows.
+#
+#   IDs may instead be looked up elsewhere (e.g., by SQL, see
+#   NCGMP09v11_SqlValidate) and passed to addLinks.
+#
+#   Does not import arcpy.
+
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+
+versionString = 'NCGMP09v11_AttributeGraph.py, version of 17 October 2026'
+
+sectionNames = ('danglingOwnerIds','danglingValueLinks','isolatedAttributes','unusedGeologicEvents')
+attributeFields = ('OwnerID','ValueLinkID')
+
+class AttributeGraph:
+    def __init__(self,ids=None):
+        # ids is a container of all _IDs, e.g., an IdRegistry
+        self.ids = ids
+        self.events = {}    # GeologicEvents_ID -> number of ValueLinkIDs citing it
+        self.nLinks = 0     # rows of ExtendedAttributes seen
+        self.sections = {}
+        for name in sectionNames:
+            self.sections[name] = ErrorAggregator.ErrorAggregator('',countWord='rows',examplesLabel='OBJECTID')
+
+    def error(self,name,aline):
+        self.sections[name].add(aline)
+
+    def checkFields(self,attributeFieldNames,eventFieldNames):
+        # field names of ExtendedAttributes and of GeologicEvents, None for
+        #   an absent table. Reports missing fields; returns
+        #   [can read attributes, can read events]
+        readAttributes = readEvents = False
+        if eventFieldNames <> None:
+            readEvents = 'GeologicEvents_ID' in eventFieldNames
+            if not readEvents:
+                self.error('unusedGeologicEvents','    Error: did not find field GeologicEvents_ID in table GeologicEvents')
+        if attributeFieldNames <> None:
+            readAttributes = True
+            if not 'OwnerID' in attributeFieldNames:
+                readAttributes = False
+                self.error('danglingOwnerIds','    Error: did not find field OwnerID in table ExtendedAttributes')
+            if not 'ValueLinkID' in attributeFieldNames:
+                readAttributes = False
+                self.error('danglingValueLinks','    Error: did not find field ValueLinkID in table ExtendedAttributes')
+                self.error('unusedGeologicEvents','    Error: did not find field ValueLinkID in table ExtendedAttributes')
+        return [readAttributes,readEvents]
+
+    def resolves(self,anID):
+        if anID in self.ids:
+            return True
+        # null _IDs were once compared as the string 'None'
+        return anID == 'None' and None in self.ids
+
+    def addEvents(self,eventIds):
+        # GeologicEvents_ID values, read before ExtendedAttributes
+        for anID in eventIds:
+            if anID <> None:
+                self.events.setdefault(anID,0)
+
+    def addLinks(self,oid,ownerID,valueLinkID,ownerFound,valueLinkFound):
+        # one row of ExtendedAttributes. ownerFound and valueLinkFound tell
+        #   whether OwnerID and ValueLinkID are _IDs
+        self.nLinks = self.nLinks+1
+        if ownerID <> None and not ownerFound:
+            self.sections['danglingOwnerIds'].add('    '+ownerID,oid)
+        if valueLinkID <> None:
+            if not valueLinkFound:
+                self.sections['danglingValueLinks'].add('    '+valueLinkID,oid)
+            n = self.events.get(valueLinkID)
+            if n <> None:
+                self.events[valueLinkID] = n+1
+        if not (ownerID <> None and ownerFound) and not (valueLinkID <> None and valueLinkFound):
+            self.sections['isolatedAttributes'].add('    OwnerID %s, ValueLinkID %s' % (ownerID,valueLinkID),oid)
+
+    def addAttributes(self,rows):
+        # rows of (OBJECTID, OwnerID, ValueLinkID), IDs looked up in self.ids
+        for oid, ownerID, valueLinkID in rows:
+            self.addLinks(oid,ownerID,valueLinkID,
+                          ownerID <> None and self.resolves(ownerID),
+                          valueLinkID <> None and self.resolves(valueLinkID))
+
+    def finish(self):
+        # reports events not cited; call after all rows are added
+        for anID, n in self.events.iteritems():
+            if n == 0:
+                self.sections['unusedGeologicEvents'].add('    '+anID)
+        return self.sections
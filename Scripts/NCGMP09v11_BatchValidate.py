@@ -0,0 +1,171 @@
+# NCGMP09v11_BatchValidate.py
+#   Validates many databases at once, for NCGMP09v1.1_ValidateDatabases:
+#   finds the geodatabases under a folder, runs NCGMP09v11_Validator on
+#   each in its own process, several at a time, writes the conformance
+#   report of each, and tabulates errorCounts() of every database.
+#
+#   Each database gets a new process rather than a worker from a pool, so
+#   that a database that takes longer than its time budget can be stopped
+#   (terminating a process of a multiprocessing.Pool breaks the pool) and
+#   so that a crash in one database is reported as such without stopping
+#   the rest. A process terminated while reading a geodatabase may leave
+#   a stale lock file in it.
+#
+#   Does not import arcpy; the worker processes do, through
+#   NCGMP09v11_Validator, when they validate a geodatabase.
+
+import os, os.path, sys, time, csv
+import NCGMP09v11_Validator as Validator
+import NCGMP09v11_ValidationCache as ValidationCache
+
+versionString = 'NCGMP09v11_BatchValidate.py, version of 17 October 2026'
+
+# columns of the summary, in report order; a database checked with fewer
+#   checks leaves the others blank
+summaryCategories = (['schemaErrors','schemaExtensions']+
+                     [name for name, header, arguments in Validator.contentSectionDefinitions]+
+                     ['allBadNulls'])
+
+# categories that are reported but are not errors: extensions to the
+#   schema, and the listing of units on map, DMU, CMU and cross sections
+informationalCategories = ('schemaExtensions','equivalenceErrors')
+
+pollInterval = 0.2  # seconds between looks at running processes
+
+def findDatabases(root,extensions=Validator.geodatabaseExtensions):
+    # sorted paths of databases under root. A file geodatabase is a folder
+    #   and is not searched further
+    databases = []
+    for dirPath, dirNames, fileNames in os.walk(root):
+        for name in list(dirNames):
+            if os.path.splitext(name)[1].lower() in extensions:
+                databases.append(os.path.join(dirPath,name))
+                dirNames.remove(name)
+        for name in fileNames:
+            if os.path.splitext(name)[1].lower() in extensions:
+                databases.append(os.path.join(dirPath,name))
+    databases.sort()
+    return databases
+
+def reportFileName(database,root,outputWorkspace=None):
+    # <databaseName>-conformance.txt, next to the database or, if
+    #   outputWorkspace is given, at the same relative path within it
+    directory = os.path.dirname(database)
+    if outputWorkspace <> None:
+        directory = os.path.join(outputWorkspace,os.path.relpath(directory,root))
+    return os.path.join(directory,os.path.basename(database)+'-conformance.txt')
+
+class BatchResult:
+    def __init__(self,database,reportFile,status,errorCounts=None,seconds=0.0,message=None):
+        self.database = database
+        self.reportFile = reportFile
+        self.status = status            # 'done', 'stopped' (failfast), 'timed out' or 'failed'
+        if errorCounts == None:
+            errorCounts = {}
+        self.errorCounts = errorCounts  # as ValidationResult.errorCounts()
+        self.seconds = seconds
+        self.message = message          # why the run failed, if it did
+
+    def errors(self):
+        # schema and content errors; informationalCategories are not counted
+        return sum([n for name, n in self.errorCounts.iteritems() if not name in informationalCategories])
+
+def _validateOne(database,reportFile,options,connection):
+    # worker: validates database, writes its report and sends
+    #   [status, errorCounts, seconds, message] back through connection
+    startTime = time.time()
+    try:
+        result = Validator.validate(database,options,writtenBy=versionString)
+        result.write(reportFile)
+        status = 'done'
+        if result.stopped <> None:
+            status = 'stopped'
+        connection.send([status,result.errorCounts(),time.time()-startTime,result.stopped])
+    except Exception, msg:
+        connection.send(['failed',{},time.time()-startTime,str(msg)])
+    connection.close()
+
+def validateDatabases(jobs,options=None,processes=1,timeBudget=None,useCache=True):
+    # jobs is a list of [database, reportFile]. Validates up to processes
+    #   databases at once, stopping any that runs longer than timeBudget
+    #   seconds (None: no limit). options are those of
+    #   Validator.validate; if useCache, each database has its cache file
+    #   next to its report. Yields a BatchResult as each finishes, in the
+    #   order they finish
+    import multiprocessing
+    # when run as a script tool, sys.executable is ArcMap or ArcCatalog
+    pythonExe = os.path.join(sys.exec_prefix,'python.exe')
+    if os.path.exists(pythonExe):
+        multiprocessing.set_executable(pythonExe)
+    if options == None:
+        options = {}
+    options = dict(options)
+    options['debug'] = False
+    pending = list(jobs)
+    running = []    # [database, reportFile, process, connection, startTime]
+    while pending or running:
+        while pending and len(running) < max(processes,1):
+            database, reportFile = pending.pop(0)
+            # a report left from an earlier run would be taken for this one's
+            if os.path.exists(reportFile):
+                os.remove(reportFile)
+            elif not os.path.isdir(os.path.dirname(reportFile)):
+                os.makedirs(os.path.dirname(reportFile))
+            jobOptions = dict(options)
+            if useCache:
+                jobOptions['cachefile'] = ValidationCache.cacheFileName(reportFile)
+            receiver, sender = multiprocessing.Pipe(False)
+            process = multiprocessing.Process(target=_validateOne,args=(database,reportFile,jobOptions,sender))
+            process.start()
+            sender.close()
+            running.append([database,reportFile,process,receiver,time.time()])
+        finished = []
+        for job in running:
+            database, reportFile, process, receiver, startTime = job
+            if receiver.poll():
+                try:
+                    status, counts, seconds, message = receiver.recv()
+                except EOFError:
+                    # process ended without a result
+                    process.join()
+                    status, counts, seconds, message = ['failed',{},time.time()-startTime,
+                                                        'validator exited with code '+str(process.exitcode)]
+                process.join()
+            elif timeBudget <> None and time.time()-startTime > timeBudget:
+                process.terminate()
+                process.join()
+                status, counts, seconds, message = ['timed out',{},time.time()-startTime,
+                                                    'stopped after time budget of '+str(timeBudget)+' seconds']
+            else:
+                continue
+            receiver.close()
+            finished.append(job)
+            yield BatchResult(database,reportFile,status,counts,seconds,message)
+        for job in finished:
+            running.remove(job)
+        if not finished:
+            time.sleep(pollInterval)
+
+def summaryRows(results,root=None):
+    # rows of the summary table, header first: database (relative to
+    #   root, if given), status, seconds, then the errors of each category
+    rows = [['Database','Status','Seconds']+summaryCategories+['Message']]
+    for result in results:
+        database = result.database
+        if root <> None:
+            database = os.path.relpath(database,root)
+        row = [database,result.status,'%.1f' % result.seconds]
+        for category in summaryCategories:
+            row.append(result.errorCounts.get(category,''))
+        rows.append(row+[result.message or ''])
+    return rows
+
+def writeSummary(summaryFile,results,root=None):
+    # summary table as comma-separated values
+    outfl = open(summaryFile,'wb')
+    try:
+        writer = csv.writer(outfl)
+        for row in summaryRows(results,root):
+            writer.writerow(row)
+    finally:
+        outfl.close()
@@ -0,0 +1,77 @@
+# NCGMP09v11_Catalog.py
+#   Schema catalog for NCGMP09v1.1_ValidateDatabase: describes each table
+#   and feature class once and remembers the answer for all phases.
+#
+#   Listing the workspace (ListTables, ListDatasets, ListFeatureClasses),
+#   listing fields (ListFields) and counting rows (GetCount) were repeated
+#   by several phases of the validator. On SDE and network geodatabases
+#   each call may take hundreds of milliseconds. A Catalog wraps a reader
+#   (see NCGMP09v11_TableScanner) and can be used wherever a reader is:
+#   listFields, rowCount and listWorkspace are cached, rows is passed
+#   through. Cached descriptions stay valid until invalidate() is called
+#   for the table (or for all tables), e.g. after the table is edited.
+#
+#   hits and misses count the cached and uncached requests; statistics()
+#   gives a line for debug output. A Catalog can be pickled (with its
+#   cache) to worker processes if its reader can.
+
+versionString = 'NCGMP09v11_Catalog.py, version of 17 October 2026'
+
+class Catalog:
+    def __init__(self,reader):
+        self.reader = reader
+        self.fields = {}       # table -> list of Field
+        self.rowCounts = {}    # table -> number of rows
+        self.workspaceLists = None   # [tables, fdsfc]
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self,name):
+        # anything else (e.g., oidName, connection) is the reader's
+        if name == 'reader' or name[0:2] == '__':
+            raise AttributeError(name)
+        return getattr(self.reader,name)
+
+    def _cached(self,cache,key,describe):
+        if key in cache:
+            self.hits = self.hits+1
+            return cache[key]
+        self.misses = self.misses+1
+        value = cache[key] = describe()
+        return value
+
+    def listFields(self,table):
+        return self._cached(self.fields,table,lambda: self.reader.listFields(table))
+
+    def rowCount(self,table):
+        return self._cached(self.rowCounts,table,lambda: self.reader.rowCount(table))
+
+    def listWorkspace(self):
+        # [tables, fdsfc]: names of tables, and [featureDataset, [featureClasses]]
+        if self.workspaceLists <> None:
+            self.hits = self.hits+1
+        else:
+            self.misses = self.misses+1
+            self.workspaceLists = self.reader.listWorkspace()
+        return self.workspaceLists
+
+    def rows(self,table,fieldNames):
+        return self.reader.rows(table,fieldNames)
+
+    def describe(self,table):
+        # [fields, row count] of table
+        return [self.listFields(table),self.rowCount(table)]
+
+    def invalidate(self,table=None):
+        # forget what is known of table, or, if table is None, of everything
+        if table == None:
+            self.fields = {}
+            self.rowCounts = {}
+            self.workspaceLists = None
+        else:
+            for cache in (self.fields,self.rowCounts):
+                if table in cache:
+                    del cache[table]
+
+    def statistics(self):
+        return 'catalog cache: '+str(self.hits)+' hits, '+str(self.misses)+' misses'
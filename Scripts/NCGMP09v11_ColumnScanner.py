@@ -0,0 +1,95 @@
+# NCGMP09v11_ColumnScanner.py
+#   Column-oriented check for pseudonulls, trailing spaces and leading
+#   spaces in the non-nullable String fields of a table, for
+#   NCGMP09v1.1_ValidateDatabase.
+#
+#   The validator once tested every non-nullable String field of every row
+#   in turn, inside a try/except that silently dropped the rest of the row
+#   at the first null. Here rows are gathered in batches (see
+#   TableScanner.scanTable), each column of a batch is classified at once,
+#   and every column is checked whatever the others hold. With numpy (which
+#   ships with ArcGIS) a column is converted to a fixed-width unicode array
+#   and its first, last and blank characters are found with array
+#   operations; without numpy, or for very wide (memo) columns, values are
+#   tested one by one.
+#
+#   A value is a pseudonull if it is all spaces, otherwise it may have a
+#   trailing space, a leading space, or both. Errors are counted per table,
+#   field and kind, with example OBJECTIDs, in an ErrorAggregator.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+versionString = 'NCGMP09v11_ColumnScanner.py, version of 17 October 2026'
+
+spaceErrorKinds = ('pseudonulls','trailing spaces','leading spaces')
+batchRows = 50000       # rows gathered before their columns are checked
+maxVectorLength = 1024  # wider String columns are checked value by value
+
+def _spaceFlagsPython(values):
+    pseudonulls = []
+    trailing = []
+    leading = []
+    try:
+        candidates = [i for i in xrange(len(values)) if values[i] and
+                      (values[i][-1:] == ' ' or values[i][:1] == ' ')]
+    except TypeError:    # not all strings
+        candidates = [i for i in xrange(len(values)) if values[i] and isinstance(values[i],basestring) and
+                      (values[i][-1:] == ' ' or values[i][:1] == ' ')]
+    for i in candidates:
+        value = values[i]
+        if value.strip(' ') == '':
+            pseudonulls.append(i)
+        else:
+            if value[-1:] == ' ':
+                trailing.append(i)
+            if value[:1] == ' ':
+                leading.append(i)
+    return [pseudonulls,trailing,leading]
+
+def _spaceFlagsNumpy(values):
+    n = len(values)
+    # None becomes u'None', which has no spaces
+    column = numpy.array(values,dtype=numpy.unicode_)
+    width = column.dtype.itemsize/4    # numpy unicode is UCS-4
+    if width == 0:
+        return [[],[],[]]
+    # n x width array of character codes, padded with 0
+    codes = column.view(numpy.uint32).reshape(n,width)
+    isChar = codes <> 0
+    nonEmpty = isChar.any(axis=1)
+    pseudonull = nonEmpty & ((codes == 32) | ~isChar).all(axis=1)
+    lastChar = width-1-numpy.argmax(isChar[:,::-1],axis=1)
+    trailing = nonEmpty & ~pseudonull & (codes[numpy.arange(n),lastChar] == 32)
+    leading = nonEmpty & ~pseudonull & (codes[:,0] == 32)
+    return [list(numpy.flatnonzero(flags)) for flags in (pseudonull,trailing,leading)]
+
+def spaceFlags(values,length=0):
+    # values is a sequence of the values of one String column (None allowed),
+    #   length its declared width. Returns [pseudonulls, trailing, leading],
+    #   lists of the positions of values that are all spaces, that end with
+    #   a space and that begin with a space
+    if numpy <> None and len(values) > 0 and 0 < length <= maxVectorLength:
+        try:
+            return _spaceFlagsNumpy(values)
+        except (UnicodeError,ValueError,TypeError):
+            pass
+    return _spaceFlagsPython(values)
+
+def checkSpaces(table,columns,batch,badNulls):
+    # batch is a list of row tuples whose first item is the ObjectID;
+    #   columns is a list of [position in row, field name, length] of the
+    #   non-nullable String fields. Adds errors to badNulls
+    if not batch or not columns:
+        return
+    transposed = zip(*batch)
+    oids = transposed[0]
+    for i, field, length in columns:
+        flags = spaceFlags(transposed[i],length)
+        for kind, positions in zip(spaceErrorKinds,flags):
+            if positions:
+                key = '    Table '+table+', field '+field+', '+kind
+                for p in positions:
+                    badNulls.add(key,oids[p])
@@ -0,0 +1,327 @@
+# NCGMP09v11_DatabaseDiff.py
+#   Differences between two versions of an NCGMP09 database, for
+#   NCGMP09v1.1_DiffDatabases.
+#
+#   Tables and feature classes are listed and read through the readers of
+#   NCGMP09v11_TableScanner: arcpy.da cursors for .gdb and .mdb, SQL for
+#   .sqlite and .gpkg copies. For each table in both databases
+#     - fields are compared by name: added, deleted, and changed in type,
+#       length or nullability
+#     - each row, restricted to the fields common to both tables, is
+#       reduced to a digest: MD5 of its values (the shape as WKB), and a
+#       CRC-32 of each value, which names the fields that changed.
+#       OBJECTID, SHAPE_Length and SHAPE_Area are left out, as they follow
+#       from how the row was stored or from its shape
+#     - digests are keyed by the row's _ID (<table>_ID). Rows with a null
+#       _ID, and all rows of a table without one, are keyed by their
+#       digest, so they match only an identical row
+#     - digests of each table are sorted by key and the two sorted streams
+#       are merge-joined: a key in one stream only is a row added or
+#       deleted, a key in both with different digests a row modified
+#   Sorting is external: runs of runSize digests are sorted in memory and
+#   spilled to temporary files, which heapq.merge reads back in order. For
+#   each kind of difference only the count and the first maxRows rows are
+#   kept. Memory thus depends on runSize and maxRows, not on the size of
+#   the tables.
+#
+#   Does not import arcpy.
+
+import os.path, heapq, tempfile, zlib
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+import NCGMP09v11_TableScanner as TableScanner
+import NCGMP09v11_SqlValidate as SqlValidate
+from NCGMP09v11_TableScanner import oidToken, shapeToken
+
+versionString = 'NCGMP09v11_DatabaseDiff.py, version of 17 October 2026'
+
+sqliteExtensions = ('.gpkg','.sqlite')
+# fields whose values follow from the shape
+derivedFields = ('SHAPE_Length','SHAPE_Area','Shape_Length','Shape_Area')
+runSize = 100000     # digests sorted in memory at once
+spillBatch = 1000    # digests pickled together in a run file
+rowKinds = ('added','deleted','modified')
+
+def openReader(database):
+    if os.path.splitext(database)[1].lower() in sqliteExtensions:
+        return TableScanner.SqliteReader(database)
+    return TableScanner.ArcpyReader(database)
+
+def listDatasets(reader):
+    # {table or feature class: its feature dataset, None for a table}
+    if hasattr(reader,'connection'):
+        tables, fdsfc = SqlValidate.listTables(reader)
+    else:
+        tables, fdsfc = reader.listWorkspace()
+    datasets = {}
+    for table in tables:
+        datasets[table] = None
+    for fds, fcs in fdsfc:
+        for fc in fcs:
+            datasets[fc] = fds
+    return datasets
+
+#------------ schema -------------------
+
+def _fieldType(field):
+    return field.type+':'+str(field.length)
+
+def schemaDifferences(oldFields,newFields):
+    # lines for fields deleted, changed and added
+    oldByName = dict([[f.name,f] for f in oldFields])
+    newByName = dict([[f.name,f] for f in newFields])
+    lines = []
+    for f in oldFields:
+        g = newByName.get(f.name)
+        if g == None:
+            lines.append('field '+f.name+' deleted')
+            continue
+        if _fieldType(f) <> _fieldType(g):
+            lines.append('field '+f.name+' changed from '+_fieldType(f)+' to '+_fieldType(g))
+        if f.isNullable <> g.isNullable:
+            lines.append('field '+f.name+' isNullable changed from '+str(f.isNullable)+' to '+str(g.isNullable))
+    for g in newFields:
+        if not g.name in oldByName:
+            lines.append('field '+g.name+' added, '+_fieldType(g))
+    return lines
+
+def comparedFields(oldFields,newFields):
+    # names of the fields read from both tables: those in both but
+    #   ObjectIDs and derived fields. A shape is read as shapeToken
+    newByName = dict([[f.name,f] for f in newFields])
+    names = []
+    for f in oldFields:
+        g = newByName.get(f.name)
+        if g == None or 'OID' in (f.type,g.type) or f.name in derivedFields:
+            continue
+        if 'Geometry' in (f.type,g.type):
+            if f.type == g.type:
+                names.append(shapeToken)
+            continue
+        names.append(f.name)
+    return names
+
+#------------ row digests -------------------
+
+def _valueBytes(value):
+    # bytes of a value, with a type tag. Values that are equal, as read by
+    #   either reader, have the same bytes (e.g., u'a' and 'a', 3 and 3.0)
+    if value == None:
+        return 'N'
+    if isinstance(value,unicode):
+        return 'T'+value.encode('utf-8')
+    if isinstance(value,str):
+        return 'T'+value
+    if isinstance(value,float):
+        if value.is_integer():
+            return 'I%d' % value
+        return 'F'+repr(value)
+    if isinstance(value,(int,long)):
+        return 'I%d' % value
+    if isinstance(value,(buffer,bytearray)):
+        return 'B'+str(value)
+    if hasattr(value,'isoformat'):
+        return 'D'+value.isoformat()
+    return 'O'+repr(value)
+
+def digestRows(reader,table,names,keyField=None):
+    # (key, digest, value CRCs, OBJECTID) of each row of table, reading
+    #   fields names. key is (0, _ID), or (1, digest) if there is no _ID
+    keyColumn = None
+    if keyField in names:
+        keyColumn = names.index(keyField)+1
+    for row in reader.rows(table,[oidToken]+names):
+        encoded = [_valueBytes(v) for v in row[1:]]
+        digest = md5(''.join(['%d:%s' % (len(b),b) for b in encoded])).digest()
+        crcs = tuple([zlib.crc32(b) for b in encoded])
+        if keyColumn == None or row[keyColumn] == None:
+            key = (1,digest)
+        else:
+            key = (0,row[keyColumn])
+        yield (key,digest,crcs,row[0])
+
+def _spill(run,tempDirectory):
+    # sorts run and writes it to a temporary file, rewound for reading
+    run.sort()
+    f = tempfile.TemporaryFile(dir=tempDirectory)
+    for i in range(0,len(run),spillBatch):
+        pickle.dump(run[i:i+spillBatch],f,2)
+    f.seek(0)
+    return f
+
+def _readRun(f):
+    try:
+        while True:
+            for record in pickle.load(f):
+                yield record
+    except EOFError:
+        pass
+    f.close()
+
+def sortedRecords(records,runSize=runSize,tempDirectory=None):
+    # records in sorted order, with at most runSize of them in memory
+    run = []
+    runFiles = []
+    for record in records:
+        run.append(record)
+        if len(run) >= runSize:
+            runFiles.append(_spill(run,tempDirectory))
+            run = []
+    if not runFiles:
+        run.sort()
+        return iter(run)
+    if run:
+        runFiles.append(_spill(run,tempDirectory))
+    return heapq.merge(*[_readRun(f) for f in runFiles])
+
+def mergeJoin(old,new):
+    # pairs [oldRecord, newRecord] of two streams of records sorted by key
+    #   (their first element); None stands for a record missing on one
+    #   side. Records with the same key are paired in order
+    old = iter(old)
+    new = iter(new)
+    a = next(old,None)
+    b = next(new,None)
+    while a <> None or b <> None:
+        if b == None or (a <> None and a[0] < b[0]):
+            yield [a,None]
+            a = next(old,None)
+        elif a == None or b[0] < a[0]:
+            yield [None,b]
+            b = next(new,None)
+        else:
+            yield [a,b]
+            a = next(old,None)
+            b = next(new,None)
+
+#------------ tables -------------------
+
+class TableDiff:
+    def __init__(self,table,keyField=None,names=(),maxRows=20):
+        self.table = table
+        self.keyField = keyField    # _ID field, if in both tables
+        self.names = list(names)    # fields compared
+        self.maxRows = maxRows
+        self.schemaLines = []
+        self.unchanged = 0
+        self.counts = dict([[kind,0] for kind in rowKinds])
+        self.examples = dict([[kind,[]] for kind in rowKinds])
+        self.fieldChanges = {}      # field -> number of rows modified in it
+
+    def _row(self,record):
+        if record[0][0] == 0:
+            return self.keyField+' '+unicode(record[0][1])+', OBJECTID '+str(record[3])
+        return 'OBJECTID '+str(record[3])
+
+    def _add(self,kind,aline):
+        self.counts[kind] = self.counts[kind]+1
+        if len(self.examples[kind]) < self.maxRows:
+            self.examples[kind].append(aline)
+
+    def addPair(self,oldRecord,newRecord):
+        if newRecord == None:
+            self._add('deleted',self._row(oldRecord))
+        elif oldRecord == None:
+            self._add('added',self._row(newRecord))
+        elif oldRecord[1] == newRecord[1]:
+            self.unchanged = self.unchanged+1
+        else:
+            changed = []
+            for name, oldCrc, newCrc in zip(self.names,oldRecord[2],newRecord[2]):
+                if oldCrc <> newCrc:
+                    if name == shapeToken:
+                        name = 'Shape'
+                    changed.append(name)
+                    self.fieldChanges[name] = self.fieldChanges.get(name,0)+1
+            self._add('modified',self._row(oldRecord)+' -> '+str(newRecord[3])+', changed: '+', '.join(changed))
+
+def compareTable(oldReader,newReader,table,maxRows=20,runSize=runSize,tempDirectory=None):
+    oldFields = oldReader.listFields(table)
+    newFields = newReader.listFields(table)
+    names = comparedFields(oldFields,newFields)
+    keyField = None
+    if table+'_ID' in names:
+        keyField = table+'_ID'
+    diff = TableDiff(table,keyField,names,maxRows)
+    diff.schemaLines = schemaDifferences(oldFields,newFields)
+    old = sortedRecords(digestRows(oldReader,table,names,keyField),runSize,tempDirectory)
+    new = sortedRecords(digestRows(newReader,table,names,keyField),runSize,tempDirectory)
+    for oldRecord, newRecord in mergeJoin(old,new):
+        diff.addPair(oldRecord,newRecord)
+    return diff
+
+def datasetDifferences(oldDatasets,newDatasets):
+    # lines for tables and feature classes deleted, added or moved
+    lines = []
+    def where(fds):
+        if fds == None:
+            return 'table'
+        return 'in '+fds
+    for name in sorted(oldDatasets.keys()):
+        if not name in newDatasets:
+            lines.append(name+', deleted, was '+where(oldDatasets[name]))
+        elif oldDatasets[name] <> newDatasets[name]:
+            lines.append(name+', moved from '+where(oldDatasets[name])+' to '+where(newDatasets[name]))
+    for name in sorted(newDatasets.keys()):
+        if not name in oldDatasets:
+            lines.append(name+', added, '+where(newDatasets[name]))
+    return lines
+
+def diffDatabases(oldReader,newReader,maxRows=20,runSize=runSize,tempDirectory=None,progress=None):
+    # returns [dataset lines, [TableDiff of each table in both databases]].
+    #   progress, if given, is called with the name of each table compared
+    oldDatasets = listDatasets(oldReader)
+    newDatasets = listDatasets(newReader)
+    tableDiffs = []
+    for table in sorted(oldDatasets.keys()):
+        if table in newDatasets:
+            if progress <> None:
+                progress(table)
+            tableDiffs.append(compareTable(oldReader,newReader,table,maxRows,runSize,tempDirectory))
+    return [datasetDifferences(oldDatasets,newDatasets),tableDiffs]
+
+def reportLines(oldDatabase,newDatabase,datasetLines,tableDiffs):
+    lines = ['DIFFERENCES BETWEEN DATABASES','  old: '+oldDatabase,'  new: '+newDatabase,'',
+             'SUMMARY','  '+'table'.ljust(36)+'unchanged'.rjust(11)+'added'.rjust(11)+
+             'deleted'.rjust(11)+'modified'.rjust(11)]
+    for diff in tableDiffs:
+        aline = '  '+diff.table.ljust(36)+str(diff.unchanged).rjust(11)
+        for kind in rowKinds:
+            aline = aline+str(diff.counts[kind]).rjust(11)
+        lines.append(aline)
+    lines = lines+['','TABLES AND FEATURE CLASSES','']
+    lines = lines+['  '+aline for aline in datasetLines]
+    if not datasetLines:
+        lines.append('  None')
+    lines = lines+['','SCHEMA DIFFERENCES','']
+    schemaChanged = [diff for diff in tableDiffs if diff.schemaLines]
+    for diff in schemaChanged:
+        lines.append('  '+diff.table)
+        lines = lines+['    '+aline for aline in diff.schemaLines]
+    if not schemaChanged:
+        lines.append('  None')
+    lines = lines+['','ROW DIFFERENCES','']
+    rowsChanged = [diff for diff in tableDiffs if [n for n in diff.counts.values() if n > 0]]
+    for diff in rowsChanged:
+        lines.append('  '+diff.table)
+        for kind in rowKinds:
+            n = diff.counts[kind]
+            if n == 0:
+                continue
+            aline = '    '+kind+', '+str(n)+' rows'
+            if kind == 'modified':
+                aline = aline+'; fields changed: '+', '.join(['%s (%d)' % (name,diff.fieldChanges[name])
+                                                             for name in sorted(diff.fieldChanges.keys())])
+            lines.append(aline)
+            lines = lines+['      '+aline for aline in diff.examples[kind]]
+            if n > len(diff.examples[kind]):
+                lines.append('      ...')
+    if not rowsChanged:
+        lines.append('  None')
+    return lines
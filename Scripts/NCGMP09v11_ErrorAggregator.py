@@ -0,0 +1,62 @@
+# NCGMP09v11_ErrorAggregator.py
+#   Bounded-memory accumulation of one category of content errors for
+#   NCGMP09v1.1_ValidateDatabase.
+#
+#   Errors are counted by key (the text of the report line) as they arrive.
+#   For each key only the count and the first few examples (e.g., OBJECTIDs
+#   of offending rows) are kept, so memory depends on the number of distinct
+#   keys, not on the number of bad rows. lines() returns the report lines in
+#   sorted order, with counts and examples.
+
+versionString = 'NCGMP09v11_ErrorAggregator.py, version of 17 October 2026'
+
+class ErrorAggregator:
+    def __init__(self,header,maxExamples=5,countWord='duplicates',examplesLabel='e.g.'):
+        # header is first line of report section; countWord follows the
+        #   count of keys seen more than once; examplesLabel precedes examples
+        self.header = header
+        self.maxExamples = maxExamples
+        self.countWord = countWord
+        self.examplesLabel = examplesLabel
+        self.counts = {}
+        self.examples = {}
+
+    def add(self,key,example=None):
+        self.counts[key] = self.counts.get(key,0) + 1
+        if example <> None:
+            examples = self.examples.setdefault(key,[])
+            if len(examples) < self.maxExamples:
+                examples.append(example)
+
+    def extend(self,keys):
+        for key in keys:
+            self.add(key)
+
+    def merge(self,other):
+        for key, n in other.counts.iteritems():
+            self.counts[key] = self.counts.get(key,0) + n
+        for key, otherExamples in other.examples.iteritems():
+            examples = self.examples.setdefault(key,[])
+            examples.extend(otherExamples[:self.maxExamples-len(examples)])
+
+    def __len__(self):
+        # number of distinct keys
+        return len(self.counts)
+
+    def lines(self):
+        # report lines, sorted by key
+        keys = self.counts.keys()
+        keys.sort()
+        lines = []
+        for key in keys:
+            aline = key
+            n = self.counts[key]
+            if n > 1:
+                aline = aline+'--'+str(n)+' '+self.countWord
+            if key in self.examples:
+                examples = [str(x) for x in self.examples[key]]
+                if n > len(examples):
+                    examples.append('...')
+                aline = aline+', '+self.examplesLabel+' '+', '.join(examples)
+            lines.append(aline)
+        return lines
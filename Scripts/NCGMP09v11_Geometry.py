@@ -0,0 +1,292 @@
+# NCGMP09v11_Geometry.py
+#   Coordinates of lines and polygons, read in bulk, and the planar
+#   predicates used by the geometry checks of NCGMP09v1.1_ValidateDatabase
+#   (see NCGMP09v11_Topology).
+#
+#   Shapes are read as well-known binary (WKB): arcpy.da cursors return it
+#   for the token SHAPE@WKB, GeoPackage stores it after a short header, and
+#   plain SQLite copies may store it as is. decodeShape turns any of these
+#   into lists of coordinate tuples, at the cost of one struct.unpack per
+#   ring or path, without making a geometry object per vertex:
+#     lines     [path, ...]                 path is [(x, y), ...]
+#     polygons  [[ring, ring, ...], ...]    first ring of each polygon is
+#                                           its exterior, others are holes
+#   Z and M values are dropped. encodeShape writes the same structures as
+#   WKB or GeoPackage blobs, for synthetic databases.
+#
+#   Does not import arcpy.
+
+import struct
+
+versionString = 'NCGMP09v11_Geometry.py, version of 17 October 2026'
+
+wkbPoint, wkbLineString, wkbPolygon = 1, 2, 3
+wkbMultiPoint, wkbMultiLineString, wkbMultiPolygon, wkbCollection = 4, 5, 6, 7
+
+# WKB geometry type -> kind of decoded shape
+shapeKinds = {wkbPoint:'Point',wkbMultiPoint:'Point',wkbLineString:'Polyline',
+              wkbMultiLineString:'Polyline',wkbPolygon:'Polygon',wkbMultiPolygon:'Polygon'}
+
+#------------ well-known binary -------------------
+
+class _WkbReader:
+    def __init__(self,blob,offset=0):
+        self.blob = blob
+        self.offset = offset
+
+    def _unpack(self,fmt,size):
+        values = struct.unpack_from(fmt,self.blob,self.offset)
+        self.offset = self.offset+size
+        return values
+
+    def geometry(self,into):
+        # reads one geometry, adding points, paths or polygons to into
+        #   (a dictionary kind -> list); returns kind
+        order = '<'
+        if ord(self.blob[self.offset]) == 0:
+            order = '>'
+        self.offset = self.offset+1
+        wkbType = self._unpack(order+'I',4)[0]
+        dim = 2
+        if wkbType & 0x80000000:    # EWKB flags
+            dim = dim+1
+        if wkbType & 0x40000000:
+            dim = dim+1
+        if wkbType & 0x20000000:
+            self.offset = self.offset+4
+        wkbType = wkbType & 0x0fffffff
+        if wkbType >= 1000:         # ISO Z, M, ZM
+            dim = dim+(1,1,2)[wkbType/1000-1]
+            wkbType = wkbType % 1000
+        if wkbType == wkbPoint:
+            xy = self._unpack(order+'dd',8*dim)[0:2]
+            into.setdefault('Point',[]).append(xy)
+        elif wkbType == wkbLineString:
+            into.setdefault('Polyline',[]).append(self._points(order,dim))
+        elif wkbType == wkbPolygon:
+            nRings = self._unpack(order+'I',4)[0]
+            into.setdefault('Polygon',[]).append([self._points(order,dim) for i in range(nRings)])
+        elif wkbType in (wkbMultiPoint,wkbMultiLineString,wkbMultiPolygon,wkbCollection):
+            nParts = self._unpack(order+'I',4)[0]
+            for i in range(nParts):
+                self.geometry(into)
+        else:
+            raise ValueError('unknown WKB geometry type '+str(wkbType))
+        return shapeKinds.get(wkbType)
+
+    def _points(self,order,dim):
+        n = self._unpack(order+'I',4)[0]
+        coords = self._unpack(order+str(n*dim)+'d',8*n*dim)
+        if dim == 2:
+            return zip(coords[0::2],coords[1::2])
+        return zip(coords[0::dim],coords[1::dim])
+
+def _wkbStart(blob):
+    # offset of WKB in a GeoPackage blob, else 0
+    if blob[0:2] == 'GP':
+        flags = ord(blob[3])
+        envelope = (0,32,48,48,64,0,0,0)[(flags >> 1) & 7]
+        return 8+envelope
+    return 0
+
+def decodeShape(blob):
+    # WKB (from arcpy SHAPE@WKB or SQLite) or GeoPackage blob ->
+    #   [kind, parts]; kind is 'Point', 'Polyline', 'Polygon' or None
+    if blob == None:
+        return [None,[]]
+    blob = str(blob)
+    if len(blob) < 5:
+        return [None,[]]
+    into = {}
+    _WkbReader(blob,_wkbStart(blob)).geometry(into)
+    for kind in ('Polygon','Polyline','Point'):
+        if kind in into:
+            return [kind,into[kind]]
+    return [None,[]]
+
+def _wkbPoints(points):
+    coords = []
+    for x, y in points:
+        coords.append(x)
+        coords.append(y)
+    return struct.pack('<I'+str(len(coords))+'d',len(points),*coords)
+
+def encodeShape(kind,parts,geoPackage=False,srid=0):
+    # [kind, parts] as returned by decodeShape -> WKB, or GeoPackage blob
+    if kind == 'Polyline':
+        members = [struct.pack('<BI',1,wkbLineString)+_wkbPoints(path) for path in parts]
+        single, multi = wkbLineString, wkbMultiLineString
+    elif kind == 'Polygon':
+        members = [struct.pack('<BII',1,wkbPolygon,len(rings))+''.join([_wkbPoints(r) for r in rings])
+                   for rings in parts]
+        single, multi = wkbPolygon, wkbMultiPolygon
+    else:
+        members = [struct.pack('<BIdd',1,wkbPoint,x,y) for x, y in parts]
+        single, multi = wkbPoint, wkbMultiPoint
+    if len(members) == 1:
+        wkb = members[0]
+    else:
+        wkb = struct.pack('<BII',1,multi,len(members))+''.join(members)
+    if geoPackage:
+        return 'GP'+struct.pack('<BBi',0,1,srid)+wkb
+    return wkb
+
+#------------ planar predicates -------------------
+
+def signedArea(ring):
+    # positive if ring is counterclockwise
+    area = 0.0
+    for i in range(len(ring)-1):
+        area = area+ring[i][0]*ring[i+1][1]-ring[i+1][0]*ring[i][1]
+    if ring and ring[0] <> ring[-1]:
+        area = area+ring[-1][0]*ring[0][1]-ring[0][0]*ring[-1][1]
+    return area/2.0
+
+def closeRing(ring):
+    if ring and ring[0] <> ring[-1]:
+        return list(ring)+[ring[0]]
+    return ring
+
+def orientPolygon(rings):
+    # exterior counterclockwise, holes clockwise, all closed
+    oriented = []
+    for i in range(len(rings)):
+        ring = closeRing(rings[i])
+        if (signedArea(ring) < 0) == (i == 0):
+            ring = ring[::-1]
+        oriented.append(ring)
+    return oriented
+
+def segments(path):
+    # (p, q) of consecutive distinct vertices
+    return [(path[i],path[i+1]) for i in range(len(path)-1) if path[i] <> path[i+1]]
+
+def segmentBox(p,q):
+    return (min(p[0],q[0]),min(p[1],q[1]),max(p[0],q[0]),max(p[1],q[1]))
+
+def partsBox(paths):
+    xs = [x for path in paths for x, y in path]
+    ys = [y for path in paths for x, y in path]
+    return (min(xs),min(ys),max(xs),max(ys))
+
+def cross(o,a,b):
+    return (a[0]-o[0])*(b[1]-o[1])-(a[1]-o[1])*(b[0]-o[0])
+
+def onSegment(p,a,b,eps):
+    # is p within eps of segment ab?
+    dx = b[0]-a[0]
+    dy = b[1]-a[1]
+    length2 = dx*dx+dy*dy
+    if length2 == 0:
+        return abs(p[0]-a[0]) <= eps and abs(p[1]-a[1]) <= eps
+    t = ((p[0]-a[0])*dx+(p[1]-a[1])*dy)/float(length2)
+    if t < 0:
+        t = 0.0
+    elif t > 1:
+        t = 1.0
+    ex = a[0]+t*dx-p[0]
+    ey = a[1]+t*dy-p[1]
+    return ex*ex+ey*ey <= eps*eps
+
+def intersection(a,b,c,d,eps):
+    # how segments ab and cd meet: None, or [kind, (x, y)] where kind is
+    #   'cross' (interiors cross at a single point), 'touch' (meet at a
+    #   single point that is an end of one or both) or 'overlap'
+    #   (collinear, sharing more than a point)
+    if max(a[0],b[0]) < min(c[0],d[0])-eps or max(c[0],d[0]) < min(a[0],b[0])-eps or \
+       max(a[1],b[1]) < min(c[1],d[1])-eps or max(c[1],d[1]) < min(a[1],b[1])-eps:
+        return None
+    d1 = cross(c,d,a)
+    d2 = cross(c,d,b)
+    d3 = cross(a,b,c)
+    d4 = cross(a,b,d)
+    lengthAB = max(abs(b[0]-a[0]),abs(b[1]-a[1]))
+    lengthCD = max(abs(d[0]-c[0]),abs(d[1]-c[1]))
+    # a cross product over a segment's length is a distance from its line
+    if abs(d1) <= eps*lengthCD and abs(d2) <= eps*lengthCD:
+        # collinear
+        onCD = [p for p in (a,b) if onSegment(p,c,d,eps)]
+        onAB = [p for p in (c,d) if onSegment(p,a,b,eps)]
+        shared = onCD+[p for p in onAB if not p in onCD]
+        if not shared:
+            return None
+        distinct = []
+        for p in shared:
+            if not [q for q in distinct if abs(p[0]-q[0]) <= eps and abs(p[1]-q[1]) <= eps]:
+                distinct.append(p)
+        if len(distinct) > 1:
+            return ['overlap',distinct[0]]
+        return ['touch',distinct[0]]
+    for p, c1, c2 in ((a,c,d),(b,c,d)):
+        if onSegment(p,c1,c2,eps):
+            return ['touch',p]
+    for p, c1, c2 in ((c,a,b),(d,a,b)):
+        if onSegment(p,c1,c2,eps):
+            return ['touch',p]
+    if (d1 > 0) <> (d2 > 0) and (d3 > 0) <> (d4 > 0):
+        t = d1/float(d1-d2)
+        return ['cross',(a[0]+t*(b[0]-a[0]),a[1]+t*(b[1]-a[1]))]
+    return None
+
+def pointInPolygon(p,rings,eps):
+    # 1 if p is inside polygon (rings: exterior and holes), 0 if on its
+    #   boundary, -1 if outside
+    x, y = p
+    inside = False
+    for ring in rings:
+        for i in range(len(ring)-1):
+            a = ring[i]
+            b = ring[i+1]
+            if onSegment(p,a,b,eps):
+                return 0
+            if (a[1] > y) <> (b[1] > y):
+                if x < a[0]+(y-a[1])*(b[0]-a[0])/float(b[1]-a[1]):
+                    inside = not inside
+    if inside:
+        return 1
+    return -1
+
+def interiorPoint(rings):
+    # a point inside polygon rings (exterior and holes, closed), as
+    #   FeatureToPoint INSIDE gives: the middle of the widest stretch inside
+    #   the polygon of a horizontal line that passes between vertices, near
+    #   half its height. None if the polygon has no area
+    ys = sorted(set([p[1] for ring in rings for p in ring]))
+    if len(ys) < 2:
+        return None
+    middle = (ys[0]+ys[-1])/2.0
+    k = 1
+    while k < len(ys)-1 and ys[k] < middle:
+        k = k+1
+    y = (ys[k-1]+ys[k])/2.0
+    xs = []
+    for ring in rings:
+        for i in range(len(ring)-1):
+            a = ring[i]
+            b = ring[i+1]
+            if (a[1] > y) <> (b[1] > y):
+                xs.append(a[0]+(y-a[1])*(b[0]-a[0])/(b[1]-a[1]))
+    xs.sort()
+    best = None
+    for i in range(0,len(xs)-1,2):
+        if best == None or xs[i+1]-xs[i] > best[1]-best[0]:
+            best = (xs[i],xs[i+1])
+    if best == None:
+        return None
+    return ((best[0]+best[1])/2.0,y)
+
+def sweepPairs(boxes):
+    # pairs (i, j), i < j, of boxes whose x ranges overlap, found by
+    #   sweeping boxes in order of xmin; the pairs' y ranges also overlap
+    order = sorted(range(len(boxes)),key=lambda i: boxes[i][0])
+    active = []
+    for i in order:
+        xmin, ymin, xmax, ymax = boxes[i]
+        stillActive = []
+        for j in active:
+            if boxes[j][2] >= xmin:
+                stillActive.append(j)
+                if boxes[j][1] <= ymax and ymin <= boxes[j][3]:
+                    yield (min(i,j),max(i,j))
+        stillActive.append(i)
+        active = stillActive
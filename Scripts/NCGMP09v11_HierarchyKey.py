@@ -0,0 +1,179 @@
+# NCGMP09v11_HierarchyKey.py
+#   Tree of the HierarchyKeys of DescriptionOfMapUnits, for
+#   NCGMP09v1.1_ValidateDatabase and NCGMP09v1.1_DMUtoDocx.
+#
+#   A HierarchyKey is a string of fragments separated by '-', e.g.
+#   '002-003' is the third unit under the second heading. The validator
+#   once only compared the width of every fragment with the first fragment
+#   of the first key (and failed on an empty table). Here each key is
+#   parsed once into a trie, one node per fragment, and from it are found
+#     - fragments whose width is not the usual width (the width of most
+#       fragments)
+#     - duplicate keys
+#     - orphans: keys whose parent key (e.g., 002 for 002-003) is absent
+#     - gaps between siblings, e.g. 002-001, 002-002, 002-004, or before
+#       the first, e.g. 002-002, 002-003 without 002-001. Siblings may be
+#       numbered in steps (005, 010, 015 or 010, 020, ...); the step is
+#       the greatest common divisor of the differences between numbers and
+#       the first number, so 001, 003 has a gap and 020, 030 lacks 010
+#     - rows with no HierarchyKey (null or blank)
+#     - keys that sort differently as text, as ArcGIS sorts them, than in
+#       the tree, e.g. 2-10 before 2-9
+#   Siblings are ordered by number if their fragments are digits, else as
+#   text. Building the tree and finding the errors take O(n log n).
+#
+#   ordered() returns the rows in tree order, which DMUtoDocx uses to
+#   write units in their place in the hierarchy whatever their widths.
+#
+#   Does not import arcpy.
+
+versionString = 'NCGMP09v11_HierarchyKey.py, version of 17 October 2026'
+
+separator = '-'
+
+def _gcd(a,b):
+    while b:
+        a, b = b, a % b
+    return a
+
+def fragmentOrder(fragment):
+    # sort key of a fragment: numbers first, by value, then text
+    if fragment.isdigit():
+        return (0,int(fragment),fragment)
+    return (1,0,fragment)
+
+class _Node:
+    def __init__(self,path):
+        self.path = path       # key of this node, e.g. '002-003'
+        self.children = {}     # fragment -> _Node
+        self.items = []        # rows with this key, in the order added
+
+class HierarchyTree:
+    def __init__(self):
+        self.root = _Node('')
+        self.nKeys = 0
+        self.nBlank = 0        # rows with no HierarchyKey
+        self.widths = {}       # fragment width -> number of fragments
+
+    def add(self,hKey,item=None):
+        # adds one row, with its HierarchyKey
+        if hKey == None or hKey.strip() == '':
+            self.nBlank = self.nBlank+1
+            return
+        self.nKeys = self.nKeys+1
+        node = self.root
+        for fragment in hKey.split(separator):
+            width = len(fragment)
+            self.widths[width] = self.widths.get(width,0) + 1
+            child = node.children.get(fragment)
+            if child == None:
+                if node.path:
+                    path = node.path+separator+fragment
+                else:
+                    path = fragment
+                child = node.children[fragment] = _Node(path)
+            node = child
+        node.items.append([hKey,item])
+
+    def _sortedChildren(self,node):
+        return [node.children[f] for f in sorted(node.children.keys(),key=fragmentOrder)]
+
+    def nodes(self):
+        # all nodes but the root, in tree order (depth first, siblings sorted)
+        stack = self._sortedChildren(self.root)
+        stack.reverse()
+        while stack:
+            node = stack.pop()
+            yield node
+            children = self._sortedChildren(node)
+            children.reverse()
+            stack.extend(children)
+
+    def ordered(self):
+        # [hKey, item] of all rows with a key, in tree order
+        for node in self.nodes():
+            for hKeyItem in node.items:
+                yield hKeyItem
+
+    def usualWidth(self):
+        # width of most fragments; of these, the narrowest
+        best = None
+        for width, n in self.widths.iteritems():
+            if best == None or n > self.widths[best] or (n == self.widths[best] and width < best):
+                best = width
+        return best
+
+    def widthErrors(self):
+        # HierarchyKeys, one per row, with a fragment not of the usual width
+        partLength = self.usualWidth()
+        errors = []
+        for node in self.nodes():
+            for hKey, item in node.items:
+                for fragment in hKey.split(separator):
+                    if len(fragment) <> partLength:
+                        errors.append(hKey)
+                        break
+        return errors
+
+    def treeErrors(self):
+        # error lines for rows with no key, duplicate keys, orphans, gaps
+        #   between siblings and keys out of order when sorted as text
+        errors = []
+        if self.nBlank > 0:
+            errors.append(str(self.nBlank)+' rows with no HierarchyKey')
+        stack = [[self.root,None]]
+        while stack:
+            node, parent = stack.pop()
+            if len(node.items) > 1:
+                errors.append(node.path+', duplicated in '+str(len(node.items))+' rows')
+            if node.items and parent <> None and parent is not self.root and not parent.items:
+                errors.append(node.path+', parent '+parent.path+' is missing')
+            children = self._sortedChildren(node)
+            errors.extend(self._gaps(children))
+            for child in children:
+                stack.append([child,node])
+        errors.extend(self._sortErrors())
+        return errors
+
+    def _gaps(self,children):
+        numbered = [[int(child.path.split(separator)[-1]),child] for child in children
+                    if child.path.split(separator)[-1].isdigit()]
+        errors = []
+        if not numbered:
+            return errors
+        # the step is the greatest common divisor of the differences and
+        #   the first number; numbering from 0 has no step before the first
+        first = numbered[0][0]
+        step = first
+        for i in range(1,len(numbered)):
+            step = _gcd(step,numbered[i][0]-numbered[i-1][0])
+        if step == 0:
+            return errors
+        if first > step:
+            errors.append(numbered[0][1].path+', gap before it')
+        for i in range(1,len(numbered)):
+            if numbered[i][0]-numbered[i-1][0] > step:
+                errors.append(numbered[i][1].path+', gap after '+numbered[i-1][1].path)
+        return errors
+
+    def _sortErrors(self):
+        # a key that sorts as text after a key that follows it in the tree
+        rank = {}
+        n = 0
+        for node in self.nodes():
+            if node.items:
+                rank[node.path] = n
+                n = n+1
+        errors = []
+        textOrder = sorted(rank.keys())
+        for i in range(1,len(textOrder)):
+            if rank[textOrder[i]] < rank[textOrder[i-1]]:
+                errors.append(textOrder[i]+', sorts as text after '+textOrder[i-1])
+        return errors
+
+def errorLines(hKeys):
+    # report lines [width errors, tree errors] for a sequence of HierarchyKeys
+    tree = HierarchyTree()
+    for hKey in hKeys:
+        tree.add(hKey)
+    return [['    '+hKey for hKey in tree.widthErrors()],['    '+aline for aline in tree.treeErrors()]]
@@ -0,0 +1,240 @@
+# NCGMP09v11_IdCollisions.py
+#   _ID values shared by several databases, for NCGMP09v1.1_CheckIdCollisions.
+#   NCGMP09v1.1_ValidateDatabase finds duplicate _IDs within one
+#   database; when quadrangles are compiled into one map, _IDs must also
+#   be unique across them.
+#
+#   The _IDs (<table>_ID) of every table of every database are streamed
+#   into a disk-backed hash index: the MD5 of each _ID picks one of
+#   several partitions, each a temporary file of pickled
+#   [_ID, source code] batches, where a source is a [database, table]
+#   pair. Each partition is then read back alone and its _IDs counted in
+#   an NCGMP09v11_IdRegistry, keyed by source code. So the whole index is
+#   never in memory, only one partition at a time, and the number of
+#   partitions is chosen from the row counts of the tables so that a
+#   partition holds about partitionSize _IDs.
+#
+#   With bloom=True the databases are read twice. The first pass adds
+#   each _ID to a Bloom filter of _IDs seen, and to a second filter of
+#   _IDs seen more than once if the first already (maybe) held it. The
+#   second pass writes to the index only the _IDs the second filter holds:
+#   the true repeats and a small fraction, bloomErrorRate, of false ones,
+#   which the index then finds to be unique. This trades a second read of
+#   the databases, and the time to set and test the filters' bits (which
+#   about doubles the run), for far less temporary disk and memory when
+#   collisions are few. The filters take about 1.44*log2(1/bloomErrorRate)
+#   bits per _ID each, 10 bits at 0.01.
+#
+#   Colliding _IDs are sorted (externally, see NCGMP09v11_DatabaseDiff)
+#   so the report lists them in order.
+#
+#   Does not import arcpy.
+
+import os.path, math, struct, tempfile, time
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+import NCGMP09v11_DatabaseDiff as DatabaseDiff
+import NCGMP09v11_IdRegistry as IdRegistry
+
+versionString = 'NCGMP09v11_IdCollisions.py, version of 17 October 2026'
+
+partitionSize = 500000   # _IDs counted in memory at once
+maxPartitions = 256      # temporary files open at once
+spillBatch = 1000        # records pickled together in a partition file
+bloomErrorRate = 0.01
+
+def _idBytes(anID):
+    if isinstance(anID,unicode):
+        return anID.encode('utf-8')
+    return str(anID)
+
+def _hashes(key):
+    # two 64-bit hashes of key, for partitioning and for Bloom filters
+    return struct.unpack('<QQ',md5(key).digest())
+
+class BloomFilter:
+    def __init__(self,capacity,errorRate=bloomErrorRate):
+        capacity = max(capacity,1)
+        self.nBits = max(int(-capacity*math.log(errorRate)/math.log(2)**2),8)
+        self.nHashes = max(int(round(self.nBits*math.log(2)/capacity)),1)
+        self.bits = bytearray((self.nBits+7)/8)
+
+    def add(self,hashes):
+        # adds key, given as _hashes(key); returns True if key was (maybe)
+        #   present already
+        h1, h2 = hashes
+        bits = self.bits
+        present = True
+        for i in xrange(self.nHashes):
+            position = (h1+i*h2) % self.nBits
+            mask = 1 << (position & 7)
+            byte = position >> 3
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] = bits[byte] | mask
+        return present
+
+    def __contains__(self,hashes):
+        h1, h2 = hashes
+        bits = self.bits
+        for i in xrange(self.nHashes):
+            position = (h1+i*h2) % self.nBits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+class IdIndex:
+    # disk-backed hash index of [_ID, source code]
+    def __init__(self,nPartitions,tempDirectory=None):
+        self.files = [tempfile.TemporaryFile(dir=tempDirectory) for i in range(nPartitions)]
+        self.buffers = [[] for i in range(nPartitions)]
+        self.count = 0
+
+    def add(self,key,source,hashes):
+        i = hashes[0] % len(self.files)
+        buffer = self.buffers[i]
+        buffer.append((key,source))
+        if len(buffer) >= spillBatch:
+            pickle.dump(buffer,self.files[i],2)
+            self.buffers[i] = []
+        self.count = self.count+1
+
+    def _records(self,i):
+        f = self.files[i]
+        if self.buffers[i]:
+            pickle.dump(self.buffers[i],f,2)
+            self.buffers[i] = []
+        f.seek(0)
+        try:
+            while True:
+                for record in pickle.load(f):
+                    yield record
+        except EOFError:
+            pass
+        f.close()
+
+    def repeats(self):
+        # (key, {source code: count}) of each key added more than once,
+        #   one partition at a time; closes the index
+        for i in range(len(self.files)):
+            registry = IdRegistry.IdRegistry()
+            for key, source in self._records(i):
+                registry.add(key,source)
+            for key in registry.duplicates():
+                yield key, registry.tableCounts(key)
+
+class CollisionSearch:
+    def __init__(self,databases,bloom=False,withinDatabase=False,partitionSize=partitionSize,
+                 bloomErrorRate=bloomErrorRate,tempDirectory=None,progress=None):
+        self.databases = databases
+        self.bloom = bloom
+        self.withinDatabase = withinDatabase   # also report _IDs repeated within one database
+        self.partitionSize = partitionSize
+        self.bloomErrorRate = bloomErrorRate
+        self.tempDirectory = tempDirectory
+        self.progress = progress
+        self.sources = []          # source code -> [database, table]
+        self.idCounts = {}         # database -> number of non-null _IDs
+        self.indexed = 0           # _IDs written to the index
+        self.collisions = 0        # _IDs reported
+        self.seconds = 0.0
+
+    def _message(self,msg):
+        if self.progress <> None:
+            self.progress(msg)
+
+    def idTables(self):
+        # [database, reader, table, idField, rows] of tables with an _ID field
+        tables = []
+        for database in self.databases:
+            reader = DatabaseDiff.openReader(database)
+            for table in sorted(DatabaseDiff.listDatasets(reader)):
+                idField = table+'_ID'
+                if idField in [f.name for f in reader.listFields(table)]:
+                    tables.append([database,reader,table,idField,reader.rowCount(table)])
+        return tables
+
+    def _keys(self,reader,table,idField):
+        # (key, hashes) of the non-null _IDs of table
+        for (anID,) in reader.rows(table,[idField]):
+            if anID == None or anID == '':
+                continue
+            key = _idBytes(anID)
+            yield key, _hashes(key)
+
+    def run(self):
+        # yields [_ID, [[database, table, count], ...]] of each collision,
+        #   sorted by _ID
+        startTime = time.time()
+        tables = self.idTables()
+        nIds = sum([t[4] for t in tables])
+        nPartitions = max(1,min(maxPartitions,int(math.ceil(float(nIds)/self.partitionSize))))
+        repeated = None
+        if self.bloom:
+            seen = BloomFilter(nIds,self.bloomErrorRate)
+            repeated = BloomFilter(nIds,self.bloomErrorRate)
+            for database, reader, table, idField, rows in tables:
+                self._message('    '+os.path.basename(database)+' '+table+', first pass')
+                for key, hashes in self._keys(reader,table,idField):
+                    if seen.add(hashes):
+                        repeated.add(hashes)
+            del seen
+        index = IdIndex(nPartitions,self.tempDirectory)
+        for database, reader, table, idField, rows in tables:
+            self._message('    '+os.path.basename(database)+' '+table)
+            source = len(self.sources)
+            self.sources.append([database,table])
+            n = 0
+            for key, hashes in self._keys(reader,table,idField):
+                n = n+1
+                if repeated == None or hashes in repeated:
+                    index.add(key,source,hashes)
+            self.idCounts[database] = self.idCounts.get(database,0)+n
+        self.indexed = index.count
+        del repeated
+        self._message('    finding collisions in '+str(self.indexed)+' indexed _IDs, '+str(nPartitions)+' partitions')
+        for key, sourceCounts in DatabaseDiff.sortedRecords(self._collisions(index),tempDirectory=self.tempDirectory):
+            yield key, [self.sources[source]+[n] for source, n in sourceCounts]
+        self.seconds = time.time()-startTime
+
+    def _collisions(self,index):
+        for key, sourceCounts in index.repeats():
+            if not self.withinDatabase:
+                databases = set([self.sources[source][0] for source, n in sourceCounts])
+                if len(databases) < 2:
+                    continue
+            self.collisions = self.collisions+1
+            yield key, sourceCounts
+
+def reportLines(search):
+    # lines of the report of a CollisionSearch; runs the search
+    databases = search.databases
+    yield 'Collisions of _ID values among '+str(len(databases))+' databases'
+    yield '  This file written by '+versionString
+    yield '  '+time.asctime(time.localtime(time.time()))
+    if search.withinDatabase:
+        yield '  _IDs repeated within one database are also listed'
+    yield ''
+    yield 'COLLISIONS: _ID, then database, table and number of rows with it'
+    yield ''
+    for key, occurrences in search.run():
+        yield '  '+key.decode('utf-8')
+        for database, table, n in occurrences:
+            yield '      '+database+'  '+table+'  '+str(n)
+    if search.collisions == 0:
+        yield '  None'
+    yield ''
+    yield ''
+    yield 'DATABASES: non-null _IDs'
+    yield ''
+    for database in databases:
+        yield '  '+database+'  '+str(search.idCounts.get(database,0))
+    yield ''
+    yield '  '+str(sum(search.idCounts.values()))+' _IDs, '+str(search.indexed)+' indexed, '+ \
+          str(search.collisions)+' colliding, %.1f seconds' % search.seconds
@@ -0,0 +1,93 @@
+# NCGMP09v11_IdRegistry.py
+#   Compact store of the _ID values of a database, for the duplicate-_ID
+#   and ExtendedAttributes checks of NCGMP09v1.1_ValidateDatabase.
+#
+#   The validator once kept every _ID as a [_ID, table] list, sorted them
+#   all to find duplicates, and made a second, stringified copy to look up
+#   OwnerIDs. Here
+#     - table names are interned as small integer codes, so each _ID costs
+#       one dict entry whose value is a shared small int
+#     - _IDs that are plain ASCII are kept as byte strings, which take a
+#       half to a quarter of the memory of the unicode strings arcpy
+#       returns and compare and hash equal to them
+#     - only _IDs seen more than once get a {table code: count} entry, so
+#       duplicates are reported directly from that dict, without a sort
+#
+#   Does not import arcpy.
+
+versionString = 'NCGMP09v11_IdRegistry.py, version of 17 October 2026'
+
+def _compact(anID):
+    # ASCII unicode -> byte string
+    if isinstance(anID,unicode):
+        try:
+            return anID.encode('ascii')
+        except UnicodeError:
+            pass
+    return anID
+
+class IdRegistry:
+    def __init__(self):
+        self.tableNames = []   # table code -> table name
+        self._codes = {}       # table name -> table code
+        self.first = {}        # _ID -> code of table of first occurrence
+        self.repeats = {}      # _ID seen more than once -> {table code: count}
+
+    def tableCode(self,table):
+        code = self._codes.get(table)
+        if code == None:
+            code = self._codes[table] = len(self.tableNames)
+            self.tableNames.append(table)
+        return code
+
+    def add(self,anID,table,n=1):
+        # record n occurrences of anID in table
+        code = self._codes.get(table)
+        if code == None:
+            code = self.tableCode(table)
+        anID = _compact(anID)
+        first = self.first.get(anID)
+        if first == None:
+            self.first[anID] = code
+            if n > 1:
+                self.repeats[anID] = {code:n}
+            return
+        counts = self.repeats.get(anID)
+        if counts == None:
+            counts = self.repeats[anID] = {first:1}
+        counts[code] = counts.get(code,0) + n
+
+    def __contains__(self,anID):
+        return anID in self.first
+
+    def __len__(self):
+        # number of distinct _IDs
+        return len(self.first)
+
+    def tableCounts(self,anID):
+        # sorted list of [table, count] of the occurrences of anID
+        counts = self.repeats.get(anID)
+        if counts == None:
+            return [[self.tableNames[self.first[anID]],1]]
+        tableCounts = [[self.tableNames[code],n] for code, n in counts.iteritems()]
+        tableCounts.sort()
+        return tableCounts
+
+    def duplicates(self):
+        # _IDs seen more than once
+        return self.repeats.keys()
+
+    def iterCounts(self):
+        # (_ID, table, count) for all occurrences
+        for anID, code in self.first.iteritems():
+            counts = self.repeats.get(anID)
+            if counts == None:
+                yield anID, self.tableNames[code], 1
+            else:
+                for code, n in counts.iteritems():
+                    yield anID, self.tableNames[code], n
+
+    def merge(self,other):
+        # add the _IDs of another IdRegistry (e.g., of one table)
+        for anID, table, n in other.iterCounts():
+            self.add(anID,table,n)
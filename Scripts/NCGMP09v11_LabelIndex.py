@@ -0,0 +1,199 @@
+# NCGMP09v11_LabelIndex.py
+#   Which label points lie in which polygons, for NCGMP09v1.1_MakePolys and
+#   NCGMP09v11_PolyBuilder, in place of Identity_analysis of labels with
+#   polygons and a sorted cursor over the result.
+#
+#   Polygon boxes are packed into an STR-tree (NCGMP09v11_SpatialIndex), and
+#   the segments of the rings of all polygons are stored in flat arrays,
+#   polygon after polygon. With numpy (which ships with ArcGIS) points are
+#   located batchPoints at a time: the tree is walked one level at a time
+#   for all points of the batch together, keeping the (point, node) pairs
+#   whose node box holds the point, down to (point, polygon) pairs. Each
+#   pair is then expanded to its polygon's segments, at most maxTests at
+#   once, and a ray cast from the point to the right crosses an odd number
+#   of them if the point is inside. Without numpy each point is queried in
+#   the tree and tested with Geometry.pointInPolygon.
+#   A point within tolerance of a polygon's boundary is not in that
+#   polygon. A point in overlapping polygons is in each of them.
+#   labelConflicts finds the polygons whose labels disagree, as sets, so
+#   that MakePolys can select them in one step.
+#
+#   Does not import arcpy.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_SpatialIndex as SpatialIndex
+
+versionString = 'NCGMP09v11_LabelIndex.py, version of 17 October 2026'
+
+batchPoints = 20000     # points located at once
+maxTests = 1000000      # point-segment tests made at once
+
+def _ranges(starts,counts):
+    # [owners, members]: for each i, counts[i] members starts[i],
+    #   starts[i]+1, ..., each owned by i
+    owners = numpy.repeat(numpy.arange(len(counts)),counts)
+    offsets = numpy.cumsum(counts)-counts
+    members = numpy.arange(int(counts.sum()))+numpy.repeat(starts-offsets,counts)
+    return [owners,members]
+
+class LabelIndex:
+    def __init__(self,polygons,tolerance=0.0):
+        # polygons is a list of [key, parts]; parts as Geometry.decodeShape
+        #   returns them for polygons
+        self.tolerance = tolerance
+        self.keys = []
+        self.rings = []
+        boxes = []
+        x1, y1, x2, y2 = [], [], [], []
+        starts = []
+        counts = []
+        for key, parts in polygons:
+            rings = [Geometry.closeRing(ring) for rings in parts for ring in rings if len(ring) > 2]
+            if not rings:
+                continue
+            self.keys.append(key)
+            self.rings.append(rings)
+            boxes.append(Geometry.partsBox(rings))
+            starts.append(len(x1))
+            for ring in rings:
+                xs = [p[0] for p in ring]
+                ys = [p[1] for p in ring]
+                x1.extend(xs[:-1])
+                y1.extend(ys[:-1])
+                x2.extend(xs[1:])
+                y2.extend(ys[1:])
+            counts.append(len(x1)-starts[-1])
+        self.tree = SpatialIndex.STRtree(boxes)
+        if numpy <> None:
+            self.segments = [numpy.array(c,dtype=numpy.float64) for c in (x1,y1,x2,y2)]
+            self.segmentStarts = numpy.array(starts,dtype=numpy.int64)
+            self.segmentCounts = numpy.array(counts,dtype=numpy.int64)
+            levels, leafBoxes, items = self.tree.flatten()
+            self.levels = []
+            for entries in levels:
+                self.levels.append([numpy.array([e[0] for e in entries],dtype=numpy.float64).reshape(-1,4).T,
+                                    numpy.array([e[1] for e in entries],dtype=numpy.int64),
+                                    numpy.array([e[2] for e in entries],dtype=numpy.int64)])
+            self.leafBoxes = numpy.array(leafBoxes,dtype=numpy.float64).reshape(-1,4).T
+            self.leafItems = numpy.array(items,dtype=numpy.int64)
+
+    def _candidates(self,xs,ys):
+        # [points, polygons], arrays of pairs of point and polygon numbers
+        #   whose polygon's box holds the point
+        points = numpy.arange(len(xs))
+        nodes = numpy.zeros(len(xs),dtype=numpy.int64)
+        for boxes, first, count in self.levels+[[self.leafBoxes,None,None]]:
+            x = xs[points]
+            y = ys[points]
+            keep = (boxes[0][nodes] <= x) & (x <= boxes[2][nodes]) & (boxes[1][nodes] <= y) & (y <= boxes[3][nodes])
+            points = points[keep]
+            nodes = nodes[keep]
+            if first is not None:
+                owners, nodes = _ranges(first[nodes],count[nodes])
+                points = points[owners]
+        return [points,self.leafItems[nodes]]
+
+    def _inside(self,x,y,polygons):
+        # is each point (x, y) inside the polygon numbered in polygons?
+        owners, segs = _ranges(self.segmentStarts[polygons],self.segmentCounts[polygons])
+        px = x[owners]
+        py = y[owners]
+        ax, ay, bx, by = [c[segs] for c in self.segments]
+        straddles = (ay > py) <> (by > py)
+        old = numpy.seterr(divide='ignore',invalid='ignore')
+        try:
+            crosses = straddles & (px < ax+(py-ay)*(bx-ax)/(by-ay))
+            # distance to the segment, as Geometry.onSegment
+            dx = bx-ax
+            dy = by-ay
+            length2 = dx*dx+dy*dy
+            t = numpy.clip(numpy.where(length2 > 0,((px-ax)*dx+(py-ay)*dy)/length2,0.0),0.0,1.0)
+        finally:
+            numpy.seterr(**old)
+        ex = ax+t*dx-px
+        ey = ay+t*dy-py
+        onBoundary = ex*ex+ey*ey <= self.tolerance*self.tolerance
+        n = len(polygons)
+        inside = numpy.bincount(owners,weights=crosses,minlength=n).astype(numpy.int64) % 2 == 1
+        return inside & (numpy.bincount(owners,weights=onBoundary,minlength=n) == 0)
+
+    def _locateBatch(self,xs,ys):
+        points, polygons = self._candidates(xs,ys)
+        ends = numpy.cumsum(self.segmentCounts[polygons])
+        found = []
+        start = 0
+        while start < len(points):
+            # pairs start...stop-1 make at most maxTests tests, but at least one pair
+            stop = max(start+1,int(numpy.searchsorted(ends,ends[start]-self.segmentCounts[polygons[start]]+maxTests,'right')))
+            p = points[start:stop]
+            inside = self._inside(xs[p],ys[p],polygons[start:stop])
+            found.append([p[inside],polygons[start:stop][inside]])
+            start = stop
+        return found
+
+    def locate(self,points):
+        # [point number, polygon number] of each point (x, y) in points inside
+        #   each polygon, sorted by polygon then point
+        if not self.keys or not points:
+            return []
+        if numpy == None:
+            pairs = []
+            for i in xrange(len(points)):
+                p = points[i]
+                for k in self.tree.query((p[0],p[1],p[0],p[1])):
+                    if Geometry.pointInPolygon(p,self.rings[k],self.tolerance) == 1:
+                        pairs.append([k,i])
+            pairs.sort()
+            return [[i,k] for k, i in pairs]
+        pointNumbers = []
+        polygonNumbers = []
+        for first in xrange(0,len(points),batchPoints):
+            batch = points[first:first+batchPoints]
+            xs = numpy.array([p[0] for p in batch],dtype=numpy.float64)
+            ys = numpy.array([p[1] for p in batch],dtype=numpy.float64)
+            for p, k in self._locateBatch(xs,ys):
+                pointNumbers.append(p+first)
+                polygonNumbers.append(k)
+        if not pointNumbers:
+            return []
+        pointNumbers = numpy.concatenate(pointNumbers)
+        polygonNumbers = numpy.concatenate(polygonNumbers)
+        order = numpy.lexsort((pointNumbers,polygonNumbers))
+        return zip(pointNumbers[order].tolist(),polygonNumbers[order].tolist())
+
+    def assign(self,labels):
+        # labels is a list of [key, (x, y)]. Returns [polygonLabels,
+        #   unplaced]: {polygon key: [label keys, in order of labels]} of
+        #   polygons with labels inside, and keys of labels in no polygon
+        polygonLabels = {}
+        placed = set()
+        for i, k in self.locate([p for key, p in labels]):
+            polygonLabels.setdefault(self.keys[k],[]).append(labels[i][0])
+            placed.add(i)
+        unplaced = [labels[i][0] for i in xrange(len(labels)) if not i in placed]
+        return [polygonLabels,unplaced]
+
+def assignLabels(polygons,labels,tolerance=0.0):
+    # see LabelIndex.__init__ and LabelIndex.assign
+    return LabelIndex(polygons,tolerance).assign(labels)
+
+def labelConflicts(polygonLabels,labelValues):
+    # polygons whose labels disagree, as MakePolys finds them. polygonLabels
+    #   is as returned by assign, labelValues is {label key: values
+    #   compared}. Returns [badPolygons, badLabels]: the set of keys of
+    #   those polygons and {label key: polygon key} of all their labels
+    badPolygons = set()
+    badLabels = {}
+    for polygon, labels in polygonLabels.iteritems():
+        first = labelValues[labels[0]]
+        for label in labels[1:]:
+            if labelValues[label] <> first:
+                badPolygons.add(polygon)
+                for each in labels:
+                    badLabels[each] = polygon
+                break
+    return [badPolygons,badLabels]
@@ -0,0 +1,544 @@
+# NCGMP09v11_PolyBuilder.py
+#   Rebuilds MapUnitPolys from ContactsAndFaults with NCGMP09v11_Polygonizer,
+#   as NCGMP09v1.1_MakePolys does with FeatureToPolygon, but only where
+#   lines have changed since the last build.
+#
+#   Each build writes a state file, <database>-<polygonClass>.polystate
+#   next to the database (next to the geodatabase for a feature dataset),
+#   that records the tolerance, the MD5 of the WKB and the box of each line
+#   that bounds polygons (those not concealed), and the MD5 of the WKB,
+#   the box and the canonical form of the face of each polygon. The next
+#   build compares the lines with it:
+#     - lines added, deleted, reshaped, concealed or revealed have changed;
+#       their old and new boxes are the changed boxes
+#     - polygons whose boxes meet a changed box may have changed. All
+#       others are still faces of the lines and are not touched, so they
+#       keep their ObjectIDs, _IDs and other attributes
+#     - the lines that reach into windows around the changed boxes and
+#       those polygons are polygonized. Lines outside a window cannot cut a
+#       face whose box is within it, so such faces are right; windows are
+#       grown until every face that meets a changed box is within one
+#     - a face identical to a polygon it would replace keeps that polygon;
+#       the other faces are inserted and the polygons they replace deleted
+#   New faces take the attributes of the first label point inside them, as
+#   FeatureToPolygon does with the temporary labels of MakePolys: first a
+#   point inside each deleted polygon (Geometry.interiorPoint, as
+#   FeatureToPoint INSIDE), with its attributes, unless its MapUnit is
+#   blank, then the points of MapUnitPoints. Faces without a label have
+#   null attributes. Labels are located with NCGMP09v11_LabelIndex.
+#   A full build goes the same way with all lines, polygons and faces. It
+#   is made when there is no state, when the state is for other feature
+#   classes or another tolerance, or when polygons have been edited since
+#   the last build (their WKB is not as recorded). With tiles > 1 a full
+#   build polygonizes the map in that many tiles, in processes worker
+#   processes (NCGMP09v11_TiledPolygonizer); the faces are the same.
+#
+#   SQLite and GeoPackage copies are edited with sqlite3. Geodatabases are
+#   edited in an arcpy edit session, as feature classes in a topology
+#   require; arcpy is imported only then.
+
+import os.path, struct, time
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_SpatialIndex as SpatialIndex
+import NCGMP09v11_Polygonizer as Polygonizer
+import NCGMP09v11_TiledPolygonizer as TiledPolygonizer
+import NCGMP09v11_LabelIndex as LabelIndex
+import NCGMP09v11_TableScanner as TableScanner
+import NCGMP09v11_DatabaseDiff as DatabaseDiff
+import NCGMP09v11_Validator as Validator
+from NCGMP09v11_TableScanner import oidToken, shapeToken, sqlName
+
+versionString = 'NCGMP09v11_PolyBuilder.py, version of 17 October 2026'
+
+stateVersion = 1
+
+def stateFileName(database,polygonClass='MapUnitPolys'):
+    path = os.path.abspath(database)
+    head = path
+    while os.path.splitext(head)[1].lower() not in Validator.geodatabaseExtensions and os.path.dirname(head) <> head:
+        head = os.path.dirname(head)
+    if os.path.splitext(head)[1].lower() in Validator.geodatabaseExtensions:
+        path = head
+    return os.path.splitext(path)[0]+'-'+polygonClass+'.polystate'
+
+def readState(fileName):
+    # state dictionary, or None if there is no readable state file
+    try:
+        inf = open(fileName,'rb')
+        try:
+            state = pickle.load(inf)
+        finally:
+            inf.close()
+    except:
+        return None
+    if not isinstance(state,dict) or state.get('version') <> stateVersion:
+        return None
+    return state
+
+def writeState(fileName,state):
+    outf = open(fileName,'wb')
+    try:
+        pickle.dump(state,outf,2)
+    finally:
+        outf.close()
+
+def _digest(blob):
+    if blob == None:
+        return None
+    return md5(str(blob)).hexdigest()
+
+def faceKey(rings):
+    # identifies a polygon by its canonical rings (Polygonizer.canonicalRings)
+    return md5(repr(Polygonizer.canonicalRings(rings))).hexdigest()
+
+def _within(box,window):
+    return window[0] <= box[0] and window[1] <= box[1] and box[2] <= window[2] and box[3] <= window[3]
+
+def mergeBoxes(boxes):
+    # boxes, with those that intersect replaced by the box around them
+    while True:
+        tree = SpatialIndex.STRtree(boxes)
+        parent = range(len(boxes))
+        def root(i):
+            while parent[i] <> i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        merged = False
+        for a, b in tree.pairs():
+            ra, rb = root(a), root(b)
+            if ra <> rb:
+                parent[max(ra,rb)] = min(ra,rb)
+                merged = True
+        if not merged:
+            return boxes
+        groups = {}
+        for i in range(len(boxes)):
+            groups.setdefault(root(i),[]).append(boxes[i])
+        boxes = [SpatialIndex.unionBox(groups[i]) for i in sorted(groups)]
+
+def _tableExists(reader,table):
+    try:
+        return len(reader.listFields(table)) > 0
+    except:
+        return False
+
+def attributeFields(reader,table):
+    # Fields of table that are copied from labels: not the ObjectID, the
+    #   shape, required fields or fields derived from the shape
+    return [f for f in reader.listFields(table) if not f.type in ('OID','Geometry') and not f.required
+            and not f.name in DatabaseDiff.derivedFields]
+
+def _blank(field):
+    # value of field of an unlabeled polygon
+    if field.isNullable:
+        return None
+    if field.type == 'String':
+        return ''
+    return 0
+
+#------------ editors -------------
+
+class SqliteEditor:
+    def __init__(self,reader,path):
+        self.connection = reader.connection
+        self.reader = reader
+        self.geoPackage = os.path.splitext(path)[1].lower() == '.gpkg'
+    def _srid(self,table,shapeName):
+        # spatial reference ID in the header of an existing GeoPackage blob
+        column = sqlName(shapeName)
+        row = self.connection.execute('SELECT '+column+' FROM '+sqlName(table)+' WHERE '+column+
+                                      ' IS NOT NULL LIMIT 1').fetchone()
+        if row <> None:
+            blob = str(row[0])
+            if blob[0:2] == 'GP':
+                if ord(blob[3]) & 1:
+                    return struct.unpack('<i',blob[4:8])[0]
+                return struct.unpack('>i',blob[4:8])[0]
+        return 0
+    def delete(self,table,oids):
+        oidName = sqlName(self.reader.oidName(table))
+        for i in range(0,len(oids),TableScanner.oidBatch):
+            batch = oids[i:i+TableScanner.oidBatch]
+            self.connection.execute('DELETE FROM '+sqlName(table)+' WHERE '+oidName+' IN ('+
+                                    ','.join(['?']*len(batch))+')',batch)
+    def insert(self,table,fieldNames,rows):
+        # rows are [rings, values]; returns ObjectIDs of the new rows
+        import sqlite3
+        shapeName = self.reader.shapeName(table)
+        srid = 0
+        if self.geoPackage:
+            srid = self._srid(table,shapeName)
+        q = ('INSERT INTO '+sqlName(table)+' ('+','.join([sqlName(n) for n in [shapeName]+fieldNames])+
+             ') VALUES ('+','.join(['?']*(len(fieldNames)+1))+')')
+        oids = []
+        cursor = self.connection.cursor()
+        for rings, values in rows:
+            shape = sqlite3.Binary(Geometry.encodeShape('Polygon',[rings],self.geoPackage,srid))
+            cursor.execute(q,(shape,)+tuple(values))
+            oids.append(cursor.lastrowid)
+        return oids
+    def commit(self):
+        self.connection.commit()
+    def abort(self):
+        self.connection.rollback()
+
+class ArcpyEditor:
+    def __init__(self,workspace):
+        import arcpy
+        self.arcpy = arcpy
+        self.workspace = workspace
+        geodatabase = os.path.abspath(workspace)
+        while os.path.splitext(geodatabase)[1].lower() not in Validator.geodatabaseExtensions and \
+              os.path.dirname(geodatabase) <> geodatabase:
+            geodatabase = os.path.dirname(geodatabase)
+        self.editor = arcpy.da.Editor(geodatabase)
+        self.editor.startEditing(False,False)
+        self.editor.startOperation()
+    def delete(self,table,oids):
+        arcpy = self.arcpy
+        path = os.path.join(self.workspace,table)
+        oidName = arcpy.AddFieldDelimiters(path,arcpy.Describe(path).OIDFieldName)
+        for i in range(0,len(oids),TableScanner.oidBatch):
+            where = oidName+' IN ('+','.join([str(oid) for oid in oids[i:i+TableScanner.oidBatch]])+')'
+            cursor = arcpy.da.UpdateCursor(path,[oidToken],where)
+            try:
+                for row in cursor:
+                    cursor.deleteRow()
+            finally:
+                del cursor
+    def insert(self,table,fieldNames,rows):
+        # rings are reversed, as ArcGIS has exteriors clockwise
+        arcpy = self.arcpy
+        path = os.path.join(self.workspace,table)
+        spatialReference = arcpy.Describe(path).spatialReference
+        oids = []
+        cursor = arcpy.da.InsertCursor(path,['SHAPE@']+fieldNames)
+        try:
+            for rings, values in rows:
+                polygon = arcpy.Polygon(arcpy.Array([arcpy.Array([arcpy.Point(x,y) for x, y in ring[::-1]])
+                                                     for ring in rings]),spatialReference)
+                oids.append(cursor.insertRow((polygon,)+tuple(values)))
+        finally:
+            del cursor
+        return oids
+    def commit(self):
+        self.editor.stopOperation()
+        self.editor.stopEditing(True)
+    def abort(self):
+        self.editor.abortOperation()
+        self.editor.stopEditing(False)
+
+def openEditor(database,reader):
+    if os.path.splitext(database)[1].lower() in DatabaseDiff.sqliteExtensions:
+        return SqliteEditor(reader,database)
+    return ArcpyEditor(database)
+
+#------------ builder -------------
+
+class PolyBuilder:
+    def __init__(self,database,polygonClass='MapUnitPolys',lineClass='ContactsAndFaults',
+                 pointClass='MapUnitPoints',tolerance=None,progress=None,tiles=1,processes=None):
+        self.database = database
+        self.polygonClass = polygonClass
+        self.lineClass = lineClass
+        self.pointClass = pointClass
+        self.tolerance = tolerance
+        self.progress = progress
+        self.tiles = tiles
+        self.processes = processes   # None for one per processor
+        self.stateFile = stateFileName(database,polygonClass)
+        self.mode = None       # 'full', 'incremental' or 'unchanged'
+        self.reason = ''       # why a full build was made
+        self.counts = {}
+        self.seconds = 0.0
+
+    def _message(self,msg):
+        if self.progress <> None:
+            self.progress(msg)
+
+    def _readLines(self,stateLines):
+        # {ObjectID: [digest, box]} of the lines that bound polygons. The box
+        #   is taken from stateLines if the line is as recorded there, else
+        #   its WKB is kept in self.blobs
+        lines = {}
+        self.blobs = {}
+        for oid, blob in Polygonizer.contactRows(self.reader,self.lineClass):
+            digest = _digest(blob)
+            recorded = stateLines.get(oid)
+            if recorded <> None and recorded[0] == digest:
+                lines[oid] = recorded
+                continue
+            kind, parts = Geometry.decodeShape(blob)
+            box = None
+            if parts:
+                box = Geometry.partsBox(parts)
+                self.blobs[oid] = blob
+            lines[oid] = (digest,box)
+        return lines
+
+    def _polygonEntries(self,oids,statePolygons):
+        # {ObjectID: [digest, box, face key]} of polygons, from statePolygons
+        #   where the polygon is as recorded there
+        entries = {}
+        for oid, blob in self.reader.rowsByOid(self.polygonClass,[oidToken,shapeToken],sorted(oids)):
+            digest = _digest(blob)
+            recorded = statePolygons.get(oid)
+            if recorded <> None and recorded[0] == digest:
+                entries[oid] = recorded
+                continue
+            kind, parts = Geometry.decodeShape(blob)
+            box = None
+            key = None
+            if parts:
+                box = Geometry.partsBox([ring for rings in parts for ring in rings])
+                if len(parts) == 1:
+                    key = faceKey(parts[0])
+            entries[oid] = (digest,box,key)
+        return entries
+
+    def _polygonize(self,oids,tolerance,tiles=1):
+        if tiles > 1:
+            polygonizer = TiledPolygonizer.TiledPolygonizer(tolerance,tiles,self.processes)
+        else:
+            polygonizer = Polygonizer.Polygonizer(tolerance)
+        stored = [oid for oid in oids if not oid in self.blobs]
+        polygonizer.addLines([[oid,self.blobs[oid]] for oid in oids if oid in self.blobs])
+        polygonizer.addLines(self.reader.rowsByOid(self.lineClass,[oidToken,shapeToken],sorted(stored)))
+        polygonizer.run()
+        return polygonizer
+
+    def _fullReason(self,state,polygonDigests):
+        # why a full build must be made, or None
+        if state == None:
+            return 'no state file'
+        if [state['polygonClass'],state['lineClass']] <> [self.polygonClass,self.lineClass]:
+            return 'state is for '+state['polygonClass']+' from '+state['lineClass']
+        if self.tolerance <> None and self.tolerance <> state['tolerance']:
+            return 'tolerance changed from '+repr(state['tolerance'])
+        recorded = dict([[oid,entry[0]] for oid, entry in state['polygons'].iteritems()])
+        if recorded <> polygonDigests:
+            return self.polygonClass+' edited since last build'
+        return None
+
+    def _labels(self,fields,removed):
+        # [[(x, y), values], ...] in order of use: points inside deleted
+        #   polygons, then MapUnitPoints
+        names = [f.name for f in fields]
+        labels = []
+        mapUnit = None
+        if 'MapUnit' in names:
+            mapUnit = names.index('MapUnit')
+        rows = list(self.reader.rowsByOid(self.polygonClass,[oidToken,shapeToken]+names,removed))
+        rows.sort()
+        for row in rows:
+            values = row[2:]
+            if mapUnit <> None and values[mapUnit] in ('',None):
+                continue
+            kind, parts = Geometry.decodeShape(row[1])
+            best = None
+            for rings in parts:
+                rings = Geometry.orientPolygon(rings)
+                area = sum([Geometry.signedArea(ring) for ring in rings])
+                if best == None or area > best[0]:
+                    best = [area,rings]
+            if best <> None:
+                p = Geometry.interiorPoint(best[1])
+                if p <> None:
+                    labels.append([p,values])
+        if self.pointClass and _tableExists(self.reader,self.pointClass):
+            pointNames = [f.name for f in self.reader.listFields(self.pointClass)]
+            shared = [name for name in names if name in pointNames]
+            positions = [shared.index(name) if name in shared else None for name in names]
+            blanks = [_blank(f) for f in fields]
+            for row in self.reader.rows(self.pointClass,[shapeToken]+shared):
+                kind, parts = Geometry.decodeShape(row[0])
+                if kind <> 'Point' or not parts:
+                    continue
+                values = [blanks[i] if positions[i] == None else row[1+positions[i]] for i in range(len(names))]
+                labels.append([parts[0],values])
+        return labels
+
+    def _assign(self,faces,labels,eps):
+        # values of the first label inside each face, or None
+        assigned = [None]*len(faces)
+        polygonLabels, unplaced = LabelIndex.assignLabels([[i,[faces[i].rings]] for i in range(len(faces))],
+                                                          [[j,labels[j][0]] for j in range(len(labels))],eps)
+        for i, js in polygonLabels.iteritems():
+            assigned[i] = labels[js[0]][1]
+        return assigned
+
+    def run(self,incremental=True):
+        startTime = time.time()
+        counts = self.counts
+        self.reader = DatabaseDiff.openReader(self.database)
+        state = readState(self.stateFile)
+        polygonDigests = {}
+        for oid, blob in self.reader.rows(self.polygonClass,[oidToken,shapeToken]):
+            polygonDigests[oid] = _digest(blob)
+        counts['polygons'] = len(polygonDigests)
+        self.reason = self._fullReason(state,polygonDigests)
+        if not incremental:
+            self.reason = 'incremental build not requested'
+        if self.reason == None:
+            self.mode = 'incremental'
+            stateLines = state['lines']
+            statePolygons = state['polygons']
+            tolerance = state['tolerance']
+        else:
+            self.mode = 'full'
+            stateLines = {}
+            statePolygons = {}
+            if state <> None and [state['polygonClass'],state['lineClass']] == [self.polygonClass,self.lineClass]:
+                statePolygons = state['polygons']
+            tolerance = self.tolerance
+        self._message('    reading '+self.lineClass)
+        lines = self._readLines(stateLines)
+        counts['lines'] = len(lines)
+        if self.mode == 'full':
+            self._message('    full build: '+self.reason)
+            polygons = self._polygonEntries(polygonDigests.keys(),statePolygons)
+            affected = set(polygons.keys())
+            counts['changedLines'] = len(lines)
+            if self.tiles > 1:
+                self._message('    polygonizing in '+str(self.tiles)+' tiles')
+            polygonizer = self._polygonize(sorted([oid for oid in lines if lines[oid][1] <> None]),tolerance,self.tiles)
+            faces = polygonizer.faces
+            counts['windows'] = 1
+            counts['tiles'] = polygonizer.counts.get('tiles',1)
+            counts['seamFaces'] = polygonizer.counts.get('seamFaces',0)
+        else:
+            polygons = dict(statePolygons)
+            changed = [oid for oid in lines if stateLines.get(oid) <> lines[oid]]
+            changed = changed+[oid for oid in stateLines if not oid in lines]
+            counts['changedLines'] = len(changed)
+            changedBoxes = []
+            for oid in changed:
+                for entry in (stateLines.get(oid),lines.get(oid)):
+                    if entry <> None and entry[1] <> None:
+                        changedBoxes.append(entry[1])
+            if not changedBoxes:
+                self.mode = 'unchanged'
+                for name in ('deleted','inserted','kept','labeled','unlabeled','windows'):
+                    counts[name] = 0
+                if changed:
+                    state['lines'] = lines
+                    writeState(self.stateFile,state)
+                self.seconds = time.time()-startTime
+                return self
+            oids = [oid for oid in sorted(polygons) if polygons[oid][1] <> None]
+            polygonTree = SpatialIndex.STRtree([polygons[oid][1] for oid in oids],oids)
+            affected = set()
+            for box in changedBoxes:
+                affected.update(polygonTree.query(box))
+            windows = mergeBoxes(changedBoxes+[polygons[oid][1] for oid in affected])
+            oids = [oid for oid in sorted(lines) if lines[oid][1] <> None]
+            lineTree = SpatialIndex.STRtree([lines[oid][1] for oid in oids],oids)
+            changedTree = SpatialIndex.STRtree(changedBoxes)
+            counts['passes'] = 0
+            while True:
+                counts['passes'] += 1
+                inWindows = set()
+                for window in windows:
+                    inWindows.update(lineTree.query(window))
+                self._message('    polygonizing '+str(len(inWindows))+' lines in '+str(len(windows))+' windows')
+                polygonizer = self._polygonize(sorted(inWindows),tolerance)
+                faces = [face for face in polygonizer.faces if changedTree.query(face.box())]
+                outside = []
+                for face in faces:
+                    box = face.box()
+                    if not [window for window in windows if _within(box,window)]:
+                        outside.append(box)
+                if not outside:
+                    break
+                windows = mergeBoxes(windows+outside)
+            counts['windows'] = len(windows)
+            counts['linesPolygonized'] = len(inWindows)
+        if tolerance == None:
+            tolerance = polygonizer.eps
+        # keep polygons that are faces still
+        byKey = {}
+        for oid in sorted(affected):
+            key = polygons[oid][2]
+            if key <> None and not key in byKey:
+                byKey[key] = oid
+        kept = set()
+        newFaces = []
+        newKeys = []
+        for face in faces:
+            key = faceKey(face.rings)
+            oid = byKey.get(key)
+            if oid <> None and not oid in kept:
+                kept.add(oid)
+            else:
+                newFaces.append(face)
+                newKeys.append(key)
+        removed = sorted(affected-kept)
+        counts['kept'] = len(kept)
+        counts['deleted'] = len(removed)
+        counts['inserted'] = len(newFaces)
+        # label new faces and write
+        fields = attributeFields(self.reader,self.polygonClass)
+        self._message('    labeling '+str(len(newFaces))+' new polygons')
+        assigned = self._assign(newFaces,self._labels(fields,removed),polygonizer.eps)
+        counts['unlabeled'] = len([values for values in assigned if values == None])
+        counts['labeled'] = len(newFaces)-counts['unlabeled']
+        blanks = [_blank(f) for f in fields]
+        rows = []
+        for i in range(len(newFaces)):
+            values = assigned[i]
+            if values == None:
+                values = blanks
+            rows.append([newFaces[i].rings,values])
+        self._message('    deleting '+str(len(removed))+' and inserting '+str(len(newFaces))+' polygons')
+        editor = openEditor(self.database,self.reader)
+        try:
+            editor.delete(self.polygonClass,removed)
+            newOids = editor.insert(self.polygonClass,[f.name for f in fields],rows)
+            editor.commit()
+        except:
+            editor.abort()
+            raise
+        # record state
+        for oid in removed:
+            del polygons[oid]
+        boxes = dict([[newOids[i],newFaces[i].box()] for i in range(len(newOids))])
+        keys = dict([[newOids[i],newKeys[i]] for i in range(len(newOids))])
+        for oid, blob in self.reader.rowsByOid(self.polygonClass,[oidToken,shapeToken],sorted(newOids)):
+            polygons[oid] = (_digest(blob),boxes[oid],keys[oid])
+        counts['polygons'] = len(polygons)
+        writeState(self.stateFile,{'version':stateVersion,'polygonClass':self.polygonClass,
+                                   'lineClass':self.lineClass,'tolerance':tolerance,
+                                   'lines':lines,'polygons':polygons})
+        self.seconds = time.time()-startTime
+        return self
+
+    def reportLines(self):
+        counts = self.counts
+        yield '  '+self.mode+' build of '+self.polygonClass+' from '+self.lineClass+', %.1f seconds' % self.seconds
+        if self.mode == 'full':
+            yield '    '+self.reason
+            if counts['tiles'] > 1:
+                yield '    polygonized in '+str(counts['tiles'])+' tiles, '+str(counts['seamFaces'])+ \
+                      ' polygons across their seams'
+        yield '    '+str(counts['lines'])+' lines, '+str(counts['changedLines'])+' changed'
+        if self.mode == 'incremental':
+            yield '    '+str(counts['linesPolygonized'])+' lines polygonized in '+str(counts['windows'])+ \
+                  ' windows, '+str(counts['passes'])+' passes'
+        yield '    '+str(counts['deleted'])+' polygons deleted, '+str(counts['inserted'])+' inserted ('+ \
+              str(counts['unlabeled'])+' unlabeled), '+str(counts['kept'])+' rebuilt unchanged; '+ \
+              str(counts['polygons'])+' polygons'
+
+def rebuild(database,polygonClass='MapUnitPolys',lineClass='ContactsAndFaults',pointClass='MapUnitPoints',
+            incremental=True,tolerance=None,progress=None,tiles=1,processes=None):
+    # PolyBuilder, run
+    builder = PolyBuilder(database,polygonClass,lineClass,pointClass,tolerance,progress,tiles,processes)
+    return builder.run(incremental)
@@ -0,0 +1,584 @@
+# NCGMP09v11_Polygonizer.py
+#   Polygons from lines, as arcpy.FeatureToPolygon_management makes
+#   MapUnitPolys from ContactsAndFaults in NCGMP09v1.1_MakePolys, without
+#   ArcGIS.
+#
+#   1. Noding. Each path of each line is cut into monotone chains: runs of
+#      at most chainLength segments that all head into the same quadrant,
+#      so that no two segments of a chain cross. The chains' boxes are
+#      packed into an STR-tree (NCGMP09v11_SpatialIndex); each pair of
+#      chains whose boxes meet is compared, but only the segments of each
+#      that reach into the overlap of the two boxes, with
+#      Geometry.intersection. Where two segments cross, touch or overlap,
+#      both are split at the shared points. Split points within tolerance
+#      (by default a billionth of the size of the map) of a vertex are moved
+#      to it, and split points within tolerance of each other are merged.
+#   2. Graph. The paths, cut at the split points, give edges between nodes;
+#      edges that repeat another (duplicate lines, overlapping lines) are
+#      kept once. Each edge is two half-edges, one each way, and the
+#      half-edges leaving a node are sorted by angle. Edges with a free end
+#      (dangles) are removed, repeatedly, as FeatureToPolygon ignores them.
+#   3. Faces. Following each half-edge by the next one clockwise around
+#      the node it arrives at traces the boundary of the face to its left.
+#      Counterclockwise boundaries are the exteriors of faces; clockwise
+#      ones are the outer boundaries of connected parts of the network,
+#      and each is a hole in the smallest face around it (found with an
+#      STR-tree of face boxes and a point-in-polygon test) or, if there is
+#      none, bounds the map. An edge with the same face on both sides
+#      (a line joining an island to its surroundings) bounds nothing; it is
+#      removed and the faces traced again.
+#   Faces are returned in a canonical order (each ring starts at its least
+#   vertex, faces are sorted by their rings' first points) so that the
+#   same lines always give the same list, whatever their order.
+#   If core is set to a box, node takes only the pairs of chains whose
+#   overlap has its lower left corner in it, xmin <= x < xmax and
+#   ymin <= y < ymax, for NCGMP09v11_TiledPolygonizer, which nodes a map
+#   tile by tile.
+#
+#   Does not import arcpy.
+
+import math, time, gc
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_SpatialIndex as SpatialIndex
+
+versionString = 'NCGMP09v11_Polygonizer.py, version of 17 October 2026'
+
+chainLength = 32   # most segments in a monotone chain
+
+def monotoneChains(path,maxLength=chainLength):
+    # [first, last] vertex numbers of the chains of path, which has no
+    #   repeated consecutive vertices
+    chains = []
+    first = 0
+    quadrant = None
+    for i in xrange(len(path)-1):
+        p = path[i]
+        q = path[i+1]
+        segQuadrant = (q[0] >= p[0],q[1] >= p[1])
+        if i > first and (segQuadrant <> quadrant or i-first >= maxLength):
+            chains.append([first,i])
+            first = i
+        quadrant = segQuadrant
+    chains.append([first,len(path)-1])
+    return chains
+
+def _meet(a,b,c,d,eps):
+    # Geometry.intersection of segments ab and cd taken in a standard
+    #   order, so that a crossing comes out the same whichever is first
+    if b < a:
+        a, b = b, a
+    if d < c:
+        c, d = d, c
+    if (c,d) < (a,b):
+        a, b, c, d = c, d, a, b
+    return Geometry.intersection(a,b,c,d,eps)
+
+def _sweep(pathA,segsA,pathB,segsB,axis,eps):
+    # (i, j) of segments i of pathA and j of pathB whose ranges along axis
+    #   (0 for x, 1 for y) overlap, found by sweeping along it
+    ranges = []
+    for path, segs, side in ((pathA,segsA,0),(pathB,segsB,1)):
+        for i in segs:
+            lo = path[i][axis]
+            hi = path[i+1][axis]
+            if hi < lo:
+                lo, hi = hi, lo
+            ranges.append((lo,hi,side,i))
+    ranges.sort()
+    active = ([],[])
+    pairs = []
+    for lo, hi, side, i in ranges:
+        others = [r for r in active[1-side] if r[0] >= lo-eps]
+        active[1-side][:] = others
+        for otherHi, j in others:
+            if side == 0:
+                pairs.append((i,j))
+            else:
+                pairs.append((j,i))
+        active[side].append((hi,i))
+    return pairs
+
+def _ringStart(ring):
+    # closed ring rotated to start at its least vertex
+    points = ring[:-1]
+    k = points.index(min(points))
+    return points[k:]+points[:k+1]
+
+def canonicalRings(rings):
+    # rings of a polygon in the form of Face.rings: exterior
+    #   counterclockwise, holes clockwise, each starting at its least
+    #   vertex, holes in order of their first vertices
+    rings = [_ringStart(ring) for ring in Geometry.orientPolygon(rings) if len(ring) > 2]
+    return rings[0:1]+sorted(rings[1:])
+
+def _angle(p,q):
+    return math.atan2(q[1]-p[1],q[0]-p[0])
+
+class Face:
+    def __init__(self,rings,area,halves):
+        self.rings = rings    # exterior counterclockwise, then holes clockwise; closed
+        self.area = area      # of exterior less holes
+        self.halves = halves  # half-edges of the exterior, then of each hole
+        self.edges = [h >> 1 for h in halves]   # their edge numbers
+
+    def box(self):
+        return Geometry.partsBox(self.rings[0:1])
+
+    def shape(self):
+        # [kind, parts], for Geometry.encodeShape
+        return ['Polygon',[self.rings]]
+
+class Polygonizer:
+    def __init__(self,tolerance=None):
+        self.tolerance = tolerance
+        self.paths = []       # [(x, y), ...], no repeated consecutive vertices
+        self.pathLines = []   # OBJECTID of line of each path
+        self.edges = []       # [(x, y), ...] from node to node
+        self.edgeLines = []   # [OBJECTID, ...] of lines along each edge
+        self.faces = []       # Faces
+        self.outerRings = []  # clockwise rings bounding the map
+        self.core = None      # box of the pairs of chains noded, or None for all
+        self.counts = {}
+        self.seconds = {}
+
+    def addLines(self,rows):
+        # rows of (OBJECTID, WKB)
+        for oid, blob in rows:
+            kind, paths = Geometry.decodeShape(blob)
+            self.addPaths(oid,paths)
+
+    def addPaths(self,oid,paths):
+        for path in paths:
+            points = [path[0]]
+            for p in path:
+                if p <> points[-1]:
+                    points.append(p)
+            if len(points) > 1:
+                self.paths.append(points)
+                self.pathLines.append(oid)
+
+    def _tolerance(self):
+        if self.tolerance <> None:
+            return self.tolerance
+        if not self.paths:
+            return 0.0
+        box = SpatialIndex.unionBox([Geometry.partsBox([path]) for path in self.paths])
+        size = max(box[2]-box[0],box[3]-box[1],abs(box[0]),abs(box[1]),abs(box[2]),abs(box[3]))
+        return size*1e-9
+
+    def run(self):
+        # nodes the lines, builds the graph and traces faces; returns faces.
+        #   The cyclic garbage collector is held off meanwhile: none of the
+        #   millions of tuples and lists made are in cycles, and its passes
+        #   over them would take longer than the rest
+        self.eps = self._tolerance()
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            startTime = time.time()
+            self.node()
+            self.seconds['noding'] = time.time()-startTime
+            startTime = time.time()
+            self.buildEdges()
+            self.seconds['edges'] = time.time()-startTime
+            startTime = time.time()
+            self.traceFaces()
+            self.seconds['faces'] = time.time()-startTime
+        finally:
+            if collecting:
+                gc.enable()
+        self.counts['faces'] = len(self.faces)
+        self.counts['holes'] = sum([len(face.rings)-1 for face in self.faces])
+        return self.faces
+
+    #------------ noding -------------
+
+    def node(self):
+        # finds where paths meet: self.breaks (path number -> vertex numbers
+        #   where it is cut) and self.splits ((path, segment) -> points
+        #   within the segment where it is cut)
+        eps = self.eps
+        self.breaks = {}
+        self.splits = {}
+        chains = []
+        boxes = []
+        for k in xrange(len(self.paths)):
+            path = self.paths[k]
+            for first, last in monotoneChains(path):
+                chains.append((k,first,last))
+                ends = (path[first],path[last])
+                boxes.append((min(ends[0][0],ends[1][0])-eps,min(ends[0][1],ends[1][1])-eps,
+                              max(ends[0][0],ends[1][0])+eps,max(ends[0][1],ends[1][1])+eps))
+        tree = SpatialIndex.STRtree(boxes)
+        core = self.core
+        nPairs = 0
+        for a, b in tree.pairs():
+            if core <> None:
+                x = max(boxes[a][0],boxes[b][0])
+                y = max(boxes[a][1],boxes[b][1])
+                if x < core[0] or x >= core[2] or y < core[1] or y >= core[3]:
+                    continue
+            nPairs = nPairs+1
+            self._nodeChains(chains[a],chains[b],boxes[a],boxes[b])
+        self.counts['paths'] = len(self.paths)
+        self.counts['vertices'] = sum([len(path) for path in self.paths])
+        self.counts['chains'] = len(chains)
+        self.counts['chainPairs'] = nPairs
+
+    def _segmentsIn(self,chain,box):
+        # segment numbers of chain that reach into box
+        k, first, last = chain
+        if last == first+1:
+            return [first]
+        path = self.paths[k]
+        xmin, ymin, xmax, ymax = box
+        found = []
+        for i in xrange(first,last):
+            p = path[i]
+            q = path[i+1]
+            if p[0] <= q[0]:
+                if q[0] < xmin or p[0] > xmax:
+                    continue
+            elif p[0] < xmin or q[0] > xmax:
+                continue
+            if p[1] <= q[1]:
+                if q[1] < ymin or p[1] > ymax:
+                    continue
+            elif p[1] < ymin or q[1] > ymax:
+                continue
+            found.append(i)
+        return found
+
+    def _nodeChains(self,chainA,chainB,boxA,boxB):
+        eps = self.eps
+        box = (max(boxA[0],boxB[0]),max(boxA[1],boxB[1]),min(boxA[2],boxB[2]),min(boxA[3],boxB[3]))
+        segsA = self._segmentsIn(chainA,box)
+        if not segsA:
+            return
+        segsB = self._segmentsIn(chainB,box)
+        ka = chainA[0]
+        kb = chainB[0]
+        pathA = self.paths[ka]
+        pathB = self.paths[kb]
+        if len(segsA)*len(segsB) <= 16:
+            candidates = [(i,j) for i in segsA for j in segsB]
+        else:
+            # long runs side by side, as where lines overlap
+            axis = int(box[3]-box[1] > box[2]-box[0])
+            candidates = _sweep(pathA,segsA,pathB,segsB,axis,eps)
+        for i, j in candidates:
+            a = pathA[i]
+            b = pathA[i+1]
+            c = pathB[j]
+            d = pathB[j+1]
+            # most segments that meet share a vertex, and meet only there
+            #   unless they are collinear
+            shared = None
+            if a == c or a == d:
+                shared, u, m = a, b, i
+            elif b == c or b == d:
+                shared, u, m = b, a, i+1
+            if shared <> None:
+                if shared == c:
+                    w, n = d, j
+                else:
+                    w, n = c, j+1
+                area = abs(Geometry.cross(shared,u,w))
+                if area > eps*max(abs(u[0]-shared[0]),abs(u[1]-shared[1])) and \
+                   area > eps*max(abs(w[0]-shared[0]),abs(w[1]-shared[1])):
+                    if ka <> kb or m <> n:
+                        self._break(ka,m)
+                        self._break(kb,n)
+                    continue
+                if ka == kb and m == n and \
+                   (u[0]-shared[0])*(w[0]-shared[0])+(u[1]-shared[1])*(w[1]-shared[1]) < 0:
+                    # consecutive segments of a path, in line
+                    continue
+            meet = _meet(a,b,c,d,eps)
+            if meet == None:
+                continue
+            kind, p = meet
+            if ka == kb and kind == 'touch' and ((j == i+1 and p == b) or (i == j+1 and p == a)):
+                # consecutive segments of a path
+                continue
+            if kind == 'overlap':
+                points = [p for p in (a,b) if Geometry.onSegment(p,c,d,eps)]+ \
+                         [p for p in (c,d) if Geometry.onSegment(p,a,b,eps)]
+            else:
+                points = [p]
+            for p in points:
+                self._split(ka,i,p)
+                self._split(kb,j,p)
+
+    def _break(self,k,n):
+        # cut path k at its vertex n
+        if 0 < n < len(self.paths[k])-1:
+            self.breaks.setdefault(k,set()).add(n)
+
+    def _split(self,k,i,p):
+        # cut path k at p, on its segment i
+        eps = self.eps
+        path = self.paths[k]
+        for n in (i,i+1):
+            v = path[n]
+            if abs(p[0]-v[0]) <= eps and abs(p[1]-v[1]) <= eps:
+                self._break(k,n)
+                return
+        self.splits.setdefault((k,i),[]).append(p)
+
+    #------------ edges -------------
+
+    def _makeNodes(self):
+        # self.nodeOf: point where a path is cut -> node. Points within
+        #   tolerance of each other have the same node, the least of them, so
+        #   that which stands for them all does not depend on the order of
+        #   the lines
+        points = set()
+        for k in xrange(len(self.paths)):
+            path = self.paths[k]
+            points.add(path[0])
+            points.add(path[-1])
+            for n in self.breaks.get(k,()):
+                points.add(path[n])
+        for splits in self.splits.itervalues():
+            points.update(splits)
+        eps = self.eps
+        self.nodeOf = {}
+        if eps == 0:
+            for p in points:
+                self.nodeOf[p] = p
+            return
+        grid = {}   # cell of side eps -> node in it
+        for p in sorted(points):
+            x = int(math.floor(p[0]/eps))
+            y = int(math.floor(p[1]/eps))
+            node = p
+            for cell in ((x,y),(x-1,y),(x+1,y),(x,y-1),(x,y+1),(x-1,y-1),(x-1,y+1),(x+1,y-1),(x+1,y+1)):
+                q = grid.get(cell)
+                if q <> None and abs(p[0]-q[0]) <= eps and abs(p[1]-q[1]) <= eps:
+                    node = q
+                    break
+            if node is p:
+                grid[(x,y)] = p
+            self.nodeOf[p] = node
+
+    def buildEdges(self):
+        # cuts paths into edges at their ends and at self.breaks and
+        #   self.splits; an edge that repeats another is kept once
+        self._makeNodes()
+        nodeOf = self.nodeOf
+        edgeNumbers = {}    # edge points, in a standard direction -> edge number
+        nPieces = 0
+        for k in xrange(len(self.paths)):
+            path = self.paths[k]
+            oid = self.pathLines[k]
+            breaks = self.breaks.get(k,())
+            last = len(path)-1
+            pieces = []
+            piece = [nodeOf[path[0]]]
+            for i in xrange(last):
+                splits = self.splits.get((k,i))
+                if splits:
+                    p = path[i]
+                    dx = path[i+1][0]-p[0]
+                    dy = path[i+1][1]-p[1]
+                    # points at the same distance along are taken in
+                    #   order too, so that the order splits were found in
+                    #   does not matter
+                    for q in sorted(splits,key=lambda q: ((q[0]-p[0])*dx+(q[1]-p[1])*dy,q)):
+                        q = nodeOf[q]
+                        piece.append(q)
+                        pieces.append(piece)
+                        piece = [q]
+                if i+1 == last or i+1 in breaks:
+                    q = nodeOf[path[i+1]]
+                    piece.append(q)
+                    pieces.append(piece)
+                    piece = [q]
+                else:
+                    piece.append(path[i+1])
+            for piece in pieces:
+                points = [piece[0]]
+                for p in piece:
+                    if p <> points[-1]:
+                        points.append(p)
+                if len(points) < 2:
+                    continue
+                nPieces = nPieces+1
+                key = tuple(points)
+                reverse = key[::-1]
+                if reverse < key:
+                    key = reverse
+                e = edgeNumbers.get(key)
+                if e == None:
+                    edgeNumbers[key] = len(self.edges)
+                    self.edges.append(points)
+                    self.edgeLines.append([oid])
+                elif oid not in self.edgeLines[e]:
+                    self.edgeLines[e].append(oid)
+        del self.nodeOf
+        self.counts['nodes'] = len(set([edge[0] for edge in self.edges]+[edge[-1] for edge in self.edges]))
+        self.counts['edges'] = len(self.edges)
+        self.counts['repeatedEdges'] = nPieces-len(self.edges)
+
+    #------------ faces -------------
+
+    def _end(self,h):
+        # node that half-edge h arrives at. Half-edge 2e runs along edge
+        #   e, 2e+1 runs back
+        if h & 1:
+            return self.edges[h >> 1][0]
+        return self.edges[h >> 1][-1]
+
+    def _removeDangles(self,outgoing,alive,nodes):
+        # removes edges with a free end, starting from nodes
+        stack = list(nodes)
+        nDangles = 0
+        while stack:
+            node = stack.pop()
+            halves = [h for h in outgoing.get(node,()) if alive[h >> 1]]
+            outgoing[node] = halves
+            if len(halves) <> 1:
+                continue
+            alive[halves[0] >> 1] = False
+            nDangles = nDangles+1
+            stack.append(self._end(halves[0]))
+        return nDangles
+
+    def traceFaces(self):
+        edges = self.edges
+        alive = [True]*len(edges)
+        outgoing = {}   # node -> half-edges leaving it
+        for e in xrange(len(edges)):
+            outgoing.setdefault(edges[e][0],[]).append(2*e)
+            outgoing.setdefault(edges[e][-1],[]).append(2*e+1)
+        nDangles = self._removeDangles(outgoing,alive,outgoing.keys())
+        nBridges = 0
+        while True:
+            following = [-1]*(2*len(edges))  # half-edge -> next half-edge of its face
+            for node, halves in outgoing.iteritems():
+                halves = [h for h in halves if alive[h >> 1]]
+                if len(halves) > 2:
+                    keyed = []
+                    for h in halves:
+                        edge = edges[h >> 1]
+                        if h & 1:
+                            keyed.append((_angle(edge[-1],edge[-2]),h))
+                        else:
+                            keyed.append((_angle(edge[0],edge[1]),h))
+                    keyed.sort()
+                    halves = [h for angle, h in keyed]
+                outgoing[node] = halves
+                if halves:
+                    previous = halves[-1]
+                    for h in halves:
+                        following[h ^ 1] = previous
+                        previous = h
+            cycles = []
+            bridges = []
+            for start in xrange(len(following)):
+                if following[start] < 0:
+                    continue
+                cycle = []
+                h = start
+                while following[h] >= 0:
+                    cycle.append(h)
+                    nextHalf = following[h]
+                    following[h] = -1
+                    h = nextHalf
+                if len(set([h >> 1 for h in cycle])) < len(cycle):
+                    halves = set(cycle)
+                    bridges.extend([h >> 1 for h in cycle if h & 1 == 0 and h ^ 1 in halves])
+                cycles.append(cycle)
+            if not bridges:
+                break
+            # an edge with the same face on both sides: remove it, and any
+            #   dangles left, and trace again
+            ends = []
+            for e in bridges:
+                alive[e] = False
+                ends.extend([edges[e][0],edges[e][-1]])
+            nBridges = nBridges+len(bridges)
+            nDangles = nDangles+self._removeDangles(outgoing,alive,ends)
+        self.counts['dangles'] = nDangles
+        self.counts['bridges'] = nBridges
+        self._makeFaces(cycles)
+
+    def _ring(self,cycle):
+        ring = []
+        for h in cycle:
+            edge = self.edges[h >> 1]
+            if h & 1:
+                ring.extend(edge[:0:-1])
+            else:
+                ring.extend(edge[:-1])
+        ring.append(ring[0])
+        return ring
+
+    def _makeFaces(self,cycles):
+        # areas are of rings started at their least vertices, so that they
+        #   do not depend on where tracing started either
+        shells = []   # [ring, area, cycle]
+        holes = []
+        for cycle in cycles:
+            ring = _ringStart(self._ring(cycle))
+            area = Geometry.signedArea(ring)
+            if area > 0:
+                shells.append([ring,area,cycle])
+            elif area < 0:
+                holes.append([ring,area,cycle])
+        boxes = [Geometry.partsBox([ring]) for ring, area, cycle in shells]
+        tree = SpatialIndex.STRtree(boxes)
+        shellHoles = [[] for shell in shells]
+        self.outerRings = []
+        for hole in holes:
+            ring = hole[0]
+            hbox = Geometry.partsBox([ring])
+            around = [s for s in tree.query(hbox) if boxes[s][0] <= hbox[0] and boxes[s][1] <= hbox[1] and
+                      boxes[s][2] >= hbox[2] and boxes[s][3] >= hbox[3]]
+            around.sort(key=lambda s: shells[s][1])
+            owner = None
+            for s in around:
+                for p in ring:
+                    inside = Geometry.pointInPolygon(p,[shells[s][0]],self.eps)
+                    if inside <> 0:
+                        break
+                if inside == 1:
+                    owner = s
+                    break
+            if owner == None:
+                self.outerRings.append(ring)
+            else:
+                shellHoles[owner].append(hole)
+        faces = []
+        for s in range(len(shells)):
+            ring, area, cycle = shells[s]
+            rings = [ring]
+            halves = list(cycle)
+            shellHoles[s].sort(key=lambda hole: hole[0][0])
+            for hring, harea, hcycle in shellHoles[s]:
+                rings.append(hring)
+                area = area+harea
+                halves.extend(hcycle)
+            faces.append(Face(rings,area,halves))
+        faces.sort(key=lambda face: (face.rings[0][0],face.rings[0][1],face.rings[0][-2]))
+        self.outerRings.sort()
+        self.faces = faces
+
+def contactRows(reader,lineClass='ContactsAndFaults'):
+    # (OBJECTID, WKB) of the lines of lineClass that bound polygons, those
+    #   that are not concealed, as NCGMP09v1.1_MakePolys selects them
+    import NCGMP09v11_TableScanner as TableScanner
+    fields = [TableScanner.oidToken,TableScanner.shapeToken]
+    if 'IsConcealed' in [f.name for f in reader.listFields(lineClass)]:
+        fields.append('IsConcealed')
+    for row in reader.rows(lineClass,fields):
+        if len(row) < 3 or row[2] not in ('Y','y'):
+            yield row[0], row[1]
+
+def polygonize(reader,lineClass='ContactsAndFaults',tolerance=None):
+    # Polygonizer, run, of the non-concealed lines of lineClass
+    polygonizer = Polygonizer(tolerance)
+    polygonizer.addLines(contactRows(reader,lineClass))
+    polygonizer.run()
+    return polygonizer
@@ -0,0 +1,103 @@
+# NCGMP09v11_Profiler.py
+#   Per-phase and per-table timing for NCGMP09v1.1_ValidateDatabase.
+#
+#   Records wall time, rows scanned, rows per second, and peak memory
+#   (peak working set on Windows, maximum resident set size elsewhere)
+#   of this process at the end of each phase, plus time and rows for
+#   each table. write() saves the record as JSON, so that runs of
+#   different validator versions can be compared.
+
+import time, sys, json
+
+versionString = 'NCGMP09v11_Profiler.py, version of 17 October 2026'
+
+def peakMemory():
+    # peak memory use of this process in bytes, or None if unknown
+    try:
+        if sys.platform == 'win32':
+            import ctypes, ctypes.wintypes
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb',ctypes.wintypes.DWORD),
+                            ('PageFaultCount',ctypes.wintypes.DWORD),
+                            ('PeakWorkingSetSize',ctypes.c_size_t),
+                            ('WorkingSetSize',ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage',ctypes.c_size_t),
+                            ('QuotaPagedPoolUsage',ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage',ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage',ctypes.c_size_t),
+                            ('PagefileUsage',ctypes.c_size_t),
+                            ('PeakPagefileUsage',ctypes.c_size_t)]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process,ctypes.byref(counters),counters.cb):
+                return int(counters.PeakWorkingSetSize)
+            return None
+        import resource
+        maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            return int(maxRss)
+        return int(maxRss)*1024
+    except:
+        return None
+
+def _rate(rows,seconds):
+    if rows == None or seconds <= 0:
+        return None
+    return round(rows/seconds,1)
+
+class Profiler:
+    def __init__(self):
+        self.startTime = time.time()
+        self.phases = []    # dictionaries, in order run
+        self.tables = []
+        self._phase = None
+
+    def start(self,phase):
+        # begin timing phase; ends any phase in progress
+        if self._phase <> None:
+            self.stop()
+        self._phase = [phase,time.time()]
+
+    def stop(self,rows=None):
+        # end current phase; rows is number of rows it scanned, if any
+        if self._phase == None:
+            return
+        phase, startTime = self._phase
+        seconds = time.time() - startTime
+        self.phases.append({'phase':phase,'seconds':round(seconds,3),'rows':rows,
+                            'rowsPerSecond':_rate(rows,seconds),'peakMemory':peakMemory()})
+        self._phase = None
+
+    def table(self,table,seconds,rows,cached=False):
+        self.tables.append({'table':table,'seconds':round(seconds,3),'rows':rows,
+                            'rowsPerSecond':_rate(rows,seconds),'cached':cached})
+
+    def report(self,**info):
+        # dictionary of all timings; info (e.g., database, version) is included
+        report = dict(info)
+        report['date'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        report['totalSeconds'] = round(time.time() - self.startTime,3)
+        report['peakMemory'] = peakMemory()
+        report['phases'] = self.phases
+        report['tables'] = self.tables
+        return report
+
+    def write(self,fileName,**info):
+        outfl = open(fileName,'w')
+        try:
+            json.dump(self.report(**info),outfl,indent=2,sort_keys=True)
+        finally:
+            outfl.close()
+
+    def summary(self):
+        # lines for addMsgAndPrint
+        lines = []
+        for p in self.phases:
+            aline = '    '+p['phase'].ljust(32)+('%.1f' % p['seconds']).rjust(8)+' sec'
+            if p['rows'] <> None:
+                aline = aline+'  '+str(p['rows'])+' rows'
+                if p['rowsPerSecond'] <> None:
+                    aline = aline+', '+str(int(p['rowsPerSecond']))+' rows/sec'
+            lines.append(aline)
+        return lines
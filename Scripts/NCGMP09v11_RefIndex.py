@@ -0,0 +1,187 @@
+# NCGMP09v11_RefIndex.py
+#   Hash-indexed store of the values that NCGMP09v1.1_ValidateDatabase
+#   accumulates while inventorying a geodatabase (_IDs, MapUnit references,
+#   Glossary references, DataSources references) and the referential-
+#   integrity checks that compare them against DescriptionOfMapUnits,
+#   StandardLithology, Glossary and DataSources. Links of ExtendedAttributes
+#   are checked by NCGMP09v11_AttributeGraph.
+#
+#   The validator used to keep these values in lists, sort them, and test
+#   membership with 'x in aList', which is quadratic in the number of rows.
+#   Here each value is kept once in a dict or set, so every check is linear.
+#   The functions below return exactly the error lines that the list-based
+#   code produced (including repeated lines, which writeContentErrors counts),
+#   so conformance reports are unchanged, except that each unreferenced
+#   DescriptionOfMapUnits unit is listed once, not twice (the list-based
+#   code loaded DMU MapUnits into a list inventorying had already filled).
+#   NCGMP09v1.1_BenchmarkRefIndex checks this on randomized tables.
+#
+#   Does not import arcpy; can be used and tested on any Python 2.7.
+
+from NCGMP09v11_IdRegistry import IdRegistry
+
+versionString = 'NCGMP09v11_RefIndex.py, version of 17 October 2026'
+
+class ReferenceIndex:
+    def __init__(self):
+        # _ID values and the tables they occur in
+        self.ids = IdRegistry()
+        # MapUnit -> first (sorted) table that cites it
+        self.mapUnitRefs = {}
+        # str(term) -> first (sorted) [field, table] that cites it
+        self.glossaryRefs = {}
+        # DataSources_ID -> first (sorted) [field, table] that cites it
+        self.dataSourcesRefs = {}
+        # MapUnit -> number of times listed in DescriptionOfMapUnits
+        self.dmuMapUnits = {}
+        self.gmapMapUnits = set()
+        self.cmuMapUnits = set()
+        self.csMapUnits = set()
+
+    def addId(self,anID,table):
+        self.ids.add(anID,table)
+
+    def addMapUnitRef(self,mu,table):
+        if not mu in self.mapUnitRefs or table < self.mapUnitRefs[mu]:
+            self.mapUnitRefs[mu] = table
+
+    def addGlossaryRef(self,term,field,table):
+        _addFirstRef(self.glossaryRefs,term,field,table)
+
+    def addDataSourcesRef(self,anID,field,table):
+        _addFirstRef(self.dataSourcesRefs,anID,field,table)
+
+    def addDmuMapUnit(self,mu):
+        self.dmuMapUnits[mu] = self.dmuMapUnits.get(mu,0) + 1
+
+    def merge(self,other):
+        # add the contents of another ReferenceIndex (e.g., the partial index
+        #   of one table) to this one. Result does not depend on merge order
+        self.ids.merge(other.ids)
+        for mu, table in other.mapUnitRefs.iteritems():
+            self.addMapUnitRef(mu,table)
+        for term, ref in other.glossaryRefs.iteritems():
+            self.addGlossaryRef(term,ref[0],ref[1])
+        for anID, ref in other.dataSourcesRefs.iteritems():
+            self.addDataSourcesRef(anID,ref[0],ref[1])
+        for mu, n in other.dmuMapUnits.iteritems():
+            self.dmuMapUnits[mu] = self.dmuMapUnits.get(mu,0) + n
+        self.gmapMapUnits.update(other.gmapMapUnits)
+        self.cmuMapUnits.update(other.cmuMapUnits)
+        self.csMapUnits.update(other.csMapUnits)
+
+def _addFirstRef(refDict,value,field,table):
+    ref = [field,table]
+    if not value in refDict or ref < refDict[value]:
+        refDict[value] = ref
+
+def duplicateIdLines(index):
+    # equivalent to sorting all [_ID, table] pairs and reporting each
+    # adjacent pair with equal _ID
+    #   reported directly from the _IDs seen more than once
+    lines = []
+    for anID in index.ids.duplicates():
+        lastTable = None
+        for table, n in index.ids.tableCounts(anID):
+            pairs = []
+            if lastTable <> None:
+                pairs.append([lastTable,table])
+            for i in range(1,n):
+                pairs.append([table,table])
+            for pair in pairs:
+                if not anID is None:
+                    lines.append('    '+anID+', tables '+pair[0]+' '+pair[1])
+                else:
+                    lines.append('    BOGUS! got a NoneType ID or table')
+            lastTable = table
+    return lines
+
+def missingDataSourcesLines(index,dataSourcesIDs):
+    lines = []
+    dsIDs = set(dataSourcesIDs)
+    for anID, ref in index.dataSourcesRefs.iteritems():
+        if anID <> None and anID <> '' and not anID in dsIDs:
+            lines.append('    '+anID+', cited in field '+ref[0]+' table '+ref[1])
+    return lines
+
+def unusedDataSourcesLines(index,dataSourcesIDs):
+    lines = []
+    for anID in dataSourcesIDs:
+        if anID <> None and not anID in index.dataSourcesRefs:
+            lines.append('    '+anID)
+    return lines
+
+def allDmuMapUnits(index,loadedDmuMapUnits):
+    # MapUnits of DescriptionOfMapUnits, as loaded from the table (or, if
+    #   none could be loaded, as seen while inventorying)
+    #   returns dict MapUnit -> count
+    if not loadedDmuMapUnits:
+        return dict(index.dmuMapUnits)
+    counts = {}
+    for mu in loadedDmuMapUnits:
+        counts[mu] = counts.get(mu,0) + 1
+    return counts
+
+def missingMapUnitLines(index,listedMapUnits):
+    # MapUnits cited in the database but not present in listedMapUnits
+    #   (MapUnits of DescriptionOfMapUnits or StandardLithology)
+    lines = []
+    listed = set(listedMapUnits)
+    for mu, table in index.mapUnitRefs.iteritems():
+        if not mu in listed:
+            lines.append('    '+str(mu)+', cited in '+str(table))
+    return lines
+
+def equivalenceLines(index,dmuMapUnits):
+    lines = ['    Unit       Map  DMU  CMU  XS']
+    muSets = [index.gmapMapUnits,set(dmuMapUnits),index.cmuMapUnits,index.csMapUnits]
+    allMapUnits = set()
+    for muSet in muSets:
+        allMapUnits.update(muSet)
+    allMapUnits = list(allMapUnits)
+    allMapUnits.sort()
+    for mu in allMapUnits:
+        line = '    '+mu.ljust(10)
+        for muSet in muSets:
+            if mu in muSet:
+                line = line+'  X  '
+            else:
+                line = line+' --- '
+        lines.append(line)
+    return lines
+
+def unreferencedStandardLithLines(index,standardLithMapUnits):
+    lines = []
+    excess = set(standardLithMapUnits)
+    excess.discard('')
+    for mu in excess:
+        if not mu in index.mapUnitRefs:
+            lines.append('    '+mu)
+    return lines
+
+def unreferencedDmuLines(index,dmuMapUnits):
+    # dmuMapUnits is dict MapUnit -> count, see allDmuMapUnits
+    lines = []
+    for mu, n in dmuMapUnits.iteritems():
+        if not mu in index.mapUnitRefs and mu <> '':
+            lines.extend(['    '+mu]*n)
+    return lines
+
+def missingGlossaryLines(index,glossaryTerms):
+    lines = []
+    terms = set(glossaryTerms)
+    for term, ref in index.glossaryRefs.iteritems():
+        if term <> 'None' and term <> '' and not term in terms:
+            if len(term) < 40:
+                thisTerm = term
+            else:
+                thisTerm = term[0:37]+'...'
+            lines.append('    '+thisTerm+', cited in field '+ref[0]+', table '+ref[1])
+    return lines
+
+def unusedGlossaryLines(index,glossaryTerms):
+    lines = []
+    for term in glossaryTerms:
+        if not term in index.glossaryRefs:
+            lines.append('    '+term)
+    return lines
@@ -0,0 +1,343 @@
+# NCGMP09v11_Sampling.py
+#   Quick check of a large database from a sample of its rows, for the
+#   sample= option of NCGMP09v1.1_ValidateDatabase.
+#
+#   Each table is a stratum of its own: up to sampleSize rows are read
+#   from it, however large it is, and tables that small are read whole.
+#   Within a table the range of ObjectIDs is cut into equal blocks and
+#   the same number of random ObjectIDs is drawn in each, so that rows
+#   loaded (and mistyped) together are not all missed or all taken. More
+#   ObjectIDs are drawn than rows wanted, in proportion to the gaps left
+#   by deleted rows.
+#
+#   Sampled rows get the row-by-row content checks of the full validator:
+#     glossary      values of fields in TableScanner.gFieldDefList that
+#                   are not Terms of Glossary
+#     dataSources   values of ...Source... fields that are not
+#                   DataSources_IDs
+#     mapUnits      MapUnits not in DescriptionOfMapUnits
+#     nulls         pseudonulls, leading and trailing spaces in
+#                   non-nullable String fields
+#   The Glossary, DataSources and DescriptionOfMapUnits values are read
+#   whole, as they are small. For each check the report gives the rate of
+#   rows with an error and how many rows that makes, with a confidence
+#   interval: per table, a Wilson score interval narrowed by the finite
+#   population correction; for the whole database, the rates of the tables
+#   weighted by their rows, with Kish's effective sample size. Checks that
+#   compare a table with itself or with all others (duplicate _IDs,
+#   unreferenced entries, ExtendedAttributes, HierarchyKeys, geometry)
+#   cannot be done on a sample and are left out.
+#
+#   To estimate how long a full run would take, TableScanner.scanTable is
+#   timed on the first timingRows rows of each sampled table and the rate
+#   extrapolated to all its rows; a table read whole takes the time its
+#   sample took. This covers reading and checking rows, most of a full
+#   run, but not the geometry checks.
+#
+#   Does not import arcpy.
+
+import math, random, time, itertools
+import NCGMP09v11_TableScanner as TableScanner
+import NCGMP09v11_ColumnScanner as ColumnScanner
+import NCGMP09v11_RefIndex as RefIndex
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+
+versionString = 'NCGMP09v11_Sampling.py, version of 17 October 2026'
+
+sampleChecks = ('glossary','dataSources','mapUnits','nulls')
+sampleSize = 2000       # rows read from each table
+strata = 20             # blocks of ObjectIDs in each table
+confidence = 0.95
+timingRows = 2000       # rows of each table read to time a full run
+maxExamples = 5         # ObjectIDs listed for each check of a table
+
+def normalQuantile(p):
+    # z such that a standard normal variable is below z with probability p
+    lo, hi = -10.0, 10.0
+    for i in range(100):
+        mid = (lo+hi)/2
+        if 0.5*(1+math.erf(mid/math.sqrt(2))) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo+hi)/2
+
+def wilsonInterval(rate,n,z):
+    # [low, high] of a proportion rate observed in n trials
+    if n <= 0:
+        return [0.0,1.0]
+    if n == float('inf'):
+        return [rate,rate]
+    z2 = z*z
+    centre = (rate+z2/(2*n))/(1+z2/n)
+    half = z*math.sqrt(rate*(1-rate)/n+z2/(4*n*n))/(1+z2/n)
+    return [max(0.0,centre-half),min(1.0,centre+half)]
+
+def effectiveSize(n,population):
+    # sample size that gives, without the finite population correction,
+    #   the variance of a sample of n rows out of population
+    if n >= population:
+        return float('inf')
+    return n*float(population-1)/(population-n)
+
+def sampleOids(oidRange,population,n,nStrata,rng):
+    # sorted ObjectIDs to read for a sample of about n rows
+    lo, hi = oidRange
+    span = hi-lo+1
+    draw = min(span,int(math.ceil(n*float(span)/max(population,1))))
+    nStrata = max(1,min(nStrata,draw))
+    oids = []
+    for s in range(nStrata):
+        start = lo+span*s/nStrata
+        end = lo+span*(s+1)/nStrata
+        k = draw*(s+1)/nStrata-draw*s/nStrata
+        oids.extend(rng.sample(xrange(start,end),min(k,end-start)))
+    oids.sort()
+    return oids
+
+class TableSample:
+    def __init__(self,table,population):
+        self.table = table
+        self.population = population   # rows in table
+        self.rows = 0                  # rows checked
+        self.checks = []               # checks that apply to this table
+        self.errors = {}               # check -> rows of sample with an error
+        self.examples = {}             # check -> first OBJECTIDs with an error
+        self.whole = False             # were all rows read?
+        self.seconds = 0.0             # time taken to read and check the sample
+        self.fullSeconds = 0.0         # estimated time of scanTable on all rows
+
+    def rate(self,check):
+        if self.rows == 0:
+            return 0.0
+        return float(self.errors.get(check,0))/self.rows
+
+    def _add(self,check,oid):
+        self.errors[check] = self.errors.get(check,0)+1
+        examples = self.examples.setdefault(check,[])
+        if len(examples) < maxExamples:
+            examples.append(oid)
+
+def _text(value):
+    # str(value), as the full checks compare, or value if it is not ASCII
+    try:
+        return str(value)
+    except UnicodeError:
+        return value
+
+class References:
+    # the values sampled rows are checked against; None if not in database
+    def __init__(self,reader,tables):
+        self.glossaryTerms = self._values(reader,tables,'Glossary','Term',_text)
+        self.dataSourcesIDs = self._values(reader,tables,'DataSources','DataSources_ID',None)
+        self.dmuMapUnits = self._values(reader,tables,'DescriptionOfMapUnits','MapUnit',_text)
+
+    def _values(self,reader,tables,table,field,convert):
+        if not table in tables or not field in [f.name for f in reader.listFields(table)]:
+            return None
+        values = set()
+        for (value,) in reader.rows(table,[field]):
+            if value <> None:
+                if convert <> None:
+                    value = convert(value)
+                values.add(value)
+        return values
+
+def _rowTests(plan,table,references):
+    # [check, test] of the row-by-row checks that apply to table; test(row)
+    #   is True if row has an error
+    # each test gets its columns and values as default arguments
+    tests = []
+    if plan.glossColumns and references.glossaryTerms <> None:
+        def glossary(row,columns=[i for i, field in plan.glossColumns],terms=references.glossaryTerms):
+            for i in columns:
+                value = row[i]
+                if value <> '' and value <> None:
+                    term = _text(value)
+                    if term <> 'None' and not term in terms:
+                        return True
+            return False
+        tests.append(['glossary',glossary])
+    if plan.sourceColumns and references.dataSourcesIDs <> None:
+        def dataSources(row,columns=[i for i, field in plan.sourceColumns],ids=references.dataSourcesIDs):
+            for i in columns:
+                value = row[i]
+                if value <> None and value <> '' and not value in ids:
+                    return True
+            return False
+        tests.append(['dataSources',dataSources])
+    if plan.mapUnitColumn <> None and table <> 'DescriptionOfMapUnits' and table <> 'StandardLithology' \
+       and references.dmuMapUnits <> None:
+        def mapUnit(row,column=plan.mapUnitColumn,mapUnits=references.dmuMapUnits):
+            mu = _text(row[column])
+            return mu <> '' and not mu in mapUnits
+        tests.append(['mapUnits',mapUnit])
+    return tests
+
+def sampleTable(reader,table,references,n=sampleSize,nStrata=strata,rng=None,checks=sampleChecks):
+    # TableSample of up to n rows of table
+    if rng == None:
+        rng = random.Random()
+    sample = TableSample(table,reader.rowCount(table))
+    plan = TableScanner.TablePlan(table,reader.listFields(table),[c for c in checks if c in sampleChecks])
+    tests = _rowTests(plan,table,references)
+    sample.checks = [check for check, test in tests]
+    if plan.nullCheckColumns:
+        sample.checks.append('nulls')
+    if not sample.checks or sample.population == 0:
+        return sample
+    startTime = time.time()
+    if sample.population <= n:
+        rows = reader.rows(table,plan.columns)
+    else:
+        oidRange = reader.oidRange(table)
+        if oidRange == None:
+            return sample
+        rows = reader.rowsByOid(table,plan.columns,sampleOids(oidRange,sample.population,n,nStrata,rng))
+    batch = []
+    for row in rows:
+        sample.rows = sample.rows+1
+        for check, test in tests:
+            if test(row):
+                sample._add(check,row[0])
+        if plan.nullCheckColumns:
+            batch.append(row)
+    if batch:
+        transposed = zip(*batch)
+        bad = set()
+        for i, field, length in plan.nullCheckColumns:
+            for positions in ColumnScanner.spaceFlags(transposed[i],length):
+                bad.update(positions)
+        for p in sorted(bad):
+            sample._add('nulls',batch[p][0])
+    sample.seconds = time.time()-startTime
+    if sample.population <= n:
+        # read whole; rowCount may be stale
+        sample.whole = True
+        sample.population = sample.rows
+    return sample
+
+class _HeadReader:
+    # the first n rows of each table of reader
+    def __init__(self,reader,n):
+        self.reader = reader
+        self.n = n
+    def listFields(self,table):
+        return self.reader.listFields(table)
+    def rows(self,table,fieldNames):
+        return itertools.islice(self.reader.rows(table,fieldNames),self.n)
+
+def timeTable(reader,table,population,checks=None,n=timingRows):
+    # estimated seconds for TableScanner.scanTable on all rows of table
+    badNulls = ErrorAggregator.ErrorAggregator('')
+    startTime = time.time()
+    scanned = TableScanner.scanTable(_HeadReader(reader,n),table,RefIndex.ReferenceIndex(),badNulls,checks=checks)
+    seconds = time.time()-startTime
+    if scanned == 0:
+        return seconds
+    return seconds*population/scanned
+
+class SampleEstimate:
+    # samples of all tables, and what they say of the database
+    def __init__(self,n=sampleSize,nStrata=strata,confidence=confidence,seed=None):
+        self.n = n
+        self.nStrata = nStrata
+        self.confidence = confidence
+        self.z = normalQuantile(0.5+confidence/2)
+        self.rng = random.Random(seed)
+        self.tables = []       # TableSample of each table sampled
+        self.seconds = 0.0     # time taken to sample
+
+    def run(self,reader,tables,checks=sampleChecks,timing=True,msg=None):
+        startTime = time.time()
+        references = References(reader,tables)
+        for table in tables:
+            if msg <> None:
+                msg('    '+table)
+            sample = sampleTable(reader,table,references,self.n,self.nStrata,self.rng,checks)
+            if timing:
+                if sample.whole:
+                    sample.fullSeconds = sample.seconds
+                elif sample.rows > 0:
+                    sample.fullSeconds = timeTable(reader,table,sample.population)
+            self.tables.append(sample)
+        self.seconds = time.time()-startTime
+        return self
+
+    def checks(self):
+        checks = []
+        for check in sampleChecks:
+            if [t for t in self.tables if check in t.checks]:
+                checks.append(check)
+        return checks
+
+    def tableEstimate(self,sample,check):
+        # [rate, low, high] of rows of table with an error
+        rate = sample.rate(check)
+        return [rate]+wilsonInterval(rate,effectiveSize(sample.rows,sample.population),self.z)
+
+    def estimate(self,check):
+        # [rows checked, population, rate, low, high] for all tables the
+        #   check applies to
+        samples = [t for t in self.tables if check in t.checks and t.rows > 0]
+        population = sum([t.population for t in samples])
+        rows = sum([t.rows for t in samples])
+        if population == 0:
+            return [0,0,0.0,0.0,0.0]
+        rate = sum([t.population*t.rate(check) for t in samples])/population
+        # Kish's effective sample size of a stratified sample
+        denominator = sum([t.population**2/effectiveSize(t.rows,t.population) for t in samples])
+        if denominator == 0:
+            nEffective = float('inf')
+        else:
+            nEffective = population**2/denominator
+        return [rows,population,rate]+wilsonInterval(rate,nEffective,self.z)
+
+    def fullSeconds(self):
+        return sum([t.fullSeconds for t in self.tables])
+
+    def lines(self):
+        # lines of the report
+        lines = ['  Estimated from a stratified random sample of up to '+str(self.n)+' rows of each table, drawn',
+                 '  from '+str(self.nStrata)+' equal ranges of ObjectIDs; smaller tables were read whole. Rates',
+                 '  are of rows with one or more errors, with '+_percent(self.confidence,0)+' confidence intervals.',
+                 '  Run without sample= to find the errors themselves and to check _IDs,',
+                 '  ExtendedAttributes, HierarchyKeys and geometry.','']
+        lines.append('  All tables')
+        for check in self.checks():
+            rows, population, rate, low, high = self.estimate(check)
+            lines.append('    '+check.ljust(12)+_estimateText(rate,low,high,population)+
+                         ', from '+str(rows)+' of '+str(population)+' rows')
+        lines.append('')
+        for sample in self.tables:
+            if not sample.checks:
+                continue
+            heading = '  Table '+sample.table+', '+str(sample.rows)+' of '+str(sample.population)+' rows'
+            withErrors = [check for check in sample.checks if sample.errors.get(check)]
+            if not withErrors:
+                lines.append(heading+', no errors in sample')
+                continue
+            lines.append(heading)
+            for check in withErrors:
+                rate, low, high = self.tableEstimate(sample,check)
+                lines.append('    '+check.ljust(12)+_estimateText(rate,low,high,sample.population)+
+                             ', e.g. OBJECTID '+', '.join([str(oid) for oid in sample.examples[check]]))
+        lines.append('')
+        lines.append('  Sampling took %.1f seconds. A full run would take about %s to read and check' %
+                     (self.seconds,_duration(self.fullSeconds())))
+        lines.append('  '+str(sum([t.population for t in self.tables]))+' rows, not counting geometry checks.')
+        return lines
+
+def _percent(rate,decimals=2):
+    return ('%.'+str(decimals)+'f%%') % (100*rate)
+
+def _estimateText(rate,low,high,population):
+    return '%s (%s-%s), ~%d rows (%d-%d)' % (_percent(rate),_percent(low),_percent(high),
+                                            round(rate*population),round(low*population),round(high*population))
+
+def _duration(seconds):
+    if seconds < 60:
+        return '%.0f seconds' % seconds
+    if seconds < 3600:
+        return '%.0f minutes' % (seconds/60)
+    return '%.1f hours' % (seconds/3600)
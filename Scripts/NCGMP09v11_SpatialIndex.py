@@ -0,0 +1,145 @@
+# NCGMP09v11_SpatialIndex.py
+#   Packed R-tree (Sort-Tile-Recursive, STR) over bounding boxes, for the
+#   geometry checks of NCGMP09v1.1_ValidateDatabase and other tools that
+#   must find, among many features or segments, those near a given box.
+#
+#   The tree is built once from all boxes: they are sorted into vertical
+#   slices by x, each slice is sorted by y and cut into nodes of
+#   nodeCapacity boxes, and the nodes are packed the same way, level by
+#   level, up to a single root. Building takes O(n log n); a query visits
+#   only nodes whose boxes intersect the query box, so finding the
+#   neighbours of every feature of a map takes near-linear time. pairs
+#   finds all intersecting pairs at once by walking the tree against
+#   itself, which is faster than a query per box. flatten gives the tree
+#   as lists of nodes by level, for walking it with array operations.
+#
+#   A box is (xmin, ymin, xmax, ymax). Boxes that touch intersect.
+#
+#   Does not import arcpy.
+
+import math
+
+versionString = 'NCGMP09v11_SpatialIndex.py, version of 17 October 2026'
+
+def unionBox(boxes):
+    xmin = min([b[0] for b in boxes])
+    ymin = min([b[1] for b in boxes])
+    xmax = max([b[2] for b in boxes])
+    ymax = max([b[3] for b in boxes])
+    return (xmin,ymin,xmax,ymax)
+
+def boxesIntersect(a,b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def _pack(entries,nodeCapacity):
+    # entries is a list of [box, payload]; returns list of [box, [entries]]
+    #   of about nodeCapacity entries each, tiled by x then by y
+    nNodes = int(math.ceil(len(entries)/float(nodeCapacity)))
+    nSlices = int(math.ceil(math.sqrt(nNodes)))
+    sliceSize = nSlices*nodeCapacity
+    entries.sort(key=lambda e: e[0][0]+e[0][2])
+    nodes = []
+    for i in range(0,len(entries),sliceSize):
+        aSlice = entries[i:i+sliceSize]
+        aSlice.sort(key=lambda e: e[0][1]+e[0][3])
+        for j in range(0,len(aSlice),nodeCapacity):
+            children = aSlice[j:j+nodeCapacity]
+            nodes.append([unionBox([c[0] for c in children]),children])
+    return nodes
+
+class STRtree:
+    def __init__(self,boxes,items=None,nodeCapacity=16):
+        # boxes is a sequence of (xmin, ymin, xmax, ymax). query returns the
+        #   corresponding items, or, if items is None, positions in boxes
+        if items == None:
+            items = range(len(boxes))
+        self.size = len(boxes)
+        self.levels = 0
+        entries = [[tuple(box),item] for box, item in zip(boxes,items)]
+        self.root = None
+        if not entries:
+            return
+        level = _pack(entries,nodeCapacity)
+        self.levels = 1
+        while len(level) > 1:
+            level = _pack(level,nodeCapacity)
+            self.levels = self.levels+1
+        self.root = level[0]
+
+    def __len__(self):
+        return self.size
+
+    def query(self,box):
+        # items whose boxes intersect box
+        found = []
+        if self.root == None or not boxesIntersect(self.root[0],box):
+            return found
+        xmin, ymin, xmax, ymax = box
+        stack = [[self.root,self.levels]]
+        while stack:
+            node, level = stack.pop()
+            for childBox, child in node[1]:
+                if childBox[0] <= xmax and xmin <= childBox[2] and childBox[1] <= ymax and ymin <= childBox[3]:
+                    if level == 1:
+                        found.append(child)
+                    else:
+                        stack.append([[childBox,child],level-1])
+        return found
+
+    def flatten(self):
+        # [levels, leafBoxes, items]. levels[0] holds the root; each level is
+        #   a list of [box, first, count] of its nodes, whose children are
+        #   levels[k+1][first:first+count], or at the last level
+        #   leafBoxes[first:first+count] and the corresponding items
+        if self.root == None:
+            return [[],[],[]]
+        levels = []
+        nodes = [self.root]
+        for level in range(self.levels):
+            entries = []
+            children = []
+            for box, kids in nodes:
+                entries.append([box,len(children),len(kids)])
+                children.extend(kids)
+            levels.append(entries)
+            nodes = children
+        return [levels,[box for box, item in nodes],[item for box, item in nodes]]
+
+    def pairs(self):
+        # yields (a, b) of items whose boxes intersect, each pair once
+        if self.root == None:
+            return
+        stack = [(self.root,self.root,self.levels)]
+        while stack:
+            nodeA, nodeB, level = stack.pop()
+            if nodeA is nodeB:
+                children = nodeA[1]
+                for i in range(len(children)):
+                    childA = children[i]
+                    if level > 1:
+                        stack.append((childA,childA,level-1))
+                    xmin, ymin, xmax, ymax = childA[0]
+                    for childB in children[i+1:]:
+                        box = childB[0]
+                        if box[0] <= xmax and xmin <= box[2] and box[1] <= ymax and ymin <= box[3]:
+                            if level == 1:
+                                yield (childA[1],childB[1])
+                            else:
+                                stack.append((childA,childB,level-1))
+                continue
+            # only children that reach into the overlap of the two nodes
+            boxA = nodeA[0]
+            boxB = nodeB[0]
+            xmin, ymin = max(boxA[0],boxB[0]), max(boxA[1],boxB[1])
+            xmax, ymax = min(boxA[2],boxB[2]), min(boxA[3],boxB[3])
+            childrenA = [c for c in nodeA[1] if c[0][0] <= xmax and xmin <= c[0][2] and c[0][1] <= ymax and ymin <= c[0][3]]
+            childrenB = [c for c in nodeB[1] if c[0][0] <= xmax and xmin <= c[0][2] and c[0][1] <= ymax and ymin <= c[0][3]]
+            for childA in childrenA:
+                ax0, ay0, ax1, ay1 = childA[0]
+                for childB in childrenB:
+                    box = childB[0]
+                    if box[0] <= ax1 and ax0 <= box[2] and box[1] <= ay1 and ay0 <= box[3]:
+                        if level == 1:
+                            yield (childA[1],childB[1])
+                        else:
+                            stack.append((childA,childB,level-1))
@@ -0,0 +1,366 @@
+# NCGMP09v11_SqlValidate.py
+#   SQL back end for NCGMP09v1.1_ValidateDatabase, for SQLite and GeoPackage
+#   copies of NCGMP09 databases. Needs only the Python sqlite3 module.
+#
+#   Which tables and fields take part in each check is decided exactly as
+#   for a geodatabase (TableScanner.TablePlan, driven by tableDict and
+#   gFieldDefList). The content checks are then done by the database
+#   engine: references of all tables are gathered into indexed temporary
+#   tables, and missing and unreferenced values are found with anti-joins
+#   (NOT EXISTS) and GROUP BY queries, rather than in Python.
+#
+#   SQLite has no feature datasets. Feature classes (tables with a geometry
+#   column) are assigned to GeologicMap, CorrelationOfMapUnits (CMU...) or
+#   CrossSectionX (CSX...) by name.
+#
+#   contentErrors returns a dictionary keyed by the names of the validator's
+#   report sections (duplicateIDs, missingSourceIDs, ...), for the content
+#   checks enabled (see TableScanner.contentChecks). Links of
+#   ExtendedAttributes are looked up in SQL and classified by
+#   NCGMP09v11_AttributeGraph, as for a geodatabase.
+#
+#   Each function takes a sqlite3 connection, or a SqliteReader or a
+#   Catalog (NCGMP09v11_Catalog) of one, so that fields and row counts are
+#   looked up once for all checks.
+
+from NCGMP09v11_Definition import tableDict
+import NCGMP09v11_TableScanner as TableScanner
+import NCGMP09v11_ColumnScanner as ColumnScanner
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+import NCGMP09v11_AttributeGraph as AttributeGraph
+import NCGMP09v11_HierarchyKey as HierarchyKey
+from NCGMP09v11_TableScanner import sqlName
+
+versionString = 'NCGMP09v11_SqlValidate.py, version of 17 October 2026'
+
+# housekeeping tables of GeoPackage and SpatiaLite
+systemTablePrefixes = ('sqlite_','gpkg_','gpkgext_','rtree_','idx_','spatialite_','sql_statements_log',
+                       'geometry_columns','spatial_ref_sys','views_geometry_columns','virts_geometry_columns',
+                       'SpatialIndex','ElementaryGeometries','KNN','data_licenses','ncgmp_')
+
+def _reader(source):
+    # source is a sqlite3 connection, or a SqliteReader or Catalog of one
+    if hasattr(source,'listFields'):
+        return source
+    return TableScanner.SqliteReader(source)
+
+def listTables(source):
+    # returns [tables, fdsfc] as in ValidateDatabase:
+    #   tables is list of non-spatial tables, fdsfc is list of [featureDataset, [featureClasses]]
+    reader = _reader(source)
+    connection = reader.connection
+    tables = []
+    fds = {}
+    for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type IN ('table','view') ORDER BY name"):
+        if name.startswith(systemTablePrefixes):
+            continue
+        isSpatial = False
+        for field in reader.listFields(name):
+            if field.type == 'Geometry':
+                isSpatial = True
+        if isSpatial:
+            fds.setdefault(featureDatasetOf(name),[]).append(name)
+        else:
+            tables.append(name)
+    fdsfc = []
+    for name in sorted(fds.keys()):
+        fdsfc.append([name,fds[name]])
+    return [tables,fdsfc]
+
+def featureDatasetOf(featureClass):
+    if featureClass[0:3] == 'CMU':
+        return 'CorrelationOfMapUnits'
+    if featureClass[0:2] == 'CS' and len(featureClass) > 3 and featureClass[2].isupper() and featureClass[3].isupper():
+        return 'CrossSection'+featureClass[2]
+    return 'GeologicMap'
+
+def _fields(reader,table):
+    # fields other than geometry
+    return [f for f in reader.listFields(table) if f.type <> 'Geometry']
+
+def describe(source,tables,fdsfc,standardFields):
+    # lines of GEODATABASE DESCRIPTION
+    reader = _reader(source)
+    lines = []
+    def listDataSet(dataSet):
+        nrows = reader.rowCount(dataSet)
+        lines.append('    '+dataSet+', '+str(nrows)+' records')
+        for field in reader.listFields(dataSet):
+            if not (field.name in standardFields) and field.type <> 'Geometry':
+                lines.append('      '+field.name+' '+field.type+':'+str(field.length)+'  '+str(field.type == 'OID'))
+    lines.append('Tables: ')
+    for table in tables:
+        listDataSet(table)
+    for fds, fcs in fdsfc:
+        lines.append('Feature data set: '+fds)
+        for fc in fcs:
+            listDataSet(fc)
+    return lines
+
+def checkFields(source,tables,fdsfc,standardFields,failFast=False):
+    # returns [schemaErrors, schemaExtensions]. If failFast, stops after
+    #   the first table with a schema error
+    reader = _reader(source)
+    schemaErrors = []
+    schemaExtensions = []
+    def check(table,notRequired):
+        if not tableDict.has_key(table):
+            schemaExtensions.append(notRequired)
+        else:
+            errors, extensions = TableScanner.checkFieldDefinitions(table,_fields(reader,table),tableDict[table],standardFields)
+            schemaErrors.extend(errors)
+            schemaExtensions.extend(extensions)
+        return failFast and schemaErrors
+    for table in tables:
+        if check(table,'Table '+table+' is not required'):
+            return [schemaErrors,schemaExtensions]
+    for fds, fcs in fdsfc:
+        if not fds in ('GeologicMap','CorrelationOfMapUnits') and fds[0:12] <> 'CrossSection':
+            schemaExtensions.append('Feature dataset '+fds+' is not required')
+        for fc in fcs:
+            if check(fc,'Feature class '+fc+' is not required'):
+                return [schemaErrors,schemaExtensions]
+    return [schemaErrors,schemaExtensions]
+
+def _buildReferenceTables(reader,allTables,checks=None):
+    # gather _IDs and references of all tables, as far as checks need
+    #   them, into temporary tables
+    c = reader.connection
+    for t in ('ncgmp_ids','ncgmp_murefs','ncgmp_mapunits','ncgmp_glossrefs','ncgmp_srcrefs'):
+        c.execute('DROP TABLE IF EXISTS temp.'+t)
+    c.execute('CREATE TEMP TABLE ncgmp_ids (id, tbl)')
+    c.execute('CREATE TEMP TABLE ncgmp_murefs (mu, tbl)')          # MapUnit references, outside DMU and StandardLithology
+    c.execute('CREATE TEMP TABLE ncgmp_mapunits (mu, kind)')       # MapUnits on map (gmap), in CMU (cmu), in cross sections (cs)
+    c.execute('CREATE TEMP TABLE ncgmp_glossrefs (term, field, tbl)')
+    c.execute('CREATE TEMP TABLE ncgmp_srcrefs (id, field, tbl)')
+    for table in allTables:
+        plan = TableScanner.TablePlan(table,_fields(reader,table),checks)
+        t = sqlName(table)
+        if plan.idColumn <> None:
+            c.execute('INSERT INTO ncgmp_ids SELECT '+sqlName(plan.columns[plan.idColumn])+', ? FROM '+t,(table,))
+        if plan.mapUnitColumn <> None:
+            # as str(MapUnit) in the geodatabase path: null becomes 'None'
+            mu = "coalesce(CAST("+sqlName('MapUnit')+" AS TEXT),'None')"
+            kinds = []
+            if table == 'MapUnitPolys':
+                kinds.append('gmap')
+            if table[0:2] == 'CS' and table[3:] == 'MapUnitPolys':
+                kinds.append('cs')
+            if table == 'CMUMapUnitPolys' or table == 'CMUMapUnitPoints':
+                kinds.append('cmu')
+            if table <> 'DescriptionOfMapUnits' and table <> 'StandardLithology':
+                c.execute('INSERT INTO ncgmp_murefs SELECT DISTINCT '+mu+', ? FROM '+t+' WHERE '+mu+" <> ''",(table,))
+            for kind in kinds:
+                c.execute('INSERT INTO ncgmp_mapunits SELECT DISTINCT '+mu+', ? FROM '+t+' WHERE '+mu+" <> ''",(kind,))
+        for i, field in plan.glossColumns:
+            f = sqlName(field)
+            c.execute('INSERT INTO ncgmp_glossrefs SELECT DISTINCT CAST('+f+' AS TEXT), ?, ? FROM '+t+' WHERE '+f+' IS NOT NULL AND '+f+" <> ''",(field,table))
+        for i, field in plan.sourceColumns:
+            c.execute('INSERT INTO ncgmp_srcrefs SELECT DISTINCT '+sqlName(field)+', ?, ? FROM '+t,(field,table))
+    c.execute('CREATE INDEX temp.ncgmp_ids_id ON ncgmp_ids (id)')
+    c.execute('CREATE INDEX temp.ncgmp_murefs_mu ON ncgmp_murefs (mu)')
+    c.execute('CREATE INDEX temp.ncgmp_glossrefs_term ON ncgmp_glossrefs (term)')
+    c.execute('CREATE INDEX temp.ncgmp_srcrefs_id ON ncgmp_srcrefs (id)')
+
+def _hasField(reader,table,field):
+    try:
+        return field in [f.name for f in reader.listFields(table)]
+    except:
+        return False
+
+def _fieldNames(reader,table,allTables):
+    # names of fields of table, or None if it is absent
+    if not table in allTables:
+        return None
+    return [f.name for f in reader.listFields(table)]
+
+def _rowCount(reader,table):
+    try:
+        return reader.rowCount(table)
+    except:
+        return 0
+
+def _firstRef(refs):
+    # 'field<SOH>table' -> [field, table]
+    return refs.split('\x01')
+
+def contentErrors(source,allTables,checks=None):
+    # allTables is list of all tables and feature classes; checks, if not
+    #   None, the content checks enabled.
+    #   Returns dictionary  report section -> list of error lines,
+    #   except 'allBadNulls' and AttributeGraph.sectionNames -> ErrorAggregator
+    reader = _reader(source)
+    c = reader.connection
+    _buildReferenceTables(reader,allTables,checks)
+    errors = {}
+    def section(name):
+        return errors.setdefault(name,[])
+    if TableScanner.isEnabled(checks,'ids'):
+        _duplicateIds(c,section)
+    if TableScanner.isEnabled(checks,'attributes'):
+        errors.update(_attributeLinks(reader,allTables))
+    if TableScanner.isEnabled(checks,'dataSources'):
+        _dataSources(reader,section)
+    if TableScanner.isEnabled(checks,'mapUnits'):
+        _mapUnits(reader,section)
+    if TableScanner.isEnabled(checks,'glossary'):
+        _glossary(reader,section)
+    if TableScanner.isEnabled(checks,'hierarchyKeys'):
+        _hierarchyKeys(reader,section)
+    if TableScanner.isEnabled(checks,'nulls'):
+        errors['allBadNulls'] = _badNulls(reader,allTables)
+    return errors
+
+def _duplicateIds(c,section):
+    # duplicate _IDs. Each adjacent pair of the sorted [_ID, table] list is reported
+    q = '''SELECT id, tbl, count(*) FROM ncgmp_ids
+           WHERE id IN (SELECT id FROM ncgmp_ids GROUP BY id HAVING count(*) > 1)
+              OR (id IS NULL AND (SELECT count(*) FROM ncgmp_ids WHERE id IS NULL) > 1)
+           GROUP BY id, tbl ORDER BY id, tbl'''
+    lastID = lastTable = None
+    first = True
+    for anID, table, n in c.execute(q):
+        pairs = []
+        if not first and anID == lastID:
+            pairs.append([lastTable,table])
+        pairs.extend([[table,table]]*(n-1))
+        for pair in pairs:
+            if anID <> None:
+                section('duplicateIDs').append('    '+anID+', tables '+pair[0]+' '+pair[1])
+            else:
+                section('duplicateIDs').append('    BOGUS! got a NoneType ID or table')
+        first = False
+        lastID, lastTable = anID, table
+
+def _attributeLinks(reader,allTables):
+    # links of ExtendedAttributes. Each OwnerID and ValueLinkID is looked up
+    #   in the index of _IDs; AttributeGraph classifies the rows
+    c = reader.connection
+    # null _IDs were once compared as the string 'None'
+    hasNullIds = c.execute('SELECT EXISTS (SELECT 1 FROM ncgmp_ids WHERE id IS NULL)').fetchone()[0]
+    graph = AttributeGraph.AttributeGraph()
+    readAttributes, readEvents = graph.checkFields(_fieldNames(reader,'ExtendedAttributes',allTables),
+                                                   _fieldNames(reader,'GeologicEvents',allTables))
+    if readEvents:
+        graph.addEvents(anID for (anID,) in c.execute('SELECT GeologicEvents_ID FROM GeologicEvents'))
+    if readAttributes:
+        q = ('SELECT e.'+sqlName(reader.oidName('ExtendedAttributes'))+', e.OwnerID, e.ValueLinkID, '
+             'EXISTS (SELECT 1 FROM ncgmp_ids i WHERE i.id = e.OwnerID), '
+             'EXISTS (SELECT 1 FROM ncgmp_ids i WHERE i.id = e.ValueLinkID) FROM ExtendedAttributes e')
+        for oid, ownerID, valueLinkID, ownerFound, valueLinkFound in c.execute(q):
+            graph.addLinks(oid,ownerID,valueLinkID,ownerFound or (ownerID == 'None' and hasNullIds),
+                           valueLinkFound or (valueLinkID == 'None' and hasNullIds))
+    return graph.finish()
+
+def _dataSources(reader,section):
+    c = reader.connection
+    if _hasField(reader,'DataSources','DataSources_ID'):
+        q = '''SELECT r.id, min(r.field||char(1)||r.tbl) FROM ncgmp_srcrefs r
+               WHERE r.id IS NOT NULL AND r.id <> '' AND NOT EXISTS
+                 (SELECT 1 FROM DataSources d WHERE d.DataSources_ID = r.id)
+               GROUP BY r.id'''
+        for anID, refs in c.execute(q):
+            field, table = _firstRef(refs)
+            section('missingSourceIDs').append('    '+anID+', cited in field '+field+' table '+table)
+        q = '''SELECT d.DataSources_ID FROM DataSources d WHERE d.DataSources_ID IS NOT NULL AND NOT EXISTS
+                 (SELECT 1 FROM ncgmp_srcrefs r WHERE r.id = d.DataSources_ID)'''
+        for (anID,) in c.execute(q):
+            section('unusedDataSources').append('    '+anID)
+    else:
+        section('missingSourceIDs').append('    Error: did not find field DataSources_ID in table DataSources')
+        section('unusedDataSources').append('    Error: did not find field DataSources_ID in table DataSources')
+
+def _mapUnits(reader,section):
+    # MapUnits against DescriptionOfMapUnits and StandardLithology
+    c = reader.connection
+    for table, missing, unreferenced in (('DescriptionOfMapUnits','missingDmuMapUnits','unreferencedDmuMapUnits'),
+                                         ('StandardLithology','missingStandardLithMapUnits','unreferencedStandardLithMapUnits')):
+        if not _hasField(reader,table,'MapUnit'):
+            section(missing).append('    Error: did not find field MapUnit in table '+table)
+            section(unreferenced).append('    Error: did not find field MapUnit in table '+table)
+            continue
+        q = ('SELECT r.mu, min(r.tbl) FROM ncgmp_murefs r WHERE NOT EXISTS '
+             '(SELECT 1 FROM '+table+' d WHERE d.MapUnit = r.mu) GROUP BY r.mu')
+        for mu, citedIn in c.execute(q):
+            section(missing).append('    '+mu+', cited in '+citedIn)
+        if table == 'DescriptionOfMapUnits':
+            q = ('SELECT d.MapUnit FROM DescriptionOfMapUnits d WHERE d.MapUnit IS NOT NULL AND d.MapUnit <> '
+                 "'' AND NOT EXISTS (SELECT 1 FROM ncgmp_murefs r WHERE r.mu = d.MapUnit)")
+        else:
+            q = ('SELECT DISTINCT s.MapUnit FROM StandardLithology s WHERE s.MapUnit IS NOT NULL AND s.MapUnit <> '
+                 "'' AND NOT EXISTS (SELECT 1 FROM ncgmp_murefs r WHERE r.mu = s.MapUnit)")
+        for (mu,) in c.execute(q):
+            section(unreferenced).append('    '+mu)
+    # units present in map, DMU, CMU, and cross sections
+    muSets = {'gmap':set(),'dmu':set(),'cmu':set(),'cs':set()}
+    for mu, kind in c.execute('SELECT DISTINCT mu, kind FROM ncgmp_mapunits'):
+        muSets[kind].add(mu)
+    if _hasField(reader,'DescriptionOfMapUnits','MapUnit'):
+        for (mu,) in c.execute('SELECT DISTINCT MapUnit FROM DescriptionOfMapUnits WHERE MapUnit IS NOT NULL'):
+            muSets['dmu'].add(mu)
+    lines = section('equivalenceErrors')
+    lines.append('    Unit       Map  DMU  CMU  XS')
+    allMapUnits = set()
+    for muSet in muSets.values():
+        allMapUnits.update(muSet)
+    for mu in sorted(allMapUnits):
+        aline = '    '+mu.ljust(10)
+        for kind in ('gmap','dmu','cmu','cs'):
+            if mu in muSets[kind]:
+                aline = aline+'  X  '
+            else:
+                aline = aline+' --- '
+        lines.append(aline)
+
+def _glossary(reader,section):
+    c = reader.connection
+    if _hasField(reader,'Glossary','Term'):
+        q = '''SELECT r.term, min(r.field||char(1)||r.tbl) FROM ncgmp_glossrefs r
+               WHERE r.term <> 'None' AND NOT EXISTS (SELECT 1 FROM Glossary g WHERE g.Term = r.term)
+               GROUP BY r.term'''
+        for term, refs in c.execute(q):
+            field, table = _firstRef(refs)
+            if len(term) >= 40:
+                term = term[0:37]+'...'
+            section('missingGlossaryTerms').append('    '+term+', cited in field '+field+', table '+table)
+        q = '''SELECT g.Term FROM Glossary g WHERE g.Term IS NOT NULL AND NOT EXISTS
+                 (SELECT 1 FROM ncgmp_glossrefs r WHERE r.term = g.Term)'''
+        for (term,) in c.execute(q):
+            section('unusedGlossaryTerms').append('    '+term)
+    else:
+        section('missingGlossaryTerms').append('    Error: did not find field Term in table Glossary')
+        section('unusedGlossaryTerms').append('    Error: did not find field Term in table Glossary')
+
+def _hierarchyKeys(reader,section):
+    # HierarchyKey format and tree
+    c = reader.connection
+    if _hasField(reader,'DescriptionOfMapUnits','HierarchyKey'):
+        widthLines, treeLines = HierarchyKey.errorLines(k for (k,) in c.execute('SELECT HierarchyKey FROM DescriptionOfMapUnits'))
+        section('hKeyErrors').extend(widthLines)
+        section('hKeyTreeErrors').extend(treeLines)
+    elif _rowCount(reader,'DescriptionOfMapUnits') > 0:
+        section('hKeyErrors').append('    Error: did not find field HierarchyKey in table DescriptionOfMapUnits')
+
+def _badNulls(reader,allTables):
+    # pseudonulls, trailing and leading spaces. SQL finds the rows with a
+    #   space at either end of a non-nullable String field; ColumnScanner
+    #   classifies them as the geodatabase path does
+    c = reader.connection
+    badNulls = ErrorAggregator.ErrorAggregator('')
+    for table in allTables:
+        plan = TableScanner.TablePlan(table,_fields(reader,table))
+        if not plan.nullCheckColumns:
+            continue
+        names = [field for i, field, length in plan.nullCheckColumns]
+        q = ('SELECT '+sqlName(reader.oidName(table))+', '+', '.join([sqlName(f) for f in names])+
+             ' FROM '+sqlName(table)+' WHERE '+
+             ' OR '.join(['substr('+sqlName(f)+",-1) = ' ' OR substr("+sqlName(f)+",1,1) = ' '" for f in names]))
+        columns = [[i+1,names[i],plan.nullCheckColumns[i][2]] for i in range(len(names))]
+        batch = []
+        for row in c.execute(q):
+            batch.append(row)
+            if len(batch) >= ColumnScanner.batchRows:
+                ColumnScanner.checkSpaces(table,columns,batch,badNulls)
+                batch = []
+        ColumnScanner.checkSpaces(table,columns,batch,badNulls)
+    return badNulls
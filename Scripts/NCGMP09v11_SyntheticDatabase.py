@@ -0,0 +1,595 @@
+# NCGMP09v11_SyntheticDatabase.py
+#   Builds synthetic NCGMP09 databases of a chosen size, for measuring and
+#   testing NCGMP09v1.1_ValidateDatabase.
+#
+#   Tables and fields come from tableDict (NCGMP09v11_Definition). Values
+#   are made so that the database is conformant: every MapUnit is in
+#   DescriptionOfMapUnits and StandardLithology and every DMU unit is on
+#   the map, every Glossary field value is in Glossary and every Glossary
+#   term is used, every ...SourceID is in DataSources and every DataSource
+#   is cited, every ExtendedAttributes OwnerID and ValueLinkID exists.
+#
+#   A controlled rate of errors can then be injected:
+#     duplicateIDs          a feature takes the _ID of the feature before it
+#     missingGlossaryTerms  a Type value that is not in Glossary
+#     allBadNulls           a pseudonull (' ') in ContactsAndFaults IsConcealed,
+#                           which is NoNulls in the NCGMP09 spec (see
+#                           NCGMP09v11_DefinitionNoNulls) and is then so
+#                           declared, as otherwise it is not checked. As
+#                           tableDict has it NullsOK, this adds one schema
+#                           error
+#     hKeyErrors            a HierarchyKey with a part of the wrong width
+#     hKeyTreeErrors        a group of units numbered with a gap (001, 003,
+#                           ...) or with its first unit missing (002, 003,
+#                           ...)
+#     danglingOwnerIds      an ExtendedAttributes OwnerID that is not an _ID
+#     unusedGeologicEvents  an ExtendedAttributes row links the first event
+#                           instead of its own, which is then not cited
+#     selfIntersections     a contact with a small loop that crosses itself
+#     lineDangles           a contact with a short spur at its end
+#     polygonOverlaps       a polygon that extends halfway into its right
+#                           neighbour; its new edge is also not covered by
+#                           contacts (uncoveredBoundaries)
+#     polygonGaps           a polygon that ends halfway short of its right
+#                           neighbour, also with an uncovered edge
+#   MapUnitPolys are squares tiling a grid, and ContactsAndFaults are pieces
+#   of the grid lines (see MapLayout), so that the map has no topology
+#   errors but those injected. Other feature classes have small shapes at
+#   scattered points.
+#   The names are those of the validator's report sections. The number of
+#   injected errors is what the validator should count for each section:
+#   the sum of the counts (--N duplicates, --N rows) of its report lines.
+#
+#   Databases are written to SQLite (.sqlite, .gpkg; needs only the Python
+#   sqlite3 module) or, with arcpy, to a file geodatabase (.gdb). A record
+#   of what was built and injected is written to <database>-injected.json
+#
+#   Usage:
+#     NCGMP09v11_SyntheticDatabase.py <database> <nFeatures> [errorRate=<r>] [seed=<n>]
+
+import sys, os, os.path, random, json, time, math
+from NCGMP09v11_Definition import tableDict
+from NCGMP09v11_TableScanner import gFieldDefList, sqlName
+import NCGMP09v11_Geometry as Geometry
+
+versionString = 'NCGMP09v11_SyntheticDatabase.py, version of 17 October 2026'
+
+errorCategories = ('duplicateIDs','missingGlossaryTerms','allBadNulls','hKeyErrors','hKeyTreeErrors',
+                   'danglingOwnerIds','unusedGeologicEvents','selfIntersections','polygonOverlaps',
+                   'polygonGaps','lineDangles','uncoveredBoundaries')
+
+# share of nFeatures in each feature class of GeologicMap
+featureShares = [['ContactsAndFaults',0.4,'Polyline'],
+                 ['MapUnitPolys',0.2,'Polygon'],
+                 ['OrientationPoints',0.25,'Point'],
+                 ['Stations',0.15,'Point']]
+# String field that is NoNulls in the NCGMP09 spec, for pseudonulls
+badNullsTable = 'ContactsAndFaults'
+badNullsField = 'IsConcealed'
+nDataSources = 5
+nEvents = 5
+vocabularySize = 6
+
+# ArcGIS field type -> SQLite declared type (see TableScanner.sqliteTypes)
+sqliteDeclTypes = {'String':'TEXT','Integer':'INTEGER','SmallInteger':'SMALLINT',
+                   'Double':'DOUBLE','Single':'FLOAT','Date':'DATETIME','Blob':'BLOB'}
+sqliteGeometryTypes = {'Point':'POINT','Polyline':'LINESTRING','Polygon':'POLYGON'}
+# ArcGIS field type -> AddField_management field type
+arcpyFieldTypes = {'String':'TEXT','Integer':'LONG','SmallInteger':'SHORT','Double':'DOUBLE',
+                   'Single':'FLOAT','Date':'DATE','Blob':'BLOB'}
+
+def addMsgAndPrint(msg):
+    print msg
+
+def idPrefix(table):
+    # capitals of table name, e.g. ContactsAndFaults -> CAF
+    return ''.join([c for c in table if c.isupper()])
+
+def fieldDefs(table):
+    # tableDict entry without repeated field names, as
+    #   [name, type, nullStatus, length] (length 0 if not given)
+    defs = []
+    names = []
+    for fieldDef in tableDict[table]:
+        if not fieldDef[0] in names:
+            names.append(fieldDef[0])
+            defs.append((list(fieldDef)+[0])[:4])
+    return defs
+
+def _injectAt(rng,n,rate,start=0):
+    # set of row numbers (start <= i < n) that receive an error
+    if rate <= 0 or n <= start:
+        return set()
+    k = min(n-start,max(1,int(round(rate*(n-start)))))
+    return set(rng.sample(xrange(start,n),k))
+
+cellSize = 100.0                  # side of map unit polygons, in meters
+mapOrigin = (500000.0,3500000.0)  # lower left corner of map, NAD 1983 UTM zone 12N
+
+class MapLayout:
+    # MapUnitPolys and ContactsAndFaults of a synthetic map. Polygon i is
+    #   the square in column i % nColumns and row i / nColumns of a grid.
+    #   The grid lines bounding the polygons are cut into nLines contacts,
+    #   so that every polygon edge is covered and every contact ends at
+    #   another. Errors are injected at a rate, as described above
+    def __init__(self,nPolys,nLines,rng,rate):
+        self.nPolys = nPolys
+        self.nColumns = int(math.ceil(math.sqrt(nPolys)))
+        self.injected = dict([[c,0] for c in ('selfIntersections','polygonOverlaps','polygonGaps',
+                                               'lineDangles','uncoveredBoundaries')])
+        self._polygonErrors(rng,rate)
+        self.lines = self._cut(self._chains(),nLines)
+        self.lineErrors = {}
+        for i in _injectAt(rng,len(self.lines),rate):
+            self.lineErrors[i] = ['selfIntersections']
+        for i in _injectAt(rng,len(self.lines),rate):
+            self.lineErrors.setdefault(i,[]).append('lineDangles')
+
+    def _point(self,x,y):
+        return (mapOrigin[0]+x*cellSize,mapOrigin[1]+y*cellSize)
+
+    def _polygonErrors(self,rng,rate):
+        # cells in rows between full rows, with a right neighbour; every
+        #   other column, so that no two are neighbours. Gaps in rows 1, 5,
+        #   9..., overlaps in rows 3, 7, 11...
+        fullRows = self.nPolys/self.nColumns
+        self.width = {}    # cell -> width, if not 1
+        for row0, category, width in ((1,'polygonGaps',0.5),(3,'polygonOverlaps',1.5)):
+            cells = [r*self.nColumns+c for r in range(row0,fullRows-1,4) for c in range(0,self.nColumns-1,2)]
+            for i in _injectAt(rng,len(cells),rate):
+                self.width[cells[i]] = width
+                self.injected[category] += 1
+                self.injected['uncoveredBoundaries'] += 1
+
+    def polygon(self,i):
+        # [[ring]], clockwise as in ArcGIS
+        c, r = i % self.nColumns, i / self.nColumns
+        w = self.width.get(i,1.0)
+        return [[[self._point(c,r),self._point(c,r+1),self._point(c+w,r+1),self._point(c+w,r),self._point(c,r)]]]
+
+    def _chains(self):
+        # maximal runs of polygon edges along each grid line, as lists of
+        #   grid points
+        horizontal = {}
+        vertical = {}
+        for i in range(self.nPolys):
+            c, r = i % self.nColumns, i / self.nColumns
+            for y in (r,r+1):
+                horizontal.setdefault(y,set()).add(c)
+            for x in (c,c+1):
+                vertical.setdefault(x,set()).add(r)
+        chains = []
+        for lines, makePoint in ((horizontal,lambda a,b: (b,a)),(vertical,lambda a,b: (a,b))):
+            for a in sorted(lines.keys()):
+                run = []
+                for b in sorted(lines[a]):
+                    if run and b <> run[-1][1]:
+                        chains.append([makePoint(a,bb) for bb, e in run]+[makePoint(a,run[-1][1])])
+                        run = []
+                    run.append((b,b+1))
+                chains.append([makePoint(a,bb) for bb, e in run]+[makePoint(a,run[-1][1])])
+        return chains
+
+    def _cut(self,chains,nLines):
+        # nLines lists of paths: chains cut into pieces or, if there are
+        #   too few chains, several chains to a line
+        nEdges = sum([len(chain)-1 for chain in chains])
+        if nLines <= len(chains):
+            lines = [[chain] for chain in chains[0:nLines]]
+            for k in range(nLines,len(chains)):
+                lines[-1].append(chains[k])
+            return lines
+        cuts = nLines-len(chains)
+        lines = []
+        for chain in chains:
+            n = min(len(chain)-2,cuts)
+            cuts = cuts-n
+            step = (len(chain)-1)/float(n+1)
+            ends = [0]+[int(round(step*(k+1))) for k in range(n)]+[len(chain)-1]
+            for k in range(len(ends)-1):
+                lines.append([chain[ends[k]:ends[k+1]+1]])
+        # more lines than edges: halve edges
+        k = 0
+        while cuts > 0 and k < nEdges:
+            path = lines[k][0]
+            middle = ((path[0][0]+path[1][0])/2.0,(path[0][1]+path[1][1])/2.0)
+            lines[k] = [[path[0],middle]]
+            lines.append([[middle,path[1]]])
+            cuts = cuts-1
+            k = k+1
+        while cuts > 0:
+            lines.append(None)
+            cuts = cuts-1
+        return lines
+
+    def line(self,i):
+        # [path, ...] of contact i, or None
+        if self.lines[i] == None:
+            return None
+        paths = [[self._point(x,y) for x, y in path] for path in self.lines[i]]
+        errors = self.lineErrors.get(i,())
+        path = paths[0]
+        if 'selfIntersections' in errors:
+            # loop across the middle of the first edge
+            (x0, y0), (x1, y1) = path[0], path[1]
+            dx, dy = (x1-x0)/10.0, (y1-y0)/10.0
+            loop = [(x0+6*dx,y0+6*dy),(x0+5*dx-dy,y0+5*dy+dx),(x0+5*dx+dy,y0+5*dy-dx),(x0+6*dx,y0+6*dy)]
+            paths[0] = path = [path[0]]+loop+path[1:]
+            self.injected['selfIntersections'] += 1
+        if 'lineDangles' in errors:
+            # spur turned 45 degrees from the last edge, so that spurs of
+            #   contacts ending at the same node do not meet
+            (x0, y0), (x, y) = path[-2], path[-1]
+            length = math.hypot(x-x0,y-y0)
+            dx, dy = 0.2*cellSize*(x-x0)/length, 0.2*cellSize*(y-y0)/length
+            path.append((x+dx-dy,y+dy+dx))
+            self.injected['lineDangles'] += 1
+        return paths
+
+def anchorShape(shapeType,x,y):
+    # small shape at (x, y), for feature classes other than the map's
+    if shapeType == 'Point':
+        return (x,y)
+    if shapeType == 'Polyline':
+        return [[(x,y),(x+8,y+8)]]
+    return [[[(x,y),(x,y+8),(x+8,y+8),(x+8,y),(x,y)]]]
+
+class SqliteWriter:
+    def __init__(self,path):
+        import sqlite3
+        if os.path.exists(path):
+            os.remove(path)
+        self.connection = sqlite3.connect(path)
+        self.geoPackage = os.path.splitext(path)[1].lower() == '.gpkg'
+        self.srid = 26912    # NAD 1983 UTM zone 12N
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+    def createTable(self,table,defs,shapeType=None,featureDataset=None,noNulls=()):
+        # SQLite has no feature datasets; the validator assigns feature
+        #   classes to GeologicMap by name
+        columns = ['"OBJECTID" INTEGER PRIMARY KEY']
+        if shapeType <> None:
+            columns.append('"Shape" '+sqliteGeometryTypes[shapeType])
+        for name, fType, nullStatus, length in defs:
+            declType = sqliteDeclTypes[fType]
+            if fType == 'String':
+                declType = declType+'('+str(length)+')'
+            if nullStatus == 'NoNulls' or name in noNulls:
+                declType = declType+' NOT NULL'
+            columns.append(sqlName(name)+' '+declType)
+        self.connection.execute('CREATE TABLE '+sqlName(table)+' ('+', '.join(columns)+')')
+    def insertRows(self,table,names,rows,shapeType=None):
+        # rows are tuples in order of names, preceded by the shape (see
+        #   MapLayout), which is stored as WKB, or in a GeoPackage as a
+        #   GeoPackage geometry blob
+        if shapeType == None:
+            q = ('INSERT INTO '+sqlName(table)+' ('+','.join([sqlName(n) for n in names])+
+                 ') VALUES ('+','.join(['?']*len(names))+')')
+            self.connection.executemany(q,(row[1:] for row in rows))
+            return
+        import sqlite3
+        q = ('INSERT INTO '+sqlName(table)+' ("Shape",'+','.join([sqlName(n) for n in names])+
+             ') VALUES ('+','.join(['?']*(len(names)+1))+')')
+        def shapeRows():
+            for row in rows:
+                shape = None
+                if row[0] <> None:
+                    if shapeType == 'Point':
+                        shape = Geometry.encodeShape('Point',[row[0]],self.geoPackage,self.srid)
+                    else:
+                        shape = Geometry.encodeShape(shapeType,row[0],self.geoPackage,self.srid)
+                    shape = sqlite3.Binary(shape)
+                yield (shape,)+tuple(row[1:])
+        self.connection.executemany(q,shapeRows())
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+class ArcpyWriter:
+    def __init__(self,path):
+        import arcpy
+        self.arcpy = arcpy
+        if arcpy.Exists(path):
+            arcpy.Delete_management(path)
+        arcpy.CreateFileGDB_management(os.path.dirname(os.path.abspath(path)),os.path.basename(path))
+        self.path = path
+        self.spatialReference = arcpy.SpatialReference(26912)   # NAD 1983 UTM zone 12N
+        self.featureDatasets = []
+    def createTable(self,table,defs,shapeType=None,featureDataset=None,noNulls=()):
+        arcpy = self.arcpy
+        if shapeType == None:
+            arcpy.CreateTable_management(self.path,table)
+            location = os.path.join(self.path,table)
+        else:
+            if not featureDataset in self.featureDatasets:
+                arcpy.CreateFeatureDataset_management(self.path,featureDataset,self.spatialReference)
+                self.featureDatasets.append(featureDataset)
+            arcpy.CreateFeatureclass_management(os.path.join(self.path,featureDataset),table,shapeType)
+            location = os.path.join(self.path,featureDataset,table)
+        for name, fType, nullStatus, length in defs:
+            if nullStatus == 'NoNulls' or name in noNulls:
+                isNullable = 'NON_NULLABLE'
+            else:
+                isNullable = 'NULLABLE'
+            if fType == 'String':
+                arcpy.AddField_management(location,name,'TEXT','#','#',length,'#',isNullable)
+            else:
+                arcpy.AddField_management(location,name,arcpyFieldTypes[fType],'#','#','#','#',isNullable)
+    def _location(self,table):
+        arcpy = self.arcpy
+        arcpy.env.workspace = self.path
+        for fds in self.featureDatasets:
+            if table in arcpy.ListFeatureClasses('','',fds):
+                return os.path.join(self.path,fds,table)
+        return os.path.join(self.path,table)
+    def _shape(self,shapeType,parts):
+        arcpy = self.arcpy
+        if parts == None:
+            return None
+        if shapeType == 'Polyline':
+            return arcpy.Polyline(arcpy.Array([arcpy.Array([arcpy.Point(x,y) for x, y in path]) for path in parts]),
+                                  self.spatialReference)
+        return arcpy.Polygon(arcpy.Array([arcpy.Array([arcpy.Point(x,y) for x, y in ring])
+                                          for rings in parts for ring in rings]),self.spatialReference)
+    def insertRows(self,table,names,rows,shapeType=None):
+        fieldNames = list(names)
+        if shapeType == 'Point':
+            fieldNames.insert(0,'SHAPE@XY')
+        elif shapeType <> None:
+            fieldNames.insert(0,'SHAPE@')
+        cursor = self.arcpy.da.InsertCursor(self._location(table),fieldNames)
+        try:
+            for row in rows:
+                if shapeType == None:
+                    cursor.insertRow(row[1:])
+                elif shapeType == 'Point':
+                    cursor.insertRow((row[0],)+tuple(row[1:]))
+                else:
+                    cursor.insertRow((self._shape(shapeType,row[0]),)+tuple(row[1:]))
+        finally:
+            del cursor
+    def close(self):
+        pass
+
+def openWriter(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.sqlite','.gpkg'):
+        return SqliteWriter(path)
+    if extension == '.gdb':
+        return ArcpyWriter(path)
+    raise ValueError('cannot write '+path+'; database must be .sqlite, .gpkg or .gdb')
+
+class SyntheticDatabase:
+    # builds one database. Values cited in Glossary and DataSources are
+    #   collected as rows are made; those tables are written last
+    def __init__(self,nFeatures,errorRate=0.0,seed=1):
+        self.nFeatures = nFeatures
+        self.errorRate = errorRate
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.nUnits = max(10,min(500,int(nFeatures**0.5)))
+        self.mapUnits = ['U'+str(i) for i in range(self.nUnits)]
+        self.sources = ['DAS'+str(i+1) for i in range(nDataSources)]
+        self.glossaryTerms = set()
+        self.usedSources = set()
+        self.injected = dict([[c,0] for c in errorCategories])
+        self.rowCounts = {}
+        self.ids = {}      # table -> list of _IDs, for ExtendedAttributes
+
+    def _value(self,table,i,fieldDef,mapUnit,errors):
+        name, fType, nullStatus, length = fieldDef
+        if name == 'MapUnit':
+            return mapUnit
+        if name == 'Label':
+            return mapUnit
+        if name == badNullsField and 'allBadNulls' in errors:
+            self.injected['allBadNulls'] += 1
+            return ' '
+        if name == 'Symbol':
+            return str(i % 30 + 1)
+        if name in gFieldDefList:
+            if name == 'Type' and 'missingGlossaryTerms' in errors:
+                self.injected['missingGlossaryTerms'] += 1
+                return 'undefined '+idPrefix(table)+str(i)
+            term = name.lower()+' '+str(self.rng.randrange(vocabularySize))
+            self.glossaryTerms.add(term)
+            return term
+        if name.find('Source') >= 0 and name.find('_ID') < 0:
+            source = self.sources[i % len(self.sources)]
+            self.usedSources.add(source)
+            return source
+        if fType == 'String':
+            if length < 20:
+                return str(i)[:length]
+            if name == 'Notes':
+                return None
+            return name+' of '+table+' '+str(i)
+        if fType in ('Double','Single'):
+            return round(self.rng.uniform(0,360),1)
+        if fType in ('Integer','SmallInteger'):
+            return i
+        if fType == 'Date':
+            return '2012-01-01'
+        return None
+
+    def _row(self,table,defs,i,mapUnit,errors=(),shape=None):
+        # row i of table: its shape (by default an (x, y) anchor), then
+        #   values in order of defs
+        ids = self.ids.setdefault(table,[])
+        if shape == None:
+            shape = (i % 1000 * 10.0, i / 1000 * 10.0)
+        row = [shape]
+        for fieldDef in defs:
+            if fieldDef[0] == table+'_ID':
+                if 'duplicateIDs' in errors and ids:
+                    self.injected['duplicateIDs'] += 1
+                    anID = ids[-1]
+                else:
+                    anID = idPrefix(table)+str(i+1)
+                ids.append(anID)
+                row.append(anID)
+            else:
+                row.append(self._value(table,i,fieldDef,mapUnit,errors))
+        return row
+
+    def _rows(self,table,defs,n,injections,mapUnitOf,shapeOf):
+        # injections is dictionary  category -> set of row numbers
+        for i in xrange(n):
+            errors = [c for c in injections if i in injections[c]]
+            row = self._row(table,defs,i,mapUnitOf(i),errors)
+            if shapeOf <> None:
+                row[0] = shapeOf(i)
+            yield tuple(row)
+
+    def _write(self,writer,table,n,injections={},mapUnitOf=None,shapeType=None,featureDataset=None,
+               noNulls=(),rowValues=None,shapeOf=None):
+        defs = fieldDefs(table)
+        writer.createTable(table,defs,shapeType,featureDataset,noNulls)
+        if mapUnitOf == None:
+            mapUnitOf = lambda i: None
+        if shapeOf == None and shapeType in ('Polyline','Polygon'):
+            shapeOf = lambda i: anchorShape(shapeType,i % 1000 * 10.0,i / 1000 * 10.0)
+        if rowValues == None:
+            rows = self._rows(table,defs,n,injections,mapUnitOf,shapeOf)
+        else:
+            rows = rowValues
+        writer.insertRows(table,[d[0] for d in defs],rows,shapeType)
+        self.rowCounts[table] = n
+
+    def build(self,path):
+        addMsgAndPrint('  Building '+path+', '+str(self.nFeatures)+' features, error rate '+str(self.errorRate))
+        startTime = time.time()
+        writer = openWriter(path)
+        rate = self.errorRate
+        units = self.mapUnits
+        schemaErrors = []
+        # GeologicMap. First rows of MapUnitPolys put every unit on the map
+        counts = dict([[fc,max(self.nUnits,int(self.nFeatures*share))] for fc, share, shapeType in featureShares])
+        layout = MapLayout(counts['MapUnitPolys'],counts['ContactsAndFaults'],self.rng,rate)
+        shapes = {'MapUnitPolys':layout.polygon,'ContactsAndFaults':layout.line}
+        for fc, share, shapeType in featureShares:
+            n = counts[fc]
+            injections = {'duplicateIDs':_injectAt(self.rng,n,rate,1)}
+            noNulls = ()
+            if fc == badNullsTable and rate > 0:
+                injections['allBadNulls'] = _injectAt(self.rng,n,rate)
+                noNulls = (badNullsField,)
+            if 'Type' in [d[0] for d in fieldDefs(fc)]:
+                injections['missingGlossaryTerms'] = _injectAt(self.rng,n,rate)
+            if fc == 'MapUnitPolys':
+                mapUnitOf = lambda i: units[i % len(units)]
+            else:
+                mapUnitOf = lambda i: units[self.rng.randrange(len(units))]
+            self._write(writer,fc,n,injections,mapUnitOf,shapeType,'GeologicMap',noNulls,shapeOf=shapes.get(fc))
+            if noNulls:
+                schemaErrors.append(fc+', field '+badNullsField+' should be NullsOK')
+        for category, n in layout.injected.iteritems():
+            self.injected[category] += n
+        self._write(writer,'DataSourcePolys',nDataSources,shapeType='Polygon',featureDataset='GeologicMap')
+        # DescriptionOfMapUnits. HierarchyKeys are 3-digit parts, 10 units per group
+        defs = fieldDefs('DescriptionOfMapUnits')
+        # every tenth unit heads the nine that follow it. A too-wide key is
+        #   the first under its head, so that it still sorts in place
+        badKeys = set([10*i+1 for i in _injectAt(self.rng,(self.nUnits+8)/10,rate)])
+        # groups of at least two units, none too wide, are numbered from 1
+        #   skipping 2 (gap) or from 2 (first missing), in turn
+        treeGroups = sorted(_injectAt(self.rng,(self.nUnits+7)/10,rate)-set([i/10 for i in badKeys]))
+        gapGroups = set(treeGroups[0::2])
+        firstGroups = set(treeGroups[1::2])
+        self.injected['hKeyTreeErrors'] += len(treeGroups)
+        def dmuRows():
+            for i in range(self.nUnits):
+                row = self._row('DescriptionOfMapUnits',defs,i,units[i])
+                number = i%10
+                if i/10 in firstGroups or (i/10 in gapGroups and number >= 2):
+                    number = number+1
+                if i % 10 == 0:
+                    hKey = '%03d' % (i/10+1)
+                elif i in badKeys:
+                    hKey = '%03d-%04d' % (i/10+1,number)
+                    self.injected['hKeyErrors'] += 1
+                else:
+                    hKey = '%03d-%03d' % (i/10+1,number)
+                row[[d[0] for d in defs].index('HierarchyKey')+1] = hKey
+                yield tuple(row)
+        self._write(writer,'DescriptionOfMapUnits',self.nUnits,rowValues=dmuRows())
+        self._write(writer,'StandardLithology',self.nUnits,mapUnitOf=lambda i: units[i])
+        # GeologicEvents, each linked to a DMU unit through ExtendedAttributes
+        self._write(writer,'GeologicEvents',nEvents)
+        defs = fieldDefs('ExtendedAttributes')
+        badOwners = _injectAt(self.rng,nEvents,rate)
+        badLinks = _injectAt(self.rng,nEvents,rate,1)
+        def eaRows():
+            names = [d[0] for d in defs]
+            for i in range(nEvents):
+                row = self._row('ExtendedAttributes',defs,i,None)
+                row[names.index('OwnerTable')+1] = 'DescriptionOfMapUnits'
+                ownerID = self.ids['DescriptionOfMapUnits'][i % self.nUnits]
+                if i in badOwners:
+                    ownerID = 'MissingOwner'+str(i)
+                    self.injected['danglingOwnerIds'] += 1
+                row[names.index('OwnerID')+1] = ownerID
+                valueLinkID = self.ids['GeologicEvents'][i]
+                if i in badLinks:
+                    valueLinkID = self.ids['GeologicEvents'][0]
+                    self.injected['unusedGeologicEvents'] += 1
+                row[names.index('ValueLinkID')+1] = valueLinkID
+                yield tuple(row)
+        self._write(writer,'ExtendedAttributes',nEvents,rowValues=eaRows())
+        # Glossary, with every term used; then DataSources, with every source cited
+        terms = sorted(self.glossaryTerms)
+        defs = fieldDefs('Glossary')
+        def glossaryRows():
+            names = [d[0] for d in defs]
+            for i in range(len(terms)):
+                row = self._row('Glossary',defs,i,None)
+                row[names.index('Term')+1] = terms[i]
+                row[names.index('Definition')+1] = 'Definition of '+terms[i]
+                yield tuple(row)
+        self._write(writer,'Glossary',len(terms),rowValues=glossaryRows())
+        sources = sorted(self.usedSources)
+        defs = fieldDefs('DataSources')
+        def sourceRows():
+            for i in range(len(sources)):
+                row = [None]
+                for name, fType, nullStatus, length in defs:
+                    if name == 'DataSources_ID':
+                        row.append(sources[i])
+                    elif name == 'Source':
+                        row.append('Synthetic source '+str(i+1))
+                    else:
+                        row.append(None)
+                yield tuple(row)
+        self._write(writer,'DataSources',len(sources),rowValues=sourceRows())
+        writer.close()
+        seconds = time.time()-startTime
+        record = {'database':path,'version':versionString,'nFeatures':self.nFeatures,
+                  'errorRate':self.errorRate,'seed':self.seed,'seconds':round(seconds,3),
+                  'rows':self.rowCounts,'injected':self.injected,'schemaErrors':schemaErrors}
+        outf = open(injectedFileName(path),'w')
+        try:
+            json.dump(record,outf,indent=2,sort_keys=True)
+        finally:
+            outf.close()
+        addMsgAndPrint('  '+str(sum(self.rowCounts.values()))+' rows in '+('%.1f' % seconds)+' sec')
+        return record
+
+def injectedFileName(path):
+    return os.path.splitext(path)[0]+'-injected.json'
+
+def build(path,nFeatures,errorRate=0.0,seed=1):
+    # builds database at path; returns record of what was built and injected
+    return SyntheticDatabase(nFeatures,errorRate,seed).build(path)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        addMsgAndPrint('Usage: NCGMP09v11_SyntheticDatabase.py <database> <nFeatures> [errorRate=<r>] [seed=<n>]')
+        sys.exit(1)
+    options = {}
+    for arg in sys.argv[3:]:
+        if arg.find('=') > 0:
+            name, value = arg.split('=',1)
+            options[name.strip().lower()] = value.strip()
+    record = build(sys.argv[1],int(sys.argv[2]),float(options.get('errorrate',0)),int(options.get('seed',1)))
+    for category in errorCategories:
+        addMsgAndPrint('    '+category.ljust(24)+str(record['injected'][category]))
@@ -0,0 +1,461 @@
+# NCGMP09v11_TableScanner.py
+#   Single-pass, column-projected inventory of one table (or feature class)
+#   for NCGMP09v1.1_ValidateDatabase.
+#
+#   For each table, TablePlan works out once which columns each check
+#   needs (_ID, Glossary-defined fields, Source fields, MapUnit, and
+#   non-nullable String fields for the pseudonull check). scanTable then
+#   reads only those columns, as tuples, in a single pass and feeds every
+#   check from that one stream of rows. Rows with non-nullable String
+#   fields are also gathered in batches, whose columns are checked for
+#   pseudonulls and leading and trailing spaces by NCGMP09v11_ColumnScanner.
+#
+#   Rows come from a reader object, so the scanner can run without ArcGIS:
+#     ArcpyReader   - arcpy.da cursors on a personal or file geodatabase
+#     SqliteReader  - tables in a SQLite or GeoPackage copy of a database
+#     MemoryReader  - tables held in Python lists, for tests and benchmarks
+#   A reader has two methods:
+#     listFields(table)       returns a list of Field
+#     rows(table,fieldNames)  yields one tuple per row; the pseudo-field
+#                             OID@ returns the row's ObjectID, SHAPE@WKB
+#                             its shape as well-known binary (in SQLite,
+#                             the blob of the geometry column)
+#   and, for sampling (see NCGMP09v11_Sampling),
+#     oidRange(table)         [lowest, highest] ObjectID, None if no rows
+#     rowsByOid(table,fieldNames,oids)
+#                             rows as above, of those rows whose ObjectIDs
+#                             are in the sorted list oids
+#
+#   checks, if not None, names the content checks that are enabled (see
+#   contentChecks); columns that no enabled check needs are not read, and
+#   a table none of whose columns are needed is not read at all.
+#
+#   inventoryTables runs inventoryTable on many tables, optionally one
+#   table per worker process. Each returns a TableInventory; these partial
+#   results are merged in table order, so the report does not depend on
+#   the number of processes.
+
+import os.path, time
+import NCGMP09v11_RefIndex as RefIndex
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+import NCGMP09v11_ColumnScanner as ColumnScanner
+
+versionString = 'NCGMP09v11_TableScanner.py, version of 17 October 2026'
+
+# fields whose values must be defined in Glossary
+gFieldDefList = ('Type','TypeModifier','LocationMethod','Lithology','ProportionTerm','TimeScale',
+                 'Qualifier','Property','ExistenceConfidence','IdentityConfidence',
+                 'ScientificConfidence','ParagraphStyle','AgeUnits','GeneralLithology',
+                 'GeneralLithologyConfidence')
+
+oidToken = 'OID@'
+shapeToken = 'SHAPE@WKB'
+oidBatch = 500    # ObjectIDs in one IN (...) clause of rowsByOid
+
+# content checks that read column values, and what each reads:
+#   ids            _ID
+#   attributes     _ID (OwnerIDs and ValueLinkIDs are looked up among them)
+#   glossary       fields in gFieldDefList
+#   mapUnits       MapUnit
+#   dataSources    fields named ...Source...
+#   nulls          non-nullable String fields
+contentChecks = ('ids','attributes','glossary','mapUnits','dataSources','nulls')
+
+def isEnabled(checks,*names):
+    # is any of names enabled? checks None enables all
+    if checks == None:
+        return True
+    for name in names:
+        if name in checks:
+            return True
+    return False
+
+class Field:
+    # the parts of an arcpy Field that the validator uses
+    def __init__(self,name,type,isNullable=True,length=0,required=False):
+        self.name = name
+        self.type = type
+        self.isNullable = isNullable
+        self.length = length
+        self.required = required
+
+class ArcpyReader:
+    def __init__(self,workspace):
+        self.workspace = workspace
+    def _path(self,table):
+        return os.path.join(self.workspace,table)
+    def listFields(self,table):
+        import arcpy
+        fields = []
+        for f in arcpy.ListFields(self._path(table)):
+            fields.append(Field(f.name,f.type,f.isNullable,f.length,f.required))
+        return fields
+    def rowCount(self,table):
+        import arcpy
+        return int(str(arcpy.GetCount_management(self._path(table))))
+    def listWorkspace(self):
+        # [tables, fdsfc]: names of tables, and [featureDataset, [featureClasses]]
+        import arcpy
+        oldWorkspace = arcpy.env.workspace
+        arcpy.env.workspace = self.workspace
+        try:
+            tables = list(arcpy.ListTables())
+            fdsfc = []
+            for featureDataSet in arcpy.ListDatasets():
+                fdsfc.append([featureDataSet,list(arcpy.ListFeatureClasses('','',featureDataSet))])
+        finally:
+            arcpy.env.workspace = oldWorkspace
+        return [tables,fdsfc]
+    def rows(self,table,fieldNames):
+        import arcpy
+        cursor = arcpy.da.SearchCursor(self._path(table),fieldNames)
+        try:
+            for row in cursor:
+                yield row
+        finally:
+            del cursor
+    def oidRange(self,table):
+        import arcpy
+        oidName = arcpy.Describe(self._path(table)).OIDFieldName
+        ends = []
+        for order in ('ASC','DESC'):
+            cursor = arcpy.da.SearchCursor(self._path(table),[oidToken],sql_clause=(None,'ORDER BY '+oidName+' '+order))
+            try:
+                for row in cursor:
+                    ends.append(row[0])
+                    break
+            finally:
+                del cursor
+        if not ends:
+            return None
+        return ends
+    def rowsByOid(self,table,fieldNames,oids):
+        import arcpy
+        path = self._path(table)
+        oidName = arcpy.AddFieldDelimiters(path,arcpy.Describe(path).OIDFieldName)
+        for i in range(0,len(oids),oidBatch):
+            where = oidName+' IN ('+','.join([str(oid) for oid in oids[i:i+oidBatch]])+')'
+            cursor = arcpy.da.SearchCursor(path,fieldNames,where)
+            try:
+                for row in cursor:
+                    yield row
+            finally:
+                del cursor
+
+# SQLite declared column type -> ArcGIS field type
+sqliteTypes = {'TEXT':'String','INTEGER':'Integer','INT':'Integer','SMALLINT':'SmallInteger',
+               'MEDIUMINT':'Integer','REAL':'Double','DOUBLE':'Double','FLOAT':'Single',
+               'DATE':'Date','DATETIME':'Date','BLOB':'Blob'}
+sqliteGeometryTypes = ('GEOMETRY','POINT','LINESTRING','POLYGON','MULTIPOINT','MULTILINESTRING',
+                       'MULTIPOLYGON','GEOMETRYCOLLECTION','CURVE','SURFACE','MULTICURVE','MULTISURFACE')
+
+def _sqliteField(name,declType,notNull,pk):
+    declType = declType.upper().strip()
+    length = 0
+    if declType.find('(') > 0:
+        try:
+            length = int(declType[declType.find('(')+1:declType.find(')')].split(',')[0])
+        except ValueError:
+            pass
+        declType = declType[:declType.find('(')].strip()
+    if declType in sqliteTypes:
+        fType = sqliteTypes[declType]
+    elif declType in sqliteGeometryTypes:
+        fType = 'Geometry'
+    elif declType.find('CHAR') >= 0 or declType.find('CLOB') >= 0 or declType == '':
+        fType = 'String'
+    else:
+        fType = declType.title()
+    if name == 'OBJECTID' or (pk and fType == 'Integer' and name.lower() in ('fid','objectid')):
+        fType = 'OID'
+    return Field(name,fType,not (notNull or pk),length)
+
+def sqlName(name):
+    # quoted SQL identifier
+    return '"'+name.replace('"','""')+'"'
+
+class SqliteReader:
+    # connection is a sqlite3 connection or the path to a .sqlite or .gpkg file
+    def __init__(self,connection):
+        if isinstance(connection,basestring):
+            import sqlite3
+            connection = sqlite3.connect(connection)
+        self.connection = connection
+    def listFields(self,table):
+        fields = []
+        for cid, name, declType, notNull, default, pk in self.connection.execute('PRAGMA table_info('+sqlName(table)+')'):
+            fields.append(_sqliteField(name,declType,notNull,pk))
+        return fields
+    def rowCount(self,table):
+        return self.connection.execute('SELECT count(*) FROM '+sqlName(table)).fetchone()[0]
+    def oidName(self,table):
+        # name of the ObjectID column, or rowid
+        for field in self.listFields(table):
+            if field.type == 'OID':
+                return field.name
+        return 'rowid'
+    def shapeName(self,table):
+        # name of the geometry column, or None
+        for field in self.listFields(table):
+            if field.type == 'Geometry':
+                return field.name
+        return None
+    def _select(self,table,fieldNames):
+        columns = []
+        for name in fieldNames:
+            if name == oidToken:
+                columns.append(sqlName(self.oidName(table)))
+            elif name == shapeToken:
+                columns.append(sqlName(self.shapeName(table)))
+            else:
+                columns.append(sqlName(name))
+        return 'SELECT '+','.join(columns)+' FROM '+sqlName(table)
+    def rows(self,table,fieldNames):
+        return self.connection.execute(self._select(table,fieldNames))
+    def oidRange(self,table):
+        oidName = sqlName(self.oidName(table))
+        ends = self.connection.execute('SELECT min('+oidName+'),max('+oidName+') FROM '+sqlName(table)).fetchone()
+        if ends[0] == None:
+            return None
+        return list(ends)
+    def rowsByOid(self,table,fieldNames,oids):
+        oidName = sqlName(self.oidName(table))
+        for i in range(0,len(oids),oidBatch):
+            batch = oids[i:i+oidBatch]
+            query = self._select(table,fieldNames)+' WHERE '+oidName+' IN ('+','.join(['?']*len(batch))+')'
+            for row in self.connection.execute(query,batch):
+                yield row
+
+class MemoryReader:
+    # tables is a dictionary  tableName: [fields, rows]
+    #   fields is a list of Field, rows is a list of tuples in field order.
+    #   ObjectIDs are row numbers, starting at 1
+    def __init__(self,tables):
+        self.tables = tables
+    def listFields(self,table):
+        return self.tables[table][0]
+    def rowCount(self,table):
+        return len(self.tables[table][1])
+    def listWorkspace(self):
+        return [sorted(self.tables.keys()),[]]
+    def rows(self,table,fieldNames):
+        fields, rows = self.tables[table]
+        names = [f.name for f in fields]
+        columns = []
+        for name in fieldNames:
+            if name == oidToken:
+                columns.append(-1)
+            elif name == shapeToken:
+                columns.append([f.type for f in fields].index('Geometry'))
+            else:
+                columns.append(names.index(name))
+        oid = 0
+        for row in rows:
+            oid = oid+1
+            yield tuple([oid if i == -1 else row[i] for i in columns])
+    def oidRange(self,table):
+        if not self.tables[table][1]:
+            return None
+        return [1,len(self.tables[table][1])]
+    def rowsByOid(self,table,fieldNames,oids):
+        wanted = set(oids)
+        for row in self.rows(table,[oidToken]+list(fieldNames)):
+            if row[0] in wanted:
+                yield row[1:]
+
+class TablePlan:
+    # which columns of a table are read, and where each check finds them
+    def __init__(self,table,tableFields,checks=None):
+        self.table = table
+        self.columns = [oidToken]
+        def column(name):
+            if not name in self.columns:
+                self.columns.append(name)
+            return self.columns.index(name)
+        names = [f.name for f in tableFields]
+        idField = table+'_ID'
+        self.idColumn = None
+        if idField in names and isEnabled(checks,'ids','attributes'):
+            self.idColumn = column(idField)
+        self.glossColumns = []
+        if table <> 'Glossary' and isEnabled(checks,'glossary'):
+            for name in names:
+                if name in gFieldDefList:
+                    self.glossColumns.append([column(name),name])
+        self.mapUnitColumn = None
+        self.mapUnitSinks = []
+        if 'MapUnit' in names and isEnabled(checks,'mapUnits'):
+            self.mapUnitColumn = column('MapUnit')
+            self.mapUnitSinks = _mapUnitSinks(table)
+        self.sourceColumns = []
+        if table <> 'DataSources' and isEnabled(checks,'dataSources'):
+            for name in names:
+                if name.find('Source') >= 0 and name.find('_ID') < 0:
+                    self.sourceColumns.append([column(name),name])
+        self.nullCheckColumns = []
+        if isEnabled(checks,'nulls'):
+            for f in tableFields:
+                if f.type == 'String' and not f.isNullable:
+                    self.nullCheckColumns.append([column(f.name),f.name,f.length])
+
+def _mapUnitSinks(table):
+    # methods of ReferenceIndex that receive this table's MapUnit values
+    sinks = []
+    if table <> 'DescriptionOfMapUnits' and table <> 'StandardLithology':
+        sinks.append(lambda index, mu: index.addMapUnitRef(mu,table))
+    if table == 'MapUnitPolys':
+        sinks.append(lambda index, mu: index.gmapMapUnits.add(mu))
+    if table[0:2] == 'CS' and table[3:] == 'MapUnitPolys':
+        sinks.append(lambda index, mu: index.csMapUnits.add(mu))
+    if table == 'CMUMapUnitPolys' or table == 'CMUMapUnitPoints':
+        sinks.append(lambda index, mu: index.cmuMapUnits.add(mu))
+    if table == 'DescriptionOfMapUnits':
+        def addDmu(index,mu):
+            if mu <> 'None':
+                index.addDmuMapUnit(mu)
+        sinks.append(addDmu)
+    return sinks
+
+def _noMsg(msg):
+    pass
+
+def scanTable(reader,table,refIndex,badNulls,msg=_noMsg,checks=None):
+    # inventory _IDs, Glossary, MapUnit and DataSources references of table into
+    #   refIndex and count pseudonulls, trailing and leading spaces in
+    #   badNulls, an ErrorAggregator.
+    #   Returns number of rows scanned
+    plan = TablePlan(table,reader.listFields(table),checks)
+    nRows = 0
+    if plan.columns == [oidToken]:
+        # no enabled check needs a value of this table
+        return nRows
+    batch = []     # rows whose non-nullable String fields are yet to be checked
+    for row in reader.rows(table,plan.columns):
+        nRows = nRows+1
+        if plan.idColumn <> None:
+            refIndex.addId(row[plan.idColumn],table)
+        for i, field in plan.glossColumns:
+            value = row[i]
+            if value <> '' and value <> None:
+                try:
+                    refIndex.addGlossaryRef(str(value),field,table)
+                except:
+                    msg('Table '+table+', OBJECTID = '+str(row[0])+', field '+field+' caused an error')
+                    msg('Field value is <'+repr(value)+'>')
+        if plan.mapUnitColumn <> None:
+            mu = str(row[plan.mapUnitColumn])
+            if mu <> '':
+                for sink in plan.mapUnitSinks:
+                    sink(refIndex,mu)
+        for i, field in plan.sourceColumns:
+            refIndex.addDataSourcesRef(row[i],field,table)
+        if plan.nullCheckColumns:
+            batch.append(row)
+            if len(batch) >= ColumnScanner.batchRows:
+                ColumnScanner.checkSpaces(table,plan.nullCheckColumns,batch,badNulls)
+                batch = []
+    ColumnScanner.checkSpaces(table,plan.nullCheckColumns,batch,badNulls)
+    return nRows
+
+def checkFieldDefinitions(dBTable,fields,fieldDefs,standardFields):
+    # compare fields of dBTable with fieldDefs (an entry of tableDict)
+    #   returns [schemaErrors, schemaExtensions]
+    schemaErrors = []
+    schemaExtensions = []
+    # build dictionary of required fields
+    requiredFields = {}
+    for fieldDef in fieldDefs:
+        requiredFields[fieldDef[0]] = fieldDef
+    # build dictionary of existing fields
+    existingFields = {}
+    for field in fields:
+        existingFields[field.name] = field
+    # now check to see what is excess / missing
+    for field in requiredFields.keys():
+        if field not in existingFields:
+            schemaErrors.append(dBTable+', field '+field+' is missing')
+    for field in existingFields.keys():
+        if not (field in standardFields) and not (field in requiredFields):
+            schemaExtensions.append(dBTable+', field '+field+' is not required')
+        # check field definition
+        if field in requiredFields.keys():
+            # field type
+            if existingFields[field].type <> requiredFields[field][1]:
+                schemaErrors.append(dBTable+', field '+field+', type should be '+requiredFields[field][1])
+            # field nullable?
+            if existingFields[field].isNullable:
+                nullStatus = 'NullsOK'
+            else:
+                nullStatus = 'NoNulls'
+            if nullStatus <> requiredFields[field][2]:
+                schemaErrors.append(dBTable+', field '+field+' should be '+requiredFields[field][2])
+    return [schemaErrors,schemaExtensions]
+
+class TableInventory:
+    # partial results of checking and inventorying one or more tables.
+    #   Partial inventories of different tables are combined with merge
+    def __init__(self):
+        self.tables = []
+        self.refIndex = RefIndex.ReferenceIndex()
+        self.badNulls = ErrorAggregator.ErrorAggregator('')
+        self.schemaErrors = []
+        self.schemaExtensions = []
+        self.messages = []
+        self.nRows = 0
+        self.seconds = 0.0
+
+    def merge(self,other):
+        self.tables.extend(other.tables)
+        self.refIndex.merge(other.refIndex)
+        self.badNulls.merge(other.badNulls)
+        self.schemaErrors.extend(other.schemaErrors)
+        self.schemaExtensions.extend(other.schemaExtensions)
+        self.messages.extend(other.messages)
+        self.nRows = self.nRows+other.nRows
+        self.seconds = self.seconds+other.seconds
+
+def inventoryTable(reader,table,fieldDefs,standardFields,checks=None):
+    # check field definitions of table (if fieldDefs is not None) and
+    #   inventory its values for checks. Returns a TableInventory
+    startTime = time.time()
+    inventory = TableInventory()
+    inventory.tables.append(table)
+    if fieldDefs <> None:
+        schemaErrors, schemaExtensions = checkFieldDefinitions(table,reader.listFields(table),fieldDefs,standardFields)
+        inventory.schemaErrors.extend(schemaErrors)
+        inventory.schemaExtensions.extend(schemaExtensions)
+    try:
+        inventory.nRows = scanTable(reader,table,inventory.refIndex,inventory.badNulls,inventory.messages.append,checks)
+    except:
+        inventory.messages.append('failed to read rows of '+table)
+    inventory.seconds = time.time() - startTime
+    return inventory
+
+def _inventoryTable(args):
+    # worker for inventoryTables; may run in a separate process
+    reader, table, fieldDefs, standardFields, checks = args
+    return inventoryTable(reader,table,fieldDefs,standardFields,checks)
+
+def inventoryTables(reader,jobs,standardFields,processes=1,checks=None):
+    # jobs is a list of [table, fieldDefs]. Inventories each table,
+    #   using a pool of processes if processes > 1 (reader is then pickled
+    #   to each process, e.g. an ArcpyReader or a Catalog of one).
+    #   Returns list of TableInventory, in the order of jobs
+    args = []
+    for table, fieldDefs in jobs:
+        args.append([reader,table,fieldDefs,standardFields,checks])
+    processes = min(processes,len(args))
+    if processes <= 1:
+        return map(_inventoryTable,args)
+    import multiprocessing, sys
+    # when run as a script tool, sys.executable is ArcMap or ArcCatalog
+    pythonExe = os.path.join(sys.exec_prefix,'python.exe')
+    if os.path.exists(pythonExe):
+        multiprocessing.set_executable(pythonExe)
+    pool = multiprocessing.Pool(processes)
+    try:
+        # chunksize 1: tables differ greatly in size
+        return pool.map(_inventoryTable,args,1)
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,283 @@
+# NCGMP09v11_TiledPolygonizer.py
+#   NCGMP09v11_Polygonizer for statewide maps: the map is cut into tiles
+#   that are noded and polygonized in separate processes, and the result is
+#   the same list of faces that Polygonizer gives for the whole map.
+#
+#   The extent of the lines is cut into a grid of about the requested
+#   number of tiles (the outer tiles reach to infinity), and each tile is
+#   grown by overlap times its width or height, whichever is less.
+#   1. Noding. Each tile gets the paths whose boxes reach into it and nodes
+#      only the pairs of chains whose overlap has its lower left corner in
+#      the tile (Polygonizer.core). Both chains of such a pair are in the
+#      tile, and each pair belongs to just one tile, so the cuts found by
+#      all tiles are those of the whole map, and the edges are built from
+#      them once, as Polygonizer does.
+#   2. Faces. Each grown tile gets the edges that reach into it and traces
+#      faces. A face whose box is within the grown tile is a face of the
+#      whole map: every edge that could cut it, or lie in it, is in the
+#      tile. It is kept by the first tile it is within.
+#   3. Stitching. Faces across seams, too large to be within any grown
+#      tile, are traced from the edges of the whole map, starting only
+#      from half-edges on no kept face, so the shared edges of neighbouring
+#      tiles join them. Outer boundaries of the map are found the same way,
+#      and holes go to the smallest of these faces around them.
+#   The number of processes defaults to the number of processors; with
+#   one, tiles are done in turn in this process.
+#
+#   Does not import arcpy.
+
+import os, os.path, sys, math, time, gc
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_SpatialIndex as SpatialIndex
+import NCGMP09v11_Polygonizer as Polygonizer
+
+versionString = 'NCGMP09v11_TiledPolygonizer.py, version of 17 October 2026'
+
+defaultOverlap = 0.1    # of the lesser side of a tile
+
+def tileGrid(box,nTiles):
+    # [xCuts, yCuts, cell size] of a grid of about nTiles cells of
+    #   near-square shape over box; the first and last cuts are infinite,
+    #   and cell size is the lesser side of a cell, or 0
+    width = max(box[2]-box[0],0.0)
+    height = max(box[3]-box[1],0.0)
+    if width == 0 and height == 0:
+        nx, ny = 1, 1
+    elif height == 0 or width/height >= nTiles:
+        nx, ny = nTiles, 1
+    elif width == 0 or height/width >= nTiles:
+        nx, ny = 1, nTiles
+    else:
+        nx = max(1,int(round(math.sqrt(nTiles*width/height))))
+        ny = max(1,int(round(nTiles/float(nx))))
+    inf = float('inf')
+    xCuts = [-inf]+[box[0]+width*i/nx for i in range(1,nx)]+[inf]
+    yCuts = [-inf]+[box[1]+height*j/ny for j in range(1,ny)]+[inf]
+    sides = [side for side in (width/nx,height/ny) if side > 0]
+    return [xCuts,yCuts,min(sides+[0.0])]
+
+def _within(box,outer):
+    return outer[0] <= box[0] and outer[1] <= box[1] and box[2] <= outer[2] and box[3] <= outer[3]
+
+def _nodeTile(args):
+    # worker for noding; may run in a separate process. Returns [breaks,
+    #   splits, chain pairs] with the path numbers of the whole map
+    core, eps, paths, numbers = args
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        polygonizer = Polygonizer.Polygonizer(eps)
+        polygonizer.eps = eps
+        polygonizer.paths = paths
+        polygonizer.core = core
+        polygonizer.node()
+    finally:
+        if collecting:
+            gc.enable()
+    breaks = dict([[numbers[k],sorted(ns)] for k, ns in polygonizer.breaks.iteritems()])
+    splits = dict([[(numbers[k],i),points] for (k, i), points in polygonizer.splits.iteritems()])
+    return [breaks,splits,polygonizer.counts['chainPairs']]
+
+def _traceTile(args):
+    # worker for faces; may run in a separate process. Returns [rings,
+    #   area, half-edges] of the faces tile n keeps, with the edge numbers
+    #   of the whole map
+    n, grown, eps, edges, numbers = args
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        polygonizer = Polygonizer.Polygonizer(eps)
+        polygonizer.eps = eps
+        polygonizer.edges = edges
+        polygonizer.traceFaces()
+    finally:
+        if collecting:
+            gc.enable()
+    kept = []
+    for face in polygonizer.faces:
+        box = face.box()
+        if not _within(box,grown[n]):
+            continue
+        first = n
+        for m in range(n):
+            if _within(box,grown[m]):
+                first = m
+                break
+        if first == n:
+            kept.append([face.rings,face.area,[2*numbers[h >> 1]+(h & 1) for h in face.halves]])
+    return kept
+
+class TiledPolygonizer(Polygonizer.Polygonizer):
+    def __init__(self,tolerance=None,tiles=16,processes=None,overlap=defaultOverlap):
+        Polygonizer.Polygonizer.__init__(self,tolerance)
+        self.tiles = max(1,tiles)
+        self.processes = processes
+        self.overlap = overlap
+
+    def _map(self,function,args):
+        # function applied to each of args, in a pool of processes if more
+        #   than one is wanted
+        processes = self.processes
+        if processes == None:
+            import multiprocessing
+            processes = multiprocessing.cpu_count()
+        processes = min(processes,len(args))
+        if processes <= 1:
+            return map(function,args)
+        import multiprocessing
+        # when run as a script tool, sys.executable is ArcMap or ArcCatalog
+        pythonExe = os.path.join(sys.exec_prefix,'python.exe')
+        if os.path.exists(pythonExe):
+            multiprocessing.set_executable(pythonExe)
+        pool = multiprocessing.Pool(processes)
+        try:
+            return pool.map(function,args,1)
+        finally:
+            pool.close()
+            pool.join()
+
+    def run(self):
+        self.eps = self._tolerance()
+        eps = self.eps
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            startTime = time.time()
+            pathBoxes = [Geometry.partsBox([path]) for path in self.paths]
+            if pathBoxes:
+                xCuts, yCuts, size = tileGrid(SpatialIndex.unionBox(pathBoxes),self.tiles)
+            else:
+                xCuts, yCuts, size = tileGrid((0.0,0.0,0.0,0.0),1)
+            self.cores = []
+            for j in range(len(yCuts)-1):
+                for i in range(len(xCuts)-1):
+                    self.cores.append((xCuts[i],yCuts[j],xCuts[i+1],yCuts[j+1]))
+            margin = self.overlap*size
+            self.grown = [(c[0]-margin,c[1]-margin,c[2]+margin,c[3]+margin) for c in self.cores]
+            self.counts['tiles'] = len(self.cores)
+            self._nodeTiles(pathBoxes)
+            self.seconds['noding'] = time.time()-startTime
+            startTime = time.time()
+            self.buildEdges()
+            self.seconds['edges'] = time.time()-startTime
+            startTime = time.time()
+            self._traceTiles()
+            self.seconds['faces'] = time.time()-startTime
+        finally:
+            if collecting:
+                gc.enable()
+        self.counts['faces'] = len(self.faces)
+        self.counts['holes'] = sum([len(face.rings)-1 for face in self.faces])
+        return self.faces
+
+    def _nodeTiles(self,pathBoxes):
+        eps = self.eps
+        tree = SpatialIndex.STRtree([(b[0]-eps,b[1]-eps,b[2]+eps,b[3]+eps) for b in pathBoxes])
+        args = []
+        for core in self.cores:
+            numbers = sorted(tree.query(core))
+            args.append([core,eps,[self.paths[k] for k in numbers],numbers])
+        self.breaks = {}
+        self.splits = {}
+        nPairs = 0
+        for breaks, splits, pairs in self._map(_nodeTile,args):
+            for k, ns in breaks.iteritems():
+                self.breaks.setdefault(k,set()).update(ns)
+            for key, points in splits.iteritems():
+                self.splits.setdefault(key,[]).extend(points)
+            nPairs = nPairs+pairs
+        self.counts['paths'] = len(self.paths)
+        self.counts['vertices'] = sum([len(path) for path in self.paths])
+        self.counts['chainPairs'] = nPairs
+
+    def _traceTiles(self):
+        edges = self.edges
+        tree = SpatialIndex.STRtree([Geometry.partsBox([edge]) for edge in edges])
+        args = []
+        for n in range(len(self.grown)):
+            numbers = sorted(tree.query(self.grown[n]))
+            args.append([n,self.grown,self.eps,[edges[e] for e in numbers],numbers])
+        kept = []
+        for faces in self._map(_traceTile,args):
+            kept.extend([Polygonizer.Face(rings,area,halves) for rings, area, halves in faces])
+        startTime = time.time()
+        self._stitch(kept)
+        self.seconds['stitching'] = time.time()-startTime
+        self.faces = kept+self.faces
+        self.faces.sort(key=lambda face: (face.rings[0][0],face.rings[0][1],face.rings[0][-2]))
+        self.counts['seamFaces'] = len(self.faces)-len(kept)
+
+    def _stitch(self,kept):
+        # faces of the half-edges on no face in kept, as self.faces, and the
+        #   outer boundaries of the map, as self.outerRings
+        edges = self.edges
+        onKept = bytearray(2*len(edges))
+        for face in kept:
+            for h in face.halves:
+                onKept[h] = 1
+        alive = [True]*len(edges)
+        outgoing = {}   # node -> half-edges leaving it
+        for e in xrange(len(edges)):
+            outgoing.setdefault(edges[e][0],[]).append(2*e)
+            outgoing.setdefault(edges[e][-1],[]).append(2*e+1)
+        nDangles = self._removeDangles(outgoing,alive,outgoing.keys())
+        nBridges = 0
+        while True:
+            around = {}   # node -> living half-edges leaving it, by angle
+            cycles = []
+            bridges = []
+            traced = bytearray(2*len(edges))
+            for start in xrange(2*len(edges)):
+                if onKept[start] or traced[start] or not alive[start >> 1]:
+                    continue
+                cycle = []
+                h = start
+                while not traced[h]:
+                    cycle.append(h)
+                    traced[h] = 1
+                    # the next half-edge clockwise around the node h arrives at
+                    node = self._end(h)
+                    halves = around.get(node)
+                    if halves == None:
+                        halves = self._sortedHalves(outgoing,alive,node)
+                        around[node] = halves
+                    h = halves[halves.index(h ^ 1)-1]
+                if len(set([h >> 1 for h in cycle])) < len(cycle):
+                    halves = set(cycle)
+                    bridges.extend([h >> 1 for h in cycle if h & 1 == 0 and h ^ 1 in halves])
+                cycles.append(cycle)
+            if not bridges:
+                break
+            ends = []
+            for e in bridges:
+                alive[e] = False
+                ends.extend([edges[e][0],edges[e][-1]])
+            nBridges = nBridges+len(bridges)
+            nDangles = nDangles+self._removeDangles(outgoing,alive,ends)
+        self.counts['dangles'] = nDangles
+        self.counts['seamBridges'] = nBridges
+        self._makeFaces(cycles)
+
+    def _sortedHalves(self,outgoing,alive,node):
+        # living half-edges leaving node, in the order of traceFaces
+        edges = self.edges
+        halves = [h for h in outgoing.get(node,()) if alive[h >> 1]]
+        if len(halves) > 2:
+            keyed = []
+            for h in halves:
+                edge = edges[h >> 1]
+                if h & 1:
+                    keyed.append((Polygonizer._angle(edge[-1],edge[-2]),h))
+                else:
+                    keyed.append((Polygonizer._angle(edge[0],edge[1]),h))
+            keyed.sort()
+            halves = [h for angle, h in keyed]
+        outgoing[node] = halves
+        return halves
+
+def polygonize(reader,lineClass='ContactsAndFaults',tolerance=None,tiles=16,processes=None):
+    # TiledPolygonizer, run, of the non-concealed lines of lineClass
+    polygonizer = TiledPolygonizer(tolerance,tiles,processes)
+    polygonizer.addLines(Polygonizer.contactRows(reader,lineClass))
+    polygonizer.run()
+    return polygonizer
@@ -0,0 +1,390 @@
+# NCGMP09v11_Topology.py
+#   Geometry and topology checks of a geologic map for
+#   NCGMP09v1.1_ValidateDatabase: the rules that CreateDatabase registers
+#   in GeologicMapTopology, which the validator did not check.
+#
+#   Shapes of MapUnitPolys and ContactsAndFaults are read once, as WKB
+#   (NCGMP09v11_Geometry), and packed into STR-trees (NCGMP09v11_SpatialIndex)
+#   of polygons and of line segments. Reported, in ErrorAggregators keyed
+#   by validator report section:
+#     selfIntersections    lines and polygons whose boundary crosses or
+#                          touches itself (Must Not Self-Intersect)
+#     polygonOverlaps      pairs of polygons whose interiors overlap (Must
+#                          Not Overlap). Only pairs whose boxes intersect are
+#                          compared
+#     polygonGaps          holes in the union of the polygons (Must Not Have
+#                          Gaps). Polygon edges are oriented (exteriors
+#                          counterclockwise) and an edge shared by two
+#                          polygons, which they traverse in opposite
+#                          directions, cancels; edges that overlap in part
+#                          are first split at each other's ends. The edges
+#                          left over bound the union: rings of them that run
+#                          clockwise are gaps
+#     lineDangles          ends of lines that touch no other line (Must Not
+#                          Have Dangles)
+#     uncoveredBoundaries  polygons with an edge not covered by lines
+#                          (Boundary Must Be Covered By). An edge that is
+#                          also a line segment is covered at once; others
+#                          are compared with the collinear segments near them
+#   Locations are given as x, y in the units of the feature class.
+#   Coordinates are compared exactly to find shared vertices and edges, and
+#   within tolerance (by default a billionth of the size of the map) when
+#   testing whether a point lies on a segment.
+#
+#   Does not import arcpy.
+
+import math
+import NCGMP09v11_Geometry as Geometry
+import NCGMP09v11_SpatialIndex as SpatialIndex
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+
+versionString = 'NCGMP09v11_Topology.py, version of 17 October 2026'
+
+sectionNames = ('selfIntersections','polygonOverlaps','polygonGaps','lineDangles','uncoveredBoundaries')
+
+# feature classes checked: [polygons, lines] in each feature dataset
+topologyClasses = {'GeologicMap':['MapUnitPolys','ContactsAndFaults']}
+
+def _xy(p):
+    return '%.3f, %.3f' % (p[0],p[1])
+
+def _edgeKey(p,q):
+    if p < q:
+        return (p,q)
+    return (q,p)
+
+class MapTopology:
+    def __init__(self,polygonClass='MapUnitPolys',lineClass='ContactsAndFaults',tolerance=None):
+        self.polygonClass = polygonClass
+        self.lineClass = lineClass
+        self.tolerance = tolerance
+        self.polygons = []    # [OBJECTID, oriented rings of one polygon part, box]
+        self.lines = []       # [OBJECTID, [path, ...], box]
+        self.nShapes = 0
+        self.sections = {}
+        for name in sectionNames:
+            self.sections[name] = ErrorAggregator.ErrorAggregator('')
+
+    def error(self,name,aline):
+        self.sections[name].add(aline)
+
+    def addPolygons(self,rows):
+        # rows of (OBJECTID, WKB)
+        for oid, blob in rows:
+            self.nShapes = self.nShapes+1
+            kind, parts = Geometry.decodeShape(blob)
+            for rings in parts:
+                rings = [r for r in Geometry.orientPolygon(rings) if len(r) > 1]
+                if rings:
+                    self.polygons.append([oid,rings,Geometry.partsBox(rings)])
+
+    def addLines(self,rows):
+        # rows of (OBJECTID, WKB)
+        for oid, blob in rows:
+            self.nShapes = self.nShapes+1
+            kind, paths = Geometry.decodeShape(blob)
+            paths = [p for p in paths if len(p) > 1]
+            if paths:
+                self.lines.append([oid,paths,Geometry.partsBox(paths)])
+
+    def _tolerance(self):
+        if self.tolerance <> None:
+            return self.tolerance
+        boxes = [p[2] for p in self.polygons]+[l[2] for l in self.lines]
+        if not boxes:
+            return 0.0
+        box = SpatialIndex.unionBox(boxes)
+        size = max(box[2]-box[0],box[3]-box[1],abs(box[0]),abs(box[1]),abs(box[2]),abs(box[3]))
+        return size*1e-9
+
+    def check(self):
+        # runs all checks; returns sections
+        self.eps = self._tolerance()
+        self.checkSelfIntersections()
+        lineSegments = self._lineSegments()
+        if self.lines:
+            self.checkDangles(lineSegments)
+        if self.polygons:
+            self.checkOverlaps()
+            self.checkGaps()
+            if self.lines:
+                self.checkCoverage(lineSegments)
+        return self.sections
+
+    #------------ self-intersections -------------
+
+    def checkSelfIntersections(self):
+        reported = set()
+        for oid, paths, box in self.lines:
+            p = selfIntersection(paths,self.eps,False)
+            if p <> None and not oid in reported:
+                reported.add(oid)
+                self.error('selfIntersections','    '+self.lineClass+', OBJECTID '+str(oid)+', at '+_xy(p))
+        for oid, rings, box in self.polygons:
+            p = selfIntersection(rings,self.eps,True)
+            if p <> None and not oid in reported:
+                reported.add(oid)
+                self.error('selfIntersections','    '+self.polygonClass+', OBJECTID '+str(oid)+', at '+_xy(p))
+
+    #------------ lines -------------
+
+    def _lineSegments(self):
+        # [segments, STRtree]; a segment is (p, q, line number)
+        segs = []
+        for n in range(len(self.lines)):
+            for path in self.lines[n][1]:
+                for p, q in Geometry.segments(path):
+                    segs.append((p,q,n))
+        tree = SpatialIndex.STRtree([Geometry.segmentBox(p,q) for p, q, n in segs])
+        return [segs,tree]
+
+    def checkDangles(self,lineSegments):
+        segs, tree = lineSegments
+        eps = self.eps
+        ends = {}    # end point -> [number of line ends there, line number]
+        for n in range(len(self.lines)):
+            for path in self.lines[n][1]:
+                if path[0] == path[-1]:
+                    continue
+                for p in (path[0],path[-1]):
+                    if p in ends:
+                        ends[p][0] = ends[p][0]+1
+                    else:
+                        ends[p] = [1,n]
+        for p, (count, n) in ends.iteritems():
+            if count > 1:
+                continue
+            connected = False
+            for i in tree.query((p[0]-eps,p[1]-eps,p[0]+eps,p[1]+eps)):
+                a, b, m = segs[i]
+                if (m <> n or not p in (a,b)) and Geometry.onSegment(p,a,b,eps):
+                    connected = True
+                    break
+            if not connected:
+                self.error('lineDangles','    '+self.lineClass+', OBJECTID '+str(self.lines[n][0])+', dangle at '+_xy(p))
+
+    #------------ polygons -------------
+
+    def checkOverlaps(self):
+        tree = SpatialIndex.STRtree([p[2] for p in self.polygons])
+        for i in range(len(self.polygons)):
+            for j in tree.query(self.polygons[i][2]):
+                if j <= i or self.polygons[i][0] == self.polygons[j][0]:
+                    continue
+                p = polygonsOverlap(self.polygons[i][1],self.polygons[j][1],self.polygons[i][2],
+                                    self.polygons[j][2],self.eps)
+                if p <> None:
+                    oids = sorted([self.polygons[i][0],self.polygons[j][0]])
+                    self.error('polygonOverlaps','    '+self.polygonClass+', OBJECTIDs '+str(oids[0])+' and '+
+                               str(oids[1])+' overlap near '+_xy(p))
+
+    def checkGaps(self):
+        for ring in unionBoundary([rings for oid, rings, box in self.polygons],self.eps):
+            area = Geometry.signedArea(ring)
+            if area < 0:
+                box = Geometry.partsBox([ring])
+                self.error('polygonGaps','    '+self.polygonClass+', gap of area %g near ' % -area+
+                           _xy(((box[0]+box[2])/2,(box[1]+box[3])/2)))
+
+    def checkCoverage(self,lineSegments):
+        segs, tree = lineSegments
+        lineEdges = set([_edgeKey(p,q) for p, q, n in segs])
+        for oid, rings, box in self.polygons:
+            for ring in rings:
+                uncovered = None
+                for p, q in Geometry.segments(ring):
+                    if _edgeKey(p,q) in lineEdges:
+                        continue
+                    if not self._covered(p,q,segs,tree):
+                        uncovered = ((p[0]+q[0])/2,(p[1]+q[1])/2)
+                        break
+                if uncovered <> None:
+                    self.error('uncoveredBoundaries','    '+self.polygonClass+', OBJECTID '+str(oid)+
+                               ', boundary not covered near '+_xy(uncovered))
+                    break
+
+    def _covered(self,p,q,segs,tree):
+        # is edge pq covered by collinear line segments?
+        eps = self.eps
+        dx = q[0]-p[0]
+        dy = q[1]-p[1]
+        length2 = dx*dx+dy*dy
+        box = Geometry.segmentBox(p,q)
+        intervals = []
+        for i in tree.query((box[0]-eps,box[1]-eps,box[2]+eps,box[3]+eps)):
+            a, b, n = segs[i]
+            if not (Geometry.onSegment(a,p,q,eps) or Geometry.onSegment(p,a,b,eps)):
+                continue
+            # both ends of ab on the line through pq?
+            if abs(Geometry.cross(p,q,a)) > eps*math.sqrt(length2) or abs(Geometry.cross(p,q,b)) > eps*math.sqrt(length2):
+                continue
+            ta = ((a[0]-p[0])*dx+(a[1]-p[1])*dy)/length2
+            tb = ((b[0]-p[0])*dx+(b[1]-p[1])*dy)/length2
+            intervals.append((min(ta,tb),max(ta,tb)))
+        intervals.sort()
+        reached = 0.0
+        slack = eps/math.sqrt(length2)
+        for t0, t1 in intervals:
+            if t0 > reached+slack:
+                return False
+            reached = max(reached,t1)
+        return reached >= 1.0-slack
+
+def selfIntersection(paths,eps,rings):
+    # a point where paths (the rings of a polygon if rings is true) cross
+    #   or touch themselves, else None. Consecutive segments of a path meet
+    #   at their shared vertex; so do the first and last of a closed path.
+    #   Different rings of a polygon may touch at a point
+    segs = []
+    for part in range(len(paths)):
+        pathSegs = Geometry.segments(paths[part])
+        closed = paths[part][0] == paths[part][-1]
+        for i in range(len(pathSegs)):
+            segs.append((pathSegs[i][0],pathSegs[i][1],part,i,len(pathSegs),closed))
+    boxes = [Geometry.segmentBox(s[0],s[1]) for s in segs]
+    for i, j in Geometry.sweepPairs(boxes):
+        a, b, partA, iA, nA, closedA = segs[i]
+        c, d, partB, iB, nB, closedB = segs[j]
+        meeting = Geometry.intersection(a,b,c,d,eps)
+        if meeting == None:
+            continue
+        kind, p = meeting
+        if partA == partB:
+            adjacent = abs(iA-iB) == 1 or (closedA and nA > 2 and abs(iA-iB) == nA-1)
+            if adjacent and kind == 'touch':
+                continue
+        elif kind == 'touch':
+            if rings:
+                continue
+            ends = (paths[partA][0],paths[partA][-1])
+            if p in ends and p in (paths[partB][0],paths[partB][-1]):
+                continue
+        return p
+    return None
+
+def _boxIntersection(a,b,eps):
+    return (max(a[0],b[0])-eps,max(a[1],b[1])-eps,min(a[2],b[2])+eps,min(a[3],b[3])+eps)
+
+def polygonsOverlap(ringsA,ringsB,boxA,boxB,eps):
+    # a point in the interiors of both polygons, or None
+    region = _boxIntersection(boxA,boxB,eps)
+    if region[0] > region[2] or region[1] > region[3]:
+        return None
+    segsA = [s for ring in ringsA for s in Geometry.segments(ring)
+             if SpatialIndex.boxesIntersect(Geometry.segmentBox(s[0],s[1]),region)]
+    segsB = [s for ring in ringsB for s in Geometry.segments(ring)
+             if SpatialIndex.boxesIntersect(Geometry.segmentBox(s[0],s[1]),region)]
+    if not segsA or not segsB:
+        return None
+    # boundaries that cross
+    boxes = [Geometry.segmentBox(p,q) for p, q in segsA+segsB]
+    nA = len(segsA)
+    for i, j in Geometry.sweepPairs(boxes):
+        if (i < nA) == (j < nA):
+            continue
+        meeting = Geometry.intersection(segsA[i][0],segsA[i][1],segsB[j-nA][0],segsB[j-nA][1],eps)
+        if meeting <> None and meeting[0] == 'cross':
+            return meeting[1]
+    # a vertex or an edge midpoint of one inside the other. Shared edges are on both boundaries
+    sharedEdges = set([_edgeKey(p,q) for p, q in segsA]) & set([_edgeKey(p,q) for p, q in segsB])
+    allOnBoundary = True
+    for segs, rings, nSegs in ((segsA,ringsB,sum([len(r)-1 for r in ringsA])),
+                               (segsB,ringsA,sum([len(r)-1 for r in ringsB]))):
+        for p, q in segs:
+            if _edgeKey(p,q) in sharedEdges:
+                continue
+            allOnBoundary = False
+            for point in (p,((p[0]+q[0])/2,(p[1]+q[1])/2)):
+                if Geometry.pointInPolygon(point,rings,eps) == 1:
+                    return point
+        if len(segs) < nSegs:
+            allOnBoundary = False
+    if allOnBoundary:
+        # same boundary: duplicate polygons
+        return ringsA[0][0]
+    return None
+
+def unionBoundary(polygons,eps):
+    # rings bounding the union of polygons (lists of oriented rings):
+    #   counterclockwise around polygons, clockwise around gaps
+    counts = {}
+    for rings in polygons:
+        for ring in rings:
+            for p, q in Geometry.segments(ring):
+                _addEdge(counts,p,q)
+    edges = _splitEdges(counts,eps)
+    counts = {}
+    for p, q in edges:
+        _addEdge(counts,p,q)
+    return _traceRings(counts)
+
+def _addEdge(counts,p,q):
+    # adds directed edge pq; an edge qp cancels it
+    n = counts.get((q,p))
+    if n:
+        if n == 1:
+            del counts[(q,p)]
+        else:
+            counts[(q,p)] = n-1
+    else:
+        counts[(p,q)] = counts.get((p,q),0)+1
+
+def _splitEdges(counts,eps):
+    # edges left over, split at the ends of other left-over edges that lie
+    #   within them, so that edges that overlap in part become equal pieces
+    edges = []
+    for edge, n in counts.iteritems():
+        edges.extend([edge]*n)
+    tree = SpatialIndex.STRtree([Geometry.segmentBox(p,q) for p, q in edges])
+    pieces = []
+    for p, q in edges:
+        box = Geometry.segmentBox(p,q)
+        cuts = set()
+        for j in tree.query((box[0]-eps,box[1]-eps,box[2]+eps,box[3]+eps)):
+            for r in edges[j]:
+                if r <> p and r <> q and Geometry.onSegment(r,p,q,eps):
+                    cuts.add(r)
+        if not cuts:
+            pieces.append((p,q))
+            continue
+        dx = q[0]-p[0]
+        dy = q[1]-p[1]
+        points = [p]+sorted(cuts,key=lambda r: (r[0]-p[0])*dx+(r[1]-p[1])*dy)+[q]
+        for i in range(len(points)-1):
+            pieces.append((points[i],points[i+1]))
+    return pieces
+
+def _traceRings(counts):
+    # joins directed edges into rings, turning as far right as possible at
+    #   each node, so that rings that touch at a node are kept apart
+    outgoing = {}
+    for (p, q), n in counts.iteritems():
+        outgoing.setdefault(p,[]).extend([q]*n)
+    rings = []
+    for start in outgoing.keys():
+        while outgoing.get(start):
+            ring = [start,outgoing[start].pop()]
+            while ring[-1] <> start and outgoing.get(ring[-1]):
+                p, q = ring[-2], ring[-1]
+                choices = outgoing[q]
+                best = 0
+                bestAngle = None
+                for k in range(len(choices)):
+                    r = choices[k]
+                    angle = math.atan2(Geometry.cross(p,q,r),(q[0]-p[0])*(r[0]-q[0])+(q[1]-p[1])*(r[1]-q[1]))
+                    if bestAngle == None or angle < bestAngle:
+                        best, bestAngle = k, angle
+                ring.append(choices.pop(best))
+            if ring[-1] == start:
+                rings.append(ring)
+    return rings
+
+def checkMap(reader,polygonClass,lineClass,tolerance=None):
+    # sections of errors of one map. polygonClass or lineClass may be None
+    import NCGMP09v11_TableScanner as TableScanner
+    topology = MapTopology(polygonClass,lineClass,tolerance)
+    if polygonClass <> None:
+        topology.addPolygons(reader.rows(polygonClass,[TableScanner.oidToken,TableScanner.shapeToken]))
+    if lineClass <> None:
+        topology.addLines(reader.rows(lineClass,[TableScanner.oidToken,TableScanner.shapeToken]))
+    return topology.check()
@@ -0,0 +1,203 @@
+# NCGMP09v11_ValidationCache.py
+#   Persistent cache of per-table results for NCGMP09v1.1_ValidateDatabase.
+#
+#   For each table and feature class the cache stores a fingerprint
+#     [row count, schema hash, definition hash, file time]
+#   together with the TableInventory (schema errors, _IDs, references,
+#   pseudonulls) that was computed for it. On the next run, tables whose
+#   fingerprint is unchanged are not re-inventoried; their cached partial
+#   inventories are merged with those of the rescanned tables, and the
+#   cross-table checks of checkContent are recomputed from the merged result.
+#   The fingerprint is made from metadata only (the row count as the
+#   catalog reports it, the fields, and file times), so an unchanged table
+#   is not read at all.
+#
+#   File time is the newest modification time of the files that hold the
+#   table: aXXXXXXXX.* in a file geodatabase (located through the system
+#   catalog, a00000001.gdbtable), or the .mdb, .sqlite or .gpkg file itself.
+#   If the file time cannot be found (e.g., an SDE database) the table is
+#   always rescanned, as in-place edits would otherwise go unnoticed.
+#
+#   The cache is written next to the conformance report, as
+#   <geodatabaseName>-conformance.cache
+
+import os, os.path, glob, struct
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+
+versionString = 'NCGMP09v11_ValidationCache.py, version of 17 October 2026'
+
+def cacheFileName(outFile):
+    # outFile is the conformance report, <geodatabaseName>-conformance.txt
+    return os.path.splitext(outFile)[0]+'.cache'
+
+def _hash(anObject):
+    return md5(repr(anObject)).hexdigest()
+
+def schemaHash(fields):
+    sig = []
+    for f in fields:
+        sig.append([f.name,f.type,bool(f.isNullable),f.length])
+    return _hash(sig)
+
+def _readVarUInt(data,pos):
+    value = 0
+    shift = 0
+    while True:
+        b = ord(data[pos])
+        pos = pos+1
+        value = value | ((b & 0x7F) << shift)
+        if not b & 0x80:
+            return value, pos
+        shift = shift+7
+
+def fileGdbCatalog(gdb):
+    # reads system catalog (a00000001.gdbtable) of file geodatabase gdb
+    #   returns dictionary  lower-case table name -> table file number
+    table = open(os.path.join(gdb,'a00000001.gdbtable'),'rb').read()
+    tablx = open(os.path.join(gdb,'a00000001.gdbtablx'),'rb').read()
+    # field descriptions
+    pos = struct.unpack('<q',table[32:40])[0] + 4
+    version, flags, nFields = struct.unpack('<iih',table[pos:pos+10])
+    pos = pos+10
+    fields = []   # [name, type, isNullable]
+    for i in range(nFields):
+        nChars = ord(table[pos])
+        name = table[pos+1:pos+1+2*nChars].decode('utf-16-le')
+        pos = pos+1+2*nChars
+        nChars = ord(table[pos])   # alias
+        pos = pos+1+2*nChars
+        fType = ord(table[pos])
+        pos = pos+1
+        if fType == 6:      # ObjectID
+            fields.append([name,fType,False])
+            pos = pos+2
+        elif fType == 4:    # String
+            flag = ord(table[pos+4])
+            defaultLength, pos = _readVarUInt(table,pos+5)
+            pos = pos+defaultLength
+            fields.append([name,fType,flag & 1])
+        elif fType in (0,1,2,3,5):   # numbers and dates
+            flag = ord(table[pos+1])
+            defaultLength = ord(table[pos+2])
+            pos = pos+3+defaultLength
+            fields.append([name,fType,flag & 1])
+        else:
+            raise ValueError('unexpected field type '+str(fType)+' in system catalog')
+    nNullable = len([f for f in fields if f[2]])
+    # rows
+    catalog = {}
+    nRows, offsetSize = struct.unpack('<ii',tablx[8:16])
+    for oid in range(1,nRows+1):
+        start = 16+(oid-1)*offsetSize
+        offset = struct.unpack('<q',tablx[start:start+offsetSize]+'\0'*(8-offsetSize))[0]
+        if offset == 0:     # deleted row
+            continue
+        pos = offset+4
+        nullFlags = table[pos:pos+(nNullable+7)/8]
+        pos = pos+(nNullable+7)/8
+        iNullable = 0
+        name = None
+        for fName, fType, isNullable in fields:
+            if isNullable:
+                isNull = ord(nullFlags[iNullable/8]) & (1 << (iNullable % 8))
+                iNullable = iNullable+1
+                if isNull:
+                    continue
+            if fType == 6:
+                continue
+            elif fType == 4:
+                length, pos = _readVarUInt(table,pos)
+                value = table[pos:pos+length].decode('utf-8')
+                pos = pos+length
+                if fName.lower() == 'name':
+                    name = value
+            else:
+                pos = pos+{0:2,1:4,2:4,3:8,5:8}[fType]
+        if name <> None:
+            catalog[name.lower()] = oid
+    return catalog
+
+def tableFileTimes(workspace):
+    # returns dictionary  lower-case table name -> newest modification time of
+    #   its files, and the time to use for tables not in the dictionary
+    #   (None if not known)
+    try:
+        if os.path.isfile(workspace):    # .mdb, .sqlite, .gpkg
+            return {}, os.path.getmtime(workspace)
+        times = {}
+        for name, n in fileGdbCatalog(workspace).iteritems():
+            mtimes = [os.path.getmtime(f) for f in glob.glob(os.path.join(workspace,'a%08x.*' % n))]
+            if mtimes:
+                times[name] = max(mtimes)
+        return times, None
+    except:
+        return {}, None
+
+class ValidationCache:
+    def __init__(self,fileName,key):
+        # key identifies everything besides the tables themselves that
+        #   affects results (program versions, definitions)
+        self.fileName = fileName
+        self.key = key
+        self.entries = {}     # table -> [fingerprint, TableInventory]
+        self.hits = 0
+        self.misses = 0
+        try:
+            inf = open(fileName,'rb')
+            try:
+                key, entries = pickle.load(inf)
+            finally:
+                inf.close()
+            if key == self.key:
+                self.entries = entries
+        except:
+            pass
+
+    def get(self,table,fingerprint):
+        # cached TableInventory of table, or None
+        entry = self.entries.get(table)
+        if fingerprint <> None and entry <> None and entry[0] == fingerprint:
+            self.hits = self.hits+1
+            return entry[1]
+        self.misses = self.misses+1
+        return None
+
+    def put(self,table,fingerprint,inventory):
+        if fingerprint <> None:
+            self.entries[table] = [fingerprint,inventory]
+        elif table in self.entries:
+            del self.entries[table]
+
+    def retain(self,tables):
+        # forget tables that are no longer in the database
+        for table in self.entries.keys():
+            if not table in tables:
+                del self.entries[table]
+
+    def save(self):
+        outf = open(self.fileName,'wb')
+        try:
+            pickle.dump([self.key,self.entries],outf,2)
+        finally:
+            outf.close()
+
+def tableFingerprint(reader,table,fieldDefs,fileTimes):
+    # fileTimes is the result of tableFileTimes. Returns None if table
+    #   cannot be fingerprinted
+    times, defaultTime = fileTimes
+    fileTime = times.get(table.lower(),defaultTime)
+    if fileTime == None:
+        return None
+    try:
+        fields = reader.listFields(table)
+        nRows = reader.rowCount(table)
+    except:
+        return None
+    return [nRows,schemaHash(fields),_hash(fieldDefs),fileTime]
@@ -0,0 +1,688 @@
+# NCGMP09v11_Validator.py
+#   Library interface to the checks of NCGMP09v1.1_ValidateDatabase: is a
+#   database conformant with the NCGMP09v1.1 schema?
+#
+#   validate(database, options) runs every phase of the validator on a
+#   file or personal geodatabase (.gdb, .mdb; needs arcpy) or on a SQLite
+#   or GeoPackage copy (.sqlite, .gpkg; checked with SQL, see
+#   NCGMP09v11_SqlValidate) and returns a ValidationResult. The state of a
+#   run (catalog, reference index, report sections, profiler) belongs to a
+#   Validation object made for that run, not to module globals, so one
+#   long-lived process can validate many databases in turn and imports
+#   arcpy only once, when the first geodatabase is validated.
+#
+#   options is a dictionary. Values may be strings, as given on the
+#   command line, or Python values:
+#     processes   inventory up to this many tables at once, each in a
+#                 separate process. Default 1
+#     cachefile   file of per-table results reused while tables are
+#                 unchanged (see NCGMP09v11_ValidationCache). Default
+#                 None: no cache
+#     checks      content checks to run, a list or comma-separated names
+#                 from checkSections (e.g. 'ids,nulls'). Default all.
+#                 Schema errors are always checked, as that reads no
+#                 rows; columns that no enabled check needs are not read
+#     geometry    check geometry and topology of GeologicMap (see
+#                 NCGMP09v11_Topology). Default true; false is the same
+#                 as leaving geometry out of checks
+#     failfast    stop as soon as a schema error is found, before any
+#                 rows are read. Default false
+#     sample      instead of checking content, read a sample of up to
+#                 this many rows of each table and estimate the rates of
+#                 glossary, DataSources, MapUnit and pseudonull errors,
+#                 and the time a full run would take (see
+#                 NCGMP09v11_Sampling). Default 0: check all rows
+#     seed        seed of the random sample. Default None: a new sample
+#                 each run
+#     debug       log the rows and fields of each table. Default true
+#   log, if given, is called with each progress message. writtenBy, if
+#   given, is the versionString of the calling script, named in the report
+#   as the writer of the file; by default, this module.
+#
+#   A ValidationResult holds the schema errors and extensions, the content
+#   error sections (ErrorAggregators, by the names of
+#   contentSectionDefinitions), the database description, and the Profiler
+#   of the run. lines() and write() give the conformance report, and
+#   errorCounts() the number of errors of each kind.
+
+import os.path, time
+from NCGMP09v11_Definition import tableDict
+import NCGMP09v11_RefIndex as RefIndex
+import NCGMP09v11_IdRegistry as IdRegistry
+import NCGMP09v11_Catalog as Catalog
+import NCGMP09v11_ColumnScanner as ColumnScanner
+import NCGMP09v11_TableScanner as TableScanner
+import NCGMP09v11_ValidationCache as ValidationCache
+import NCGMP09v11_ErrorAggregator as ErrorAggregator
+import NCGMP09v11_Profiler as Profiler
+import NCGMP09v11_SqlValidate as SqlValidate
+import NCGMP09v11_AttributeGraph as AttributeGraph
+import NCGMP09v11_HierarchyKey as HierarchyKey
+import NCGMP09v11_Topology as Topology
+import NCGMP09v11_Sampling as Sampling
+
+versionString = 'NCGMP09v11_Validator.py, version of 17 October 2026'
+
+# fields we don't want listed or described when inventorying dataset:
+standardFields = ('OBJECTID','SHAPE','Shape','SHAPE_Length','SHAPE_Area','ZOrder',
+                  'AnnotationClassID','Status','TextString','FontName','FontSize','Bold',
+                  'Italic','Underline','VerticalAlignment','HorizontalAlignment',
+                  'XOffset','YOffset','Angle','FontLeading','WordSpacing','CharacterWidth',
+                  'CharacterSpacing','FlipAngle','Override','Shape_Length','Shape_Area')
+
+# SQLite and GeoPackage copies of NCGMP09 databases are checked with SQL (see NCGMP09v11_SqlValidate)
+sqliteExtensions = ('.gpkg','.sqlite')
+geodatabaseExtensions = ('.gdb','.mdb')
+
+badNullsHeader = """  Pseudonulls (value = <space>) commonly result from loading empty data into
+  string fields in which nulls are not allowed. Trailing spaces are commonly
+  produced by hand-correction of pseudonulls. The following fields contain
+  pseudonulls, trailing spaces or leading spaces"""
+
+byRow = {'countWord':'rows','examplesLabel':'OBJECTID'}
+# content error sections: [name, header, further arguments of ErrorAggregator]
+contentSectionDefinitions = (
+    ['duplicateIDs','  Duplicate _ID values',{}],
+    ['danglingOwnerIds','  OwnerIDs in ExtendedAttributes that are absent elsewhere in the database',byRow],
+    ['danglingValueLinks','  ValueLinkIDs in ExtendedAttributes that are absent elsewhere in the database',byRow],
+    ['isolatedAttributes','  Rows in ExtendedAttributes that link to nothing: neither OwnerID nor ValueLinkID is present in database',byRow],
+    ['missingSourceIDs','  Missing DataSources entries. Only one reference to each missing source is cited',{}],
+    ['unusedDataSources','  Entries in DataSources that are not otherwise referenced in database',{}],
+    ['missingDmuMapUnits','  MapUnits missing from DMU. Only one reference to each missing unit is cited',{}],
+    ['missingStandardLithMapUnits','  MapUnits missing from StandardLithology. Only one reference to each missing unit is cited',{}],
+    ['unreferencedDmuMapUnits','  MapUnits in DMU that are not present on map or in CMU',{}],
+    ['unreferencedStandardLithMapUnits','  MapUnits in StandardLithology that are not present on map',{}],
+    ['equivalenceErrors','  Units present in map, DMU, CMU, and cross sections',{}],
+    ['missingGlossaryTerms','  Missing terms in Glossary. Only one reference to each missing term is cited',{}],
+    ['unusedGlossaryTerms','  Terms in Glossary that are not otherwise used in geodatabase',{}],
+    ['unusedGeologicEvents','  Events in GeologicEvents that are not cited in ExtendedAttributes',{}],
+    ['hKeyErrors','  HierarchyKey errors, DescriptionOfMapUnits',{}],
+    ['hKeyTreeErrors','  HierarchyKey tree errors, DescriptionOfMapUnits: rows with no key, duplicate keys,\n'+
+     '  missing parents, gaps between siblings, and keys out of order when sorted as text',{}],
+    ['selfIntersections','  Lines and polygons that cross or touch themselves',{}],
+    ['polygonOverlaps','  Polygons that overlap',{}],
+    ['polygonGaps','  Gaps between polygons',{}],
+    ['lineDangles','  Dangles: ends of lines that touch no other line',{}],
+    ['uncoveredBoundaries','  Polygons with boundaries not covered by lines',{}])
+
+# content checks and the report sections each fills
+checkSections = {'ids':('duplicateIDs',),
+                 'attributes':AttributeGraph.sectionNames,
+                 'dataSources':('missingSourceIDs','unusedDataSources'),
+                 'mapUnits':('missingDmuMapUnits','missingStandardLithMapUnits','unreferencedDmuMapUnits',
+                             'unreferencedStandardLithMapUnits','equivalenceErrors'),
+                 'glossary':('missingGlossaryTerms','unusedGlossaryTerms'),
+                 'hierarchyKeys':('hKeyErrors','hKeyTreeErrors'),
+                 'nulls':('allBadNulls',),
+                 'geometry':Topology.sectionNames}
+allChecks = ('ids','attributes','dataSources','mapUnits','glossary','hierarchyKeys','nulls','geometry')
+
+def _flag(options,name,default):
+    value = options.get(name,default)
+    if isinstance(value,basestring):
+        return value.lower() not in ('false','no','0')
+    return bool(value)
+
+def parseChecks(options):
+    # enabled checks, in the order of allChecks
+    names = options.get('checks')
+    if names == None:
+        names = allChecks
+    elif isinstance(names,basestring):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    byName = dict([[name.lower(),name] for name in allChecks])
+    checks = []
+    for name in names:
+        if not name.lower() in byName:
+            raise ValueError('Unknown check '+name+'; checks are '+', '.join(allChecks))
+        checks.append(byName[name.lower()])
+    if not _flag(options,'geometry',True) and 'geometry' in checks:
+        checks.remove('geometry')
+    return [name for name in allChecks if name in checks]
+
+class ValidationResult:
+    def __init__(self,database,checks=allChecks,writtenBy=versionString):
+        self.database = database
+        self.writtenBy = writtenBy  # versionString named in the report
+        self.checks = list(checks)  # content checks run
+        self.stopped = None         # why the run stopped early, if it did
+        self.tables = []
+        self.fdsfc = []            # [featureDataset, [featureClasses]]
+        self.schemaErrors = []
+        self.schemaExtensions = []
+        self.contentSections = {}  # name -> ErrorAggregator
+        for name, header, arguments in contentSectionDefinitions:
+            self.contentSections[name] = ErrorAggregator.ErrorAggregator(header,**arguments)
+        self.allBadNulls = ErrorAggregator.ErrorAggregator(badNullsHeader,**byRow)
+        self.gdbDescription = []
+        self.geometryChecked = []  # [featureDataset, polygon class, line class] of maps checked
+        self.rowsScanned = 0
+        self.sample = None         # Sampling.SampleEstimate, if content was sampled
+        self.profiler = Profiler.Profiler()
+
+    def checked(self,name):
+        # was report section name checked?
+        if self.stopped <> None:
+            return False
+        for check in self.checks:
+            if name in checkSections[check]:
+                return True
+        return False
+
+    def errorCounts(self):
+        # {kind of error: number}: schemaErrors, schemaExtensions, and each
+        #   content section checked, counting every row or duplicate of a line
+        counts = {'schemaErrors':len(self.schemaErrors),'schemaExtensions':len(self.schemaExtensions)}
+        if self.checked('allBadNulls'):
+            counts['allBadNulls'] = sum(self.allBadNulls.counts.values())
+        for name, aggregator in self.contentSections.iteritems():
+            if self.checked(name):
+                counts[name] = sum(aggregator.counts.values())
+        return counts
+
+    def _contentErrors(self,name,noErrorString):
+        if not self.checked(name):
+            return []
+        if name == 'allBadNulls':
+            errors = self.allBadNulls
+        else:
+            errors = self.contentSections[name]
+        if len(errors) == 0:
+            return ['  '+noErrorString,'']
+        return [errors.header]+errors.lines()+['']
+
+    def lines(self):
+        # lines of the conformance report
+        tables = self.tables
+        lines = ['Geodatabase '+self.database,
+                 '  Testing for compliance with NCGMP09v1.1 database schema',
+                 '  This file written by '+self.writtenBy,
+                 '  '+time.asctime(time.localtime(time.time()))]
+        if self.sample <> None:
+            lines.append('  Content estimated from a sample of '+str(self.sample.n)+' rows per table')
+        elif self.checks <> list(allChecks):
+            lines.append('  Content checks: '+(', '.join(self.checks) or 'none'))
+        if self.stopped <> None:
+            lines.append('  '+self.stopped)
+        #  Schema errors
+        lines = lines+['','','SCHEMA ERRORS','']
+        lines = lines+(['  '+aline for aline in self.schemaErrors] or ['  None'])
+        # Extensions to schema
+        lines = lines+['','','EXTENSIONS TO SCHEMA, may indicate errors','']
+        lines = lines+(['  '+aline for aline in self.schemaExtensions] or ['  None'])
+        if self.sample <> None:
+            lines = lines+['','','SAMPLED CONTENT ERRORS','']+self.sample.lines()
+            lines = lines+['','GEODATABASE DESCRIPTION','']
+            return lines+self.gdbDescription
+        # Content errors
+        lines = lines+['','','CONTENT ERRORS','']
+        content = self._contentErrors
+        lines = lines+content('duplicateIDs','No duplicate _IDs')
+        lines = lines+content('missingSourceIDs','No missing entries in DataSources')
+        lines = lines+content('unusedDataSources','No unreferenced entries in DataSources')
+        lines = lines+content('missingDmuMapUnits','No missing MapUnits in DescriptionOfMapUnits')
+        lines = lines+content('equivalenceErrors','CMU matches DMU matches units on map')
+        if 'StandardLithology' in tables:
+            lines = lines+content('missingStandardLithMapUnits','No missing MapUnits in StandardLithology')
+            lines = lines+content('unreferencedStandardLithMapUnits','No unreferenced MapUnits in StandardLithology')
+        lines = lines+content('unreferencedDmuMapUnits','No unreferenced MapUnits in Description of MapUnits')
+        lines = lines+content('missingGlossaryTerms','No missing terms in Glossary')
+        lines = lines+content('unusedGlossaryTerms','No unreferenced terms in Glossary')
+        if 'ExtendedAttributes' in tables:
+            lines = lines+content('danglingOwnerIds','No rows in ExtendedAttributes that reference nonexistent OwnerIDs')
+            lines = lines+content('danglingValueLinks','No rows in ExtendedAttributes that reference nonexistent ValueLinkIDs')
+            lines = lines+content('isolatedAttributes','No rows in ExtendedAttributes that link to nothing')
+            if 'GeologicEvents' in tables:
+                lines = lines+content('unusedGeologicEvents','No rows in GeologicEvents not referenced in ExtendedAttributes')
+        lines = lines+content('hKeyErrors','No format errors in HierarchyKeys')
+        lines = lines+content('hKeyTreeErrors','No tree errors in HierarchyKeys')
+        for fds, polygonClass, lineClass in self.geometryChecked:
+            lines = lines+content('selfIntersections','No self-intersecting lines or polygons in '+fds)
+            if polygonClass <> None:
+                lines = lines+content('polygonOverlaps','No overlapping polygons in '+polygonClass)
+                lines = lines+content('polygonGaps','No gaps between polygons in '+polygonClass)
+            if lineClass <> None:
+                lines = lines+content('lineDangles','No dangles in '+lineClass)
+            if polygonClass <> None and lineClass <> None:
+                lines = lines+content('uncoveredBoundaries','All boundaries of '+polygonClass+' covered by '+lineClass)
+        lines = lines+content('allBadNulls','No pseudonulls, trailing spaces or leading spaces')
+        # Database description
+        lines = lines+['','GEODATABASE DESCRIPTION','']
+        return lines+self.gdbDescription
+
+    def write(self,outFile):
+        outfl = open(outFile,'w')
+        try:
+            for aline in self.lines():
+                outfl.write(aline+'\n')
+        finally:
+            outfl.close()
+
+class Validation:
+    # one run of the validator on one database
+    def __init__(self,database,options=None,log=None,writtenBy=None):
+        if options == None:
+            options = {}
+        if writtenBy == None:
+            writtenBy = versionString
+        self.database = database
+        self.processes = int(options.get('processes',1))
+        self.cacheFile = options.get('cachefile')
+        self.checks = parseChecks(options)
+        self.failFast = _flag(options,'failfast',False)
+        self.sampleSize = int(options.get('sample') or 0)
+        self.seed = options.get('seed')
+        self.debug = _flag(options,'debug',True)
+        self.log = log
+        self.catalog = None    # Catalog of the database: fields and row counts of each table, described once
+        self.refIndex = RefIndex.ReferenceIndex()    # _IDs and references to MapUnits, Glossary, DataSources
+        self.result = ValidationResult(database,self.checks,writtenBy)
+        self.profiler = self.result.profiler
+
+    def message(self,msg):
+        if self.log <> None:
+            self.log(msg)
+
+    def run(self):
+        extension = os.path.splitext(self.database)[1].lower()
+        if extension in sqliteExtensions:
+            self.checkSqliteDatabase()
+        else:
+            self.checkGeodatabase()
+        return self.result
+
+    def checkSample(self,tables):
+        # estimates content errors from a sample of the rows of tables
+        self.message('  Sampling content...')
+        checks = [check for check in self.checks if check in Sampling.sampleChecks]
+        sample = Sampling.SampleEstimate(self.sampleSize,seed=self.seed)
+        sample.run(self.catalog,tables,checks,msg=self.debug and self.message or None)
+        self.result.sample = sample
+        self.result.checks = []
+        self.result.rowsScanned = sum([t.rows for t in sample.tables])
+
+    def failedFast(self):
+        # with failfast, has a schema error been found? If so, the run stops
+        if self.failFast and self.result.schemaErrors:
+            self.result.stopped = 'Stopped at the first schema error (failfast=true); content was not checked'
+            self.message('  '+self.result.stopped)
+            self.profiler.stop()
+            return True
+        return False
+
+    #------------ geodatabases -------------------
+
+    def checkGeodatabase(self):
+        import arcpy
+        arcpy.QualifiedFieldNames = False
+        try:
+            arcpy.env.workspace = self.database
+        except:
+            raise ValueError('Unable to load workspace '+self.database+'. Not an ESRI geodatabase?')
+        self.catalog = Catalog.Catalog(TableScanner.ArcpyReader(self.database))
+        self.profiler.start('inventoryWorkspace')
+        self.result.tables = list(self.catalog.listWorkspace()[0])
+        self.inventoryWorkspace()
+        self.profiler.start('checkRequiredElements')
+        self.checkRequiredElements()
+        if self.failedFast():
+            return
+        self.profiler.start('checkFieldsAndFieldDefinitions')
+        if self.failFast:
+            self.checkFieldDefinitions()
+            if self.failedFast():
+                return
+        if self.sampleSize > 0:
+            # field definitions alone; checkSample reads the rows
+            self.checkFieldsAndFieldDefinitions([])
+            self.profiler.start('checkSample')
+            self.checkSample(self.allTables())
+            self.profiler.stop(self.result.rowsScanned)
+            return
+        self.checkFieldsAndFieldDefinitions()
+        self.profiler.stop(self.result.rowsScanned)
+        self.profiler.start('checkContent')
+        self.checkContent()
+        if 'geometry' in self.checks:
+            self.profiler.start('checkGeometry')
+            self.checkGeometry()
+        self.profiler.stop()
+        if self.debug: self.message('    '+self.catalog.statistics())
+
+    def listDataSet(self,dataSet):
+        self.message('    '+dataSet)
+        startTime = time.time()
+        nrows = self.catalog.rowCount(dataSet)
+        elapsedTime = time.time() - startTime
+        if self.debug: self.message('      '+str(nrows)+' rows '+ "%.1f" % elapsedTime +' sec')
+        self.result.gdbDescription.append('    '+dataSet+', '+str(nrows)+' records')
+        startTime = time.time()
+        fields = self.catalog.listFields(dataSet)
+        elapsedTime = time.time() - startTime
+        if self.debug: self.message('      '+str(len(fields))+' fields '+ "%.1f" % elapsedTime +' sec')
+        for field in fields:
+            if not (field.name in standardFields):
+                self.result.gdbDescription.append('      '+field.name+' '+field.type+':'+str(field.length)+'  '+str(field.required))
+
+    def inventoryWorkspace(self):
+        self.message('  Inventorying geodatabase...')
+        self.result.gdbDescription.append('Tables: ')
+        for table in self.result.tables:
+            self.listDataSet(table)
+        for featureDataSet, featureClasses in self.catalog.listWorkspace()[1]:
+            self.result.gdbDescription.append('Feature data set: '+featureDataSet)
+            featureClassList = []
+            for featureClass in featureClasses:
+                self.listDataSet(featureClass)
+                featureClassList.append(featureClass)
+            self.result.fdsfc.append([featureDataSet,featureClassList])
+
+    def checkFieldsAndFieldDefinitions(self,checks=None):
+        # checks, if given, are the content checks to inventory rows for,
+        #   instead of self.checks; [] reads no rows
+        self.message('  Checking fields and field definitions, inventorying special fields...')
+        result = self.result
+        # tables and feature classes to check, in report order
+        jobs = []
+        for table in result.tables:
+            jobs.append([table,tableDict.get(table)])
+        for fds in result.fdsfc:
+            for featureClass in fds[1]:
+                jobs.append([featureClass,tableDict.get(featureClass)])
+        inventories = iter(self.inventoryTables(jobs,checks))
+        for table in result.tables:
+            if self.debug: self.message('    Table = '+table)
+            if not tableDict.has_key(table):
+                result.schemaExtensions.append('Table '+table+' is not required')
+            self.mergeInventory(inventories.next())
+        for fds in result.fdsfc:
+            if not fds[0] in ('GeologicMap','CorrelationOfMapUnits') and fds[0:12] <> 'CrossSection':
+                result.schemaExtensions.append('Feature dataset '+fds[0]+' is not required')
+            for featureClass in fds[1]:
+                if self.debug: self.message('    Feature class = '+featureClass)
+                if not tableDict.has_key(featureClass):
+                    result.schemaExtensions.append('Feature class '+featureClass+' is not required')
+                self.mergeInventory(inventories.next())
+
+    def allTables(self):
+        # tables, then feature classes
+        tables = list(self.result.tables)
+        for fds, fcs in self.result.fdsfc:
+            tables.extend(fcs)
+        return tables
+
+    def checkFieldDefinitions(self):
+        # field definitions alone, table by table, up to the first table
+        #   with a schema error; for failfast, before any rows are read
+        extensions = []
+        for table in self.allTables():
+            if tableDict.has_key(table):
+                errors, tableExtensions = TableScanner.checkFieldDefinitions(table,self.catalog.listFields(table),
+                                                                             tableDict[table],standardFields)
+                extensions.extend(tableExtensions)
+                if errors:
+                    self.result.schemaErrors.extend(errors)
+                    self.result.schemaExtensions.extend(extensions)
+                    return
+
+    def inventoryTables(self,jobs,checks=None):
+        # returns TableInventory for each of jobs, taking unchanged tables from
+        #   the validation cache and inventorying the others. The cache is
+        #   only used when inventorying for self.checks
+        if checks == None:
+            checks = self.checks
+        inventories = [None]*len(jobs)
+        fingerprints = [None]*len(jobs)
+        useCache = self.cacheFile <> None and checks == self.checks
+        if useCache:
+            cacheKey = [self.database,versionString,TableScanner.versionString,
+                        RefIndex.versionString,IdRegistry.versionString,ColumnScanner.versionString,
+                        ValidationCache.versionString,standardFields,self.checks]
+            cache = ValidationCache.ValidationCache(self.cacheFile,cacheKey)
+            fileTimes = ValidationCache.tableFileTimes(self.database)
+            for i in range(len(jobs)):
+                table, fieldDefs = jobs[i]
+                fingerprints[i] = ValidationCache.tableFingerprint(self.catalog,table,fieldDefs,fileTimes)
+                inventories[i] = cache.get(table,fingerprints[i])
+            self.message('    '+str(cache.hits)+' tables unchanged since last run, '+str(cache.misses)+' to inventory')
+        rescan = [i for i in range(len(jobs)) if inventories[i] == None]
+        if self.processes > 1:
+            self.message('    using '+str(min(self.processes,len(rescan)))+' processes')
+        scanned = TableScanner.inventoryTables(self.catalog,[jobs[i] for i in rescan],standardFields,self.processes,checks)
+        for i, inventory in zip(rescan,scanned):
+            inventories[i] = inventory
+            self.result.rowsScanned = self.result.rowsScanned+inventory.nRows
+        rescanned = set(rescan)
+        for i in range(len(jobs)):
+            if i in rescanned:
+                self.profiler.table(jobs[i][0],inventories[i].seconds,inventories[i].nRows)
+            else:
+                self.profiler.table(jobs[i][0],0.0,inventories[i].nRows,cached=True)
+        if useCache:
+            for i in rescan:
+                if len(inventories[i].messages) == 0:
+                    cache.put(jobs[i][0],fingerprints[i],inventories[i])
+                else:
+                    cache.put(jobs[i][0],None,None)
+            cache.retain([job[0] for job in jobs])
+            try:
+                cache.save()
+            except:
+                self.message('    Unable to write validation cache '+cache.fileName)
+        return inventories
+
+    def mergeInventory(self,inventory):
+        # add partial results for one table to the results for the database
+        self.result.schemaErrors.extend(inventory.schemaErrors)
+        self.result.schemaExtensions.extend(inventory.schemaExtensions)
+        self.refIndex.merge(inventory.refIndex)
+        self.result.allBadNulls.merge(inventory.badNulls)
+        for aline in inventory.messages:
+            self.message(aline)
+        if self.debug: self.message('      '+str(inventory.nRows)+' rows scanned')
+        self.message('      Finished '+inventory.tables[0])
+
+    def checkMapFeatureClasses(self,fds,prefix,fcs):
+        self.message('  Checking for required feature classes...')
+        requiredFeatureClasses = []
+        for fc in ['ContactsAndFaults','MapUnitPolys','DataSourcePolys']:
+            requiredFeatureClasses.append(prefix+fc)
+        for fc in requiredFeatureClasses:
+            if not (fc in fcs):
+                self.result.schemaErrors.append('Feature data set '+fds+', feature class '+fc+' is missing')
+
+    def checkRequiredElements(self):
+        self.message('  Checking for required elements...')
+        schemaErrors = self.result.schemaErrors
+        requiredFeatureDataSets = ['GeologicMap']
+        requiredTables = ['DescriptionOfMapUnits','Glossary','DataSources']
+        for tb1 in requiredTables:
+            if not tb1 in self.result.tables:
+                schemaErrors.append('Table '+tb1+' is missing')
+        for fds1 in requiredFeatureDataSets:
+            if not fds1 in [fds2[0] for fds2 in self.result.fdsfc]:
+                schemaErrors.append('Feature data set '+fds1+' is missing')
+        for fds, fcs in self.result.fdsfc:
+            if fds[0:12] == 'CrossSection':
+                self.checkMapFeatureClasses(fds,'CS'+fds[12:],fcs)
+            if fds == 'GeologicMap':
+                self.checkMapFeatureClasses(fds,'',fcs)
+            if fds == 'CorrelationOfMapUnits':
+                for fc in ('CMULines','CMUMapUnitPolys','CMUText'):
+                    if not (fc in fcs):
+                        schemaErrors.append('Feature data set '+fds+', feature class '+fc+' is missing')
+
+    def fieldNames(self,table):
+        # names of fields of table, or None if it is absent
+        if not table in self.result.tables:
+            return None
+        return [field.name for field in self.catalog.listFields(table)]
+
+    def loadTableValues(self,table,field,values):
+        # appends the values of field that are not null to values; returns
+        #   False if table or field is absent
+        names = self.fieldNames(table)
+        if names == None or not field in names:
+            return False
+        values.extend([value for (value,) in self.catalog.rows(table,[field]) if value <> None])
+        return True
+
+    def checkAttributeGraph(self):
+        # one pass through ExtendedAttributes; see NCGMP09v11_AttributeGraph
+        graph = AttributeGraph.AttributeGraph(self.refIndex.ids)
+        readAttributes, readEvents = graph.checkFields(self.fieldNames('ExtendedAttributes'),self.fieldNames('GeologicEvents'))
+        if readEvents:
+            graph.addEvents(row[0] for row in self.catalog.rows('GeologicEvents',['GeologicEvents_ID']))
+        if readAttributes:
+            graph.addAttributes(self.catalog.rows('ExtendedAttributes',[TableScanner.oidToken]+list(AttributeGraph.attributeFields)))
+        for name, aggregator in graph.finish().iteritems():
+            self.result.contentSections[name].merge(aggregator)
+
+    def checkContent(self):
+        self.message('  Checking content...')
+        sections = self.result.contentSections
+        refIndex = self.refIndex
+        checks = self.checks
+        # Check for uniqueness of _ID values
+        if 'ids' in checks:
+            self.message('    Checking uniqueness of ID values')
+            sections['duplicateIDs'].extend(RefIndex.duplicateIdLines(refIndex))
+        # Check links of ExtendedAttributes: OwnerIDs and ValueLinkIDs that don't match an existing _ID,
+        #   and GeologicEvents not cited by any ValueLinkID
+        if 'attributes' in checks:
+            self.message('    Checking ExtendedAttributes links')
+            self.checkAttributeGraph()
+        # Check DataSources references against DataSources
+        if 'dataSources' in checks:
+            self.message('    Comparing DataSources_IDs with DataSources')
+            dataSourcesIDs = []
+            if self.loadTableValues('DataSources','DataSources_ID',dataSourcesIDs):
+                sections['missingSourceIDs'].extend(RefIndex.missingDataSourcesLines(refIndex,dataSourcesIDs))
+                sections['unusedDataSources'].extend(RefIndex.unusedDataSourcesLines(refIndex,dataSourcesIDs))
+            else:
+                sections['missingSourceIDs'].add('    Error: did not find field DataSources_ID in table DataSources')
+                sections['unusedDataSources'].add('    Error: did not find field DataSources_ID in table DataSources')
+        # Check MapUnits against DescriptionOfMapUnits and StandardLithology
+        if 'mapUnits' in checks:
+            self.checkMapUnits()
+        # Check Glossary references against Glossary
+        if 'glossary' in checks:
+            self.message('    Checking glossary references')
+            glossaryTerms = []
+            if self.loadTableValues('Glossary','Term',glossaryTerms):
+                sections['missingGlossaryTerms'].extend(RefIndex.missingGlossaryLines(refIndex,glossaryTerms))
+                sections['unusedGlossaryTerms'].extend(RefIndex.unusedGlossaryLines(refIndex,glossaryTerms))
+            else:
+                sections['missingGlossaryTerms'].add('    Error: did not find field Term in table Glossary')
+                sections['unusedGlossaryTerms'].add('    Error: did not find field Term in table Glossary')
+        # Check HierarchyKeys in DescriptionOfMapUnits: widths of fragments, and the tree they make
+        dmuFields = self.fieldNames('DescriptionOfMapUnits')
+        if 'hierarchyKeys' in checks and dmuFields <> None and self.catalog.rowCount('DescriptionOfMapUnits') > 0:
+            self.message('    Checking HierarchyKey (DMU) formatting')
+            if 'HierarchyKey' in dmuFields:
+                widthLines, treeLines = HierarchyKey.errorLines(hKey for (hKey,) in self.catalog.rows('DescriptionOfMapUnits',['HierarchyKey']))
+                sections['hKeyErrors'].extend(widthLines)
+                sections['hKeyTreeErrors'].extend(treeLines)
+            else:
+                sections['hKeyErrors'].add('    Error: did not find field HierarchyKey in table DescriptionOfMapUnits')
+
+    def checkMapUnits(self):
+        self.message('    checking MapUnits against DMU and StandardLithology')
+        sections = self.result.contentSections
+        refIndex = self.refIndex
+        dmuMapUnits = []
+        standardLithMapUnits = []
+        if not self.loadTableValues('DescriptionOfMapUnits','MapUnit',dmuMapUnits):
+            sections['missingDmuMapUnits'].add('    Error: did not find field MapUnit in table DescriptionOfMapUnits')
+            sections['unreferencedDmuMapUnits'].add('    Error: did not find field MapUnit in table DescriptionOfMapUnits')
+        if not self.loadTableValues('StandardLithology','MapUnit',standardLithMapUnits):
+            sections['missingStandardLithMapUnits'].add('    Error: did not find field MapUnit in table StandardLithology')
+            sections['unreferencedStandardLithMapUnits'].add('    Error: did not find field MapUnit in table StandardLithology')
+        allDmuMapUnits = RefIndex.allDmuMapUnits(refIndex,dmuMapUnits)
+        self.message('    Checking for missing map units in DMU and StandardLithology')
+        sections['missingDmuMapUnits'].extend(RefIndex.missingMapUnitLines(refIndex,allDmuMapUnits))
+        sections['missingStandardLithMapUnits'].extend(RefIndex.missingMapUnitLines(refIndex,standardLithMapUnits))
+        # compare map, DMU, CMU, and cross-sections
+        self.message('    Comparing units present in map, DMU, CMU, and cross sections')
+        sections['equivalenceErrors'].extend(RefIndex.equivalenceLines(refIndex,allDmuMapUnits))
+        # look for excess map units in StandardLithology
+        self.message('    Checking for excess map units in StandardLithology')
+        sections['unreferencedStandardLithMapUnits'].extend(RefIndex.unreferencedStandardLithLines(refIndex,standardLithMapUnits))
+        # look for unreferenced map units in DMU
+        self.message('    Checking for excess map units in DMU')
+        sections['unreferencedDmuMapUnits'].extend(RefIndex.unreferencedDmuLines(refIndex,allDmuMapUnits))
+
+    def checkGeometry(self):
+        # topology rules of GeologicMapTopology, checked on shapes read once
+        self.message('  Checking geometry and topology...')
+        for fds, fcs in self.result.fdsfc:
+            if not fds in Topology.topologyClasses:
+                continue
+            classes = []
+            for fc in Topology.topologyClasses[fds]:
+                if fc in fcs:
+                    classes.append(fc)
+                else:
+                    classes.append(None)
+            if classes == [None,None]:
+                continue
+            self.message('    '+fds)
+            for name, aggregator in Topology.checkMap(self.catalog,classes[0],classes[1]).iteritems():
+                self.result.contentSections[name].merge(aggregator)
+            self.result.geometryChecked.append([fds]+classes)
+
+    #------------ SQLite and GeoPackage -------------------
+
+    def checkSqliteDatabase(self):
+        # all phases for a SQLite or GeoPackage database, with the checks done in SQL
+        import sqlite3
+        result = self.result
+        connection = sqlite3.connect(self.database)
+        self.catalog = catalog = Catalog.Catalog(TableScanner.SqliteReader(connection))
+        try:
+            self.profiler.start('inventoryWorkspace')
+            self.message('  Inventorying database...')
+            result.tables, result.fdsfc = SqlValidate.listTables(catalog)
+            result.gdbDescription.extend(SqlValidate.describe(catalog,result.tables,result.fdsfc,standardFields))
+            self.profiler.start('checkRequiredElements')
+            self.checkRequiredElements()
+            if self.failedFast():
+                return
+            self.profiler.start('checkFieldsAndFieldDefinitions')
+            self.message('  Checking fields and field definitions...')
+            errors, extensions = SqlValidate.checkFields(catalog,result.tables,result.fdsfc,standardFields,self.failFast)
+            result.schemaErrors.extend(errors)
+            result.schemaExtensions.extend(extensions)
+            if self.failedFast():
+                return
+            allTables = self.allTables()
+            if self.sampleSize > 0:
+                self.profiler.start('checkSample')
+                self.checkSample(allTables)
+                self.profiler.stop(result.rowsScanned)
+                return
+            self.profiler.start('checkContent')
+            self.message('  Checking content (SQL)...')
+            sections = SqlValidate.contentErrors(catalog,allTables,self.checks)
+            if 'allBadNulls' in sections:
+                result.allBadNulls.merge(sections.pop('allBadNulls'))
+            for name in AttributeGraph.sectionNames:
+                if name in sections:
+                    result.contentSections[name].merge(sections.pop(name))
+            for name, lines in sections.iteritems():
+                result.contentSections[name].extend(lines)
+            if 'geometry' in self.checks:
+                self.profiler.start('checkGeometry')
+                self.checkGeometry()
+            self.profiler.stop()
+            if self.debug: self.message('    '+catalog.statistics())
+        finally:
+            connection.close()
+
+def validate(database,options=None,log=None,writtenBy=None):
+    # checks database; returns a ValidationResult. Raises ValueError if
+    #   database is absent or not a geodatabase, SQLite or GeoPackage file
+    extension = os.path.splitext(database)[1].lower()
+    if not os.path.exists(database) or not extension in sqliteExtensions+geodatabaseExtensions:
+        raise ValueError('Object '+database+' does not exist or is not a geodatabase')
+    return Validation(os.path.abspath(database),options,log,writtenBy).run()